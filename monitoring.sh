@@ -10,6 +10,8 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_DIR="$(dirname "$SCRIPT_DIR")"
 LOG_FILE="$PROJECT_DIR/logs/monitoring.log"
 ALERT_LOG="$PROJECT_DIR/logs/alerts.log"
+# 数据生成器的 Prometheus 文本格式指标（data_generator.py 通过 DESCI_METRICS_PROM 写入）
+GENERATOR_METRICS_FILE="${DESCI_METRICS_PROM:-$PROJECT_DIR/logs/generator_metrics.prom}"
 
 # 颜色输出
 RED='\033[0;31m'
@@ -154,6 +156,27 @@ check_blockchain() {
     fi
 }
 
+# 检查数据生成器指标
+check_generator_metrics() {
+    local metrics_file=${1:-$GENERATOR_METRICS_FILE}
+
+    if [ ! -f "$metrics_file" ]; then
+        info "未找到数据生成器指标文件: $metrics_file"
+        return 0
+    fi
+
+    success "数据生成器指标 (更新于 $(date -r "$metrics_file" '+%Y-%m-%d %H:%M:%S'))"
+    # 各阶段累计耗时与调用次数
+    awk '
+        /^#/ { next }
+        /_phase_seconds_sum/ { split($1, parts, "_sum"); sum[parts[2]] = $2 }
+        /_phase_seconds_count/ { split($1, parts, "_count"); count[parts[2]] = $2 }
+        /_total[{ ]/ { printf "  %s %s\n", $1, $2 }
+        END { for (series in sum) printf "  %-50s %10.3fs  (%d 次)\n", series, sum[series], count[series] }
+    ' "$metrics_file"
+    return 0
+}
+
 # 获取系统信息
 get_system_info() {
     echo "=== 系统信息 ==="
@@ -263,6 +286,11 @@ monitor_system() {
     check_blockchain "http://localhost:8545" || exit_code=1
     echo ""
 
+    # 检查数据生成器指标
+    echo "📈 检查数据生成器指标..."
+    check_generator_metrics
+    echo ""
+
     # 显示系统信息
     get_system_info
 
@@ -307,6 +335,7 @@ DeSci Platform 监控脚本
 
 环境变量:
     SLACK_WEBHOOK_URL    Slack告警通知Webhook地址
+    DESCI_METRICS_PROM   数据生成器指标文件 (默认: logs/generator_metrics.prom)
 
 EOF
 }
@@ -9,6 +9,7 @@ const express = require('express');
 const cors = require('cors');
 const { ethers } = require('ethers');
 const path = require('path');
+const crypto = require('crypto');
 
 // 创建Express应用
 const app = express();
@@ -37,11 +38,11 @@ function serialize(obj) {
     , 2);
 }
 
-// 速率限制中间件（简单实现）
+// 速率限制中间件（简单实现）；name 区分不同的限额，各自独立计数
 const rateLimitStore = new Map();
-const rateLimit = (maxRequests = 100, windowMs = 15 * 60 * 1000) => {
+const rateLimit = (maxRequests = 100, windowMs = 15 * 60 * 1000, name = 'api') => {
     return (req, res, next) => {
-        const key = req.ip;
+        const key = `${name}:${req.ip}`;
         const now = Date.now();
         const windowStart = now - windowMs;
 
@@ -55,6 +56,9 @@ const rateLimit = (maxRequests = 100, windowMs = 15 * 60 * 1000) => {
 
         if (validRequests.length >= maxRequests) {
             logger.warn(`速率限制触发: ${key}`);
+            // 告知客户端最早何时可以重试
+            const retryAfter = Math.max(1, Math.ceil((validRequests[0] + windowMs - now) / 1000));
+            res.set('Retry-After', String(retryAfter));
             return res.status(429).json({
                 success: false,
                 error: {
@@ -152,7 +156,14 @@ app.use(express.static(path.join(__dirname, '../../frontend')));
 console.log('静态文件服务已启用');
 
 // API速率限制中间件 - 必须在API路由之前定义
-app.use('/api', rateLimit(100, 15 * 60 * 1000)); // 15分钟内最多100个请求
+// 批量上传端点（bulk_uploader.py 使用）每个请求包含上百个项目或一个分块，单独使用更高的限额，
+// 否则10万个项目的上传会在普通API的限额下反复 429
+const BULK_UPLOAD_PATHS = new Set(['/projects/batch', '/projects/chunks']);
+const BULK_RATE_LIMIT = parseInt(process.env.BULK_RATE_LIMIT || '600', 10);
+const apiRateLimit = rateLimit(100, 15 * 60 * 1000); // 15分钟内最多100个请求
+const bulkRateLimit = rateLimit(BULK_RATE_LIMIT, 60 * 1000, 'bulk'); // 每分钟最多 BULK_RATE_LIMIT 个请求
+app.use('/api', (req, res, next) =>
+    (BULK_UPLOAD_PATHS.has(req.path) ? bulkRateLimit : apiRateLimit)(req, res, next));
 
 // 健康检查端点 - 在所有中间件之前定义
 console.log('Defining /health route...');
@@ -767,21 +778,21 @@ app.post('/api/auth/login', async (req, res) => {
 /**
  * 创建新项目
  */
+function createProject(projectData) {
+    // 这里应该调用智能合约创建项目
+    // 暂时返回模拟响应
+    return {
+        id: Date.now(),
+        ...projectData,
+        created_at: Date.now(),
+        updated_at: Date.now(),
+        status: 'Active'
+    };
+}
+
 app.post('/api/projects', async (req, res) => {
     try {
-        const projectData = req.body;
-
-        // 这里应该调用智能合约创建项目
-        // 暂时返回模拟响应
-        const newProject = {
-            id: Date.now(),
-            ...projectData,
-            created_at: Date.now(),
-            updated_at: Date.now(),
-            status: 'Active'
-        };
-
-        res.json(newProject);
+        res.json(createProject(req.body));
     } catch (error) {
         console.error('创建项目失败:', error);
         res.status(500).json({
@@ -791,6 +802,102 @@ app.post('/api/projects', async (req, res) => {
     }
 });
 
+/**
+ * 批量创建项目（Python 批量上传工具使用）
+ * 请求体: { projects: [...] }
+ */
+app.post('/api/projects/batch', async (req, res) => {
+    const projects = req.body && req.body.projects;
+    if (!Array.isArray(projects) || projects.length === 0) {
+        return res.status(400).json({
+            success: false,
+            error: {
+                code: 400,
+                message: '无效的批量请求',
+                details: '请求体必须包含非空的 projects 数组'
+            }
+        });
+    }
+
+    try {
+        const created = projects.map(createProject);
+        res.json({
+            success: true,
+            created: created.length,
+            ids: created.map(project => project.id)
+        });
+    } catch (error) {
+        console.error('批量创建项目失败:', error);
+        res.status(500).json({
+            error: '批量创建项目失败',
+            details: error.message
+        });
+    }
+});
+
+/**
+ * 分块上传超过请求体大小限制的单个项目
+ * 请求体: { upload_id, index, total, sha256, chunk }
+ * 所有分块到齐且SHA-256校验通过后创建项目
+ */
+const chunkedUploads = new Map();
+const CHUNKED_UPLOAD_TTL = 60 * 60 * 1000;
+
+app.post('/api/projects/chunks', async (req, res) => {
+    const { upload_id: uploadId, index, total, sha256, chunk } = req.body || {};
+    if (!uploadId || !Number.isInteger(index) || !Number.isInteger(total) ||
+        index < 0 || index >= total || typeof chunk !== 'string' || !sha256) {
+        return res.status(400).json({
+            success: false,
+            error: {
+                code: 400,
+                message: '无效的分块请求',
+                details: '需要 upload_id、index、total、sha256 和 chunk'
+            }
+        });
+    }
+
+    // 清理过期的未完成上传
+    const now = Date.now();
+    for (const [id, upload] of chunkedUploads) {
+        if (now - upload.startedAt > CHUNKED_UPLOAD_TTL) {
+            chunkedUploads.delete(id);
+        }
+    }
+
+    const upload = chunkedUploads.get(uploadId) || { startedAt: now, total, sha256, chunks: new Map() };
+    upload.chunks.set(index, chunk);
+    chunkedUploads.set(uploadId, upload);
+
+    if (upload.chunks.size < upload.total) {
+        return res.json({ success: true, complete: false, received: upload.chunks.size, total: upload.total });
+    }
+
+    chunkedUploads.delete(uploadId);
+    const payload = Array.from({ length: upload.total }, (_, i) => upload.chunks.get(i)).join('');
+    const digest = crypto.createHash('sha256').update(payload, 'utf8').digest('hex');
+    if (digest !== upload.sha256) {
+        return res.status(422).json({
+            success: false,
+            error: {
+                code: 422,
+                message: '分块校验失败',
+                details: '重组后的内容与 sha256 不一致'
+            }
+        });
+    }
+
+    try {
+        const project = createProject(JSON.parse(payload));
+        res.json({ success: true, complete: true, id: project.id });
+    } catch (error) {
+        res.status(400).json({
+            error: '分块内容不是有效的JSON',
+            details: error.message
+        });
+    }
+});
+
 /**
  * 生成单个模拟项目数据
  */
@@ -942,6 +1049,8 @@ async function startServer() {
             console.log(`🚀 GET  /api/projects - 获取项目列表 (支持分页、过滤、搜索)`);
             console.log(`🚀 GET  /api/projects/:id - 获取项目详情`);
             console.log(`🚀 POST /api/projects - 创建新项目`);
+            console.log(`🚀 POST /api/projects/batch - 批量创建项目`);
+            console.log(`🚀 POST /api/projects/chunks - 分块上传大型项目`);
             console.log(`🚀 GET  /api/stats - 获取平台统计`);
             console.log(`🚀 POST /api/auth/login - 用户登录`);
             console.log('🚀');
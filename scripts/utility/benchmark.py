@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark - 数据生成与签名流水线的性能基准
+
+覆盖：
+1. 各领域 generate_*_dataset 在多个规模下的生成、序列化、哈希、签名、验证和JSON导出
+2. generate_multiple_researches 的端到端耗时
+
+每个用例默认在独立的子进程中运行，峰值RSS只反映该用例本身。
+结果以JSON输出（含提交号、Python/NumPy版本和机器信息），可用 --compare 与另一次结果对比。
+
+用法：
+    python benchmark.py --sizes 1000,10000,100000 --output bench.json
+    python benchmark.py --compare baseline.json --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from canonical import canonical_digest
+from data_generator import DeSciDataGenerator, GENERATOR_VERSION
+
+DATASET_DOMAINS = ['climate_science', 'drug_discovery', 'ai_models', 'genomics']
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_RESEARCH_COUNT = 5
+BENCHMARK_SEED = 20240830
+
+# 对比时耗时变慢超过该比例视为回归
+REGRESSION_THRESHOLD = 0.10
+
+
+def _peak_rss_bytes() -> int:
+    """当前进程的峰值RSS（Linux 上 ru_maxrss 单位为KB，macOS 上为字节）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_dataset(domain: str, size: int, repeat: int = 1) -> Dict[str, Any]:
+    """单个数据集用例：各阶段取 repeat 次中的最短耗时"""
+    generator = DeSciDataGenerator(seed=BENCHMARK_SEED, verbose=False)
+    baseline_rss = _peak_rss_bytes()
+    best: Dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            dataset, generate_time = _timed(generator.generate_dataset, domain, size, seed=BENCHMARK_SEED)
+            serialized, serialize_time = _timed(json.dumps, dataset)
+            digest, hash_time = _timed(canonical_digest, dataset)
+            _, sign_time = _timed(generator.signer.sign, digest)
+            signed, sign_data_time = _timed(generator.sign_data, dataset)
+            valid, verify_time = _timed(generator.verify_signature, signed)
+            if not valid:
+                raise RuntimeError(f"{domain} 数据集签名验证失败")
+            _, export_time = _timed(generator.export_to_json, dataset, os.path.join(tmp, 'dataset.json'))
+
+            timings = {
+                'generate': generate_time,
+                'serialize': serialize_time,
+                'hash': hash_time,
+                'sign': sign_time,
+                'sign_data': sign_data_time,
+                'verify': verify_time,
+                'export_json': export_time
+            }
+            for stage, seconds in timings.items():
+                best[stage] = min(best.get(stage, seconds), seconds)
+            del dataset, serialized, signed
+
+    pipeline = best['generate'] + best['serialize'] + best['hash'] + best['sign']
+    return {
+        'case': f"dataset/{domain}/{size}",
+        'domain': domain,
+        'rows': size,
+        'seconds': best,
+        'split': {stage: best[stage] / pipeline for stage in ('generate', 'serialize', 'hash', 'sign')},
+        'rows_per_sec': {
+            'generate': size / best['generate'] if best['generate'] else None,
+            'pipeline': size / pipeline if pipeline else None
+        },
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'peak_rss_delta_bytes': _peak_rss_bytes() - baseline_rss
+    }
+
+
+def bench_researches(count: int, repeat: int = 1) -> Dict[str, Any]:
+    """generate_multiple_researches 用例（含签名）"""
+    generator = DeSciDataGenerator(seed=BENCHMARK_SEED, verbose=False)
+    generator.signer  # 提前生成密钥，不计入耗时
+    baseline_rss = _peak_rss_bytes()
+    best = None
+    for _ in range(repeat):
+        _, seconds = _timed(generator.generate_multiple_researches, count)
+        best = seconds if best is None else min(best, seconds)
+
+    return {
+        'case': f"researches/{count}",
+        'rows': count,
+        'seconds': {'total': best},
+        'rows_per_sec': {'pipeline': count / best if best else None},
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'peak_rss_delta_bytes': _peak_rss_bytes() - baseline_rss
+    }
+
+
+def _run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    if case['kind'] == 'dataset':
+        return bench_dataset(case['domain'], case['size'], case['repeat'])
+    return bench_researches(case['count'], case['repeat'])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """用于跨提交对比的运行环境信息"""
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'generator_version': GENERATOR_VERSION,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run_benchmarks(domains: List[str], sizes: List[int], research_count: int,
+                   repeat: int = 1, isolate: bool = True) -> Dict[str, Any]:
+    """运行全部用例；isolate=True 时每个用例在新的子进程中运行"""
+    cases = [
+        {'kind': 'dataset', 'domain': domain, 'size': size, 'repeat': repeat}
+        for domain in domains
+        for size in sizes
+    ]
+    if research_count:
+        cases.append({'kind': 'researches', 'count': research_count, 'repeat': repeat})
+
+    results = []
+    for case in cases:
+        if isolate:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_run_case, case).result()
+        else:
+            result = _run_case(case)
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    return {'environment': environment_info(), 'results': results}
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    rate = result['rows_per_sec']['pipeline']
+    rss = result['peak_rss_bytes'] / 1024 ** 2
+    line = f"{result['case']:<34} {rate:>14,.0f} rows/s  peak RSS {rss:8.1f} MiB"
+    if 'split' in result:
+        split = ' '.join(f"{stage} {share:.0%}" for stage, share in result['split'].items())
+        line += f"  [{split}]"
+    return line
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """按用例对比两次结果的吞吐，返回每个共同用例的变化（ratio > 1 表示变快）"""
+    baseline_cases = {result['case']: result for result in baseline['results']}
+    changes = []
+    for result in current['results']:
+        old = baseline_cases.get(result['case'])
+        if old is None or not old['rows_per_sec']['pipeline']:
+            continue
+        ratio = result['rows_per_sec']['pipeline'] / old['rows_per_sec']['pipeline']
+        changes.append({
+            'case': result['case'],
+            'ratio': ratio,
+            'regression': ratio < 1 - threshold
+        })
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='DeSci 数据生成与签名性能基准')
+    parser.add_argument('--domains', default=','.join(DATASET_DOMAINS), help='逗号分隔的领域列表')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='逗号分隔的数据集规模')
+    parser.add_argument('--researches', type=int, default=DEFAULT_RESEARCH_COUNT,
+                        help='generate_multiple_researches 的项目数（0 表示跳过）')
+    parser.add_argument('--repeat', type=int, default=1, help='每个用例重复次数，取最短耗时')
+    parser.add_argument('--in-process', action='store_true', help='在当前进程中运行所有用例（峰值RSS不再独立）')
+    parser.add_argument('--output', help='结果JSON文件')
+    parser.add_argument('--compare', help='用于对比的基准结果JSON文件')
+    args = parser.parse_args(argv)
+
+    print("⏱️  DeSci 性能基准")
+    print("=" * 60)
+    report = run_benchmarks(
+        domains=[domain for domain in args.domains.split(',') if domain],
+        sizes=[int(size) for size in args.sizes.split(',') if size],
+        research_count=args.researches,
+        repeat=args.repeat,
+        isolate=not args.in_process
+    )
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['comparison'] = {
+            'baseline_commit': baseline['environment'].get('git_commit'),
+            'changes': compare(report, baseline)
+        }
+        print("\n与基准对比：")
+        for change in report['comparison']['changes']:
+            marker = '❌' if change['regression'] else '✅'
+            print(f"{marker} {change['case']:<34} x{change['ratio']:.2f}")
+            if change['regression']:
+                regressions.append(change)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 结果已保存到 {args.output}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Bulk Uploader - 把生成的研究项目异步批量提交到后端API
+
+1. 基于 asyncio + aiohttp 连接池，并发请求数有上限
+2. 项目按条数和请求体大小打包后提交到 POST /api/projects/batch
+3. 单个项目超过请求体上限时拆成分块，提交到 POST /api/projects/chunks 由后端重组
+4. 429 和 5xx 响应按 Retry-After 重试（等待服务器要求的完整时长），没有该头时指数退避（带抖动）
+5. 已完成的项目序号写入检查点文件，失败后重新运行会跳过已上传的项目
+
+用法：
+    python bulk_uploader.py --url http://localhost:3000 --count 100000 --seed 42 \\
+        --key-path upload_key.pem --checkpoint upload.checkpoint.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import itertools
+import argparse
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from instrumentation import Metrics, NULL_METRICS
+
+BATCH_ENDPOINT = '/api/projects/batch'
+CHUNK_ENDPOINT = '/api/projects/chunks'
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+# 后端 express.json 的请求体上限为 10MB，留出余量
+DEFAULT_MAX_BODY_BYTES = 9 * 1024 * 1024
+# 服务器返回 413 时逐步减小请求体，最小到该值
+MIN_BODY_BYTES = 16 * 1024
+DEFAULT_MAX_RETRIES = 8
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 60.0
+DEFAULT_TIMEOUT = 120.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+ProgressCallback = Callable[[int, int], None]
+BundleSource = Union[Iterable[Dict[str, Any]], Callable[[int], Dict[str, Any]]]
+
+
+class UploadError(Exception):
+    """上传失败（重试次数用尽或服务器拒绝）"""
+
+
+class PayloadTooLarge(UploadError):
+    """服务器返回 413"""
+
+
+class UploadCheckpoint:
+    """
+    已上传项目的检查点
+
+    completed_through 之前的序号全部完成，done 保存其后已完成的零散序号（并发时批次可能乱序完成）。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.completed_through = 0
+        self.done: Set[int] = set()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.completed_through = state['completed_through']
+            self.done = set(state['done'])
+
+    def __contains__(self, index: int) -> bool:
+        return index < self.completed_through or index in self.done
+
+    def __len__(self) -> int:
+        return self.completed_through + len(self.done)
+
+    def mark(self, indices: Iterable[int]):
+        self.done.update(indices)
+        while self.completed_through in self.done:
+            self.done.remove(self.completed_through)
+            self.completed_through += 1
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'completed_through': self.completed_through, 'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+
+def _batch_body(payloads: List[bytes]) -> bytes:
+    """拼接已序列化的项目，不再重复序列化"""
+    return b'{"projects":[' + b','.join(payloads) + b']}'
+
+
+_BATCH_OVERHEAD = len(_batch_body([]))
+
+
+class BulkUploader:
+    """异步批量上传器"""
+
+    def __init__(self, base_url: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 concurrency: int = DEFAULT_CONCURRENCY, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX, timeout: float = DEFAULT_TIMEOUT,
+                 checkpoint_path: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+                 metrics: Optional[Metrics] = None, progress: Optional[ProgressCallback] = None):
+        if aiohttp is None:
+            raise ImportError("批量上传需要 aiohttp：pip install aiohttp")
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_body_bytes = max_body_bytes
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self.checkpoint = UploadCheckpoint(checkpoint_path)
+        self.metrics = metrics or NULL_METRICS
+        self.progress = progress
+        self.stats = {'uploaded': 0, 'skipped': 0, 'batches': 0, 'chunked': 0, 'retries': 0}
+
+    def run(self, bundles: BundleSource, count: Optional[int] = None) -> Dict[str, Any]:
+        """同步入口：asyncio.run(upload(...))"""
+        return asyncio.run(self.upload(bundles, count))
+
+    async def upload(self, bundles: BundleSource, count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        上传全部项目，返回统计信息
+
+        bundles 为项目的可迭代对象，或 index -> 项目 的函数（此时必须给出 count，
+        检查点中已完成的序号不会被生成）。失败时已完成的部分保存在检查点中，然后抛出 UploadError。
+        """
+        if callable(bundles) and count is None:
+            raise ValueError("按序号生成项目时必须指定 count")
+
+        started = time.perf_counter()
+        self.stats['skipped'] = len(self.checkpoint)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers) as session:
+            workers = [asyncio.create_task(self._worker(session, queue, count))
+                       for _ in range(self.concurrency)]
+            producer = asyncio.create_task(self._produce(bundles, count, queue))
+            try:
+                # 任何一个任务失败都立即停止其余任务
+                pending = {producer, *workers}
+                while pending:
+                    finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in finished:
+                        task.result()
+                    if producer in finished:
+                        for _ in workers:
+                            await queue.put(None)
+            finally:
+                for task in (producer, *workers):
+                    task.cancel()
+                await asyncio.gather(producer, *workers, return_exceptions=True)
+                self.checkpoint.save()
+
+        return {
+            **self.stats,
+            'total': count,
+            'seconds': time.perf_counter() - started,
+            'completed_through': self.checkpoint.completed_through
+        }
+
+    def _pending_payloads(self, bundles: BundleSource, count: Optional[int]) -> Iterator[Tuple[int, bytes]]:
+        """依次产生尚未上传的 (序号, 序列化后的项目)"""
+        if callable(bundles):
+            source = ((index, None) for index in range(count))
+        else:
+            source = enumerate(bundles)
+        for index, bundle in source:
+            if count is not None and index >= count:
+                break
+            if index in self.checkpoint:
+                continue
+            if bundle is None:
+                bundle = bundles(index)
+            yield index, json.dumps(bundle, ensure_ascii=False).encode('utf-8')
+
+    def _next_job(self, payloads: Iterator[Tuple[int, bytes]],
+                  carry: List[Tuple[int, bytes]]) -> Optional[Tuple[str, List[Tuple[int, bytes]]]]:
+        """在线程中打包下一个任务：('batch', 项目列表) 或 ('chunks', [单个超大项目])"""
+        # carry 中最多有一个上次放不下的项目，先处理它
+        pending = itertools.chain(carry[:], payloads)
+        carry.clear()
+        batch: List[Tuple[int, bytes]] = []
+        size = _BATCH_OVERHEAD
+        for index, payload in pending:
+            if _BATCH_OVERHEAD + len(payload) > self.max_body_bytes:
+                if batch:
+                    carry.append((index, payload))
+                    return 'batch', batch
+                return 'chunks', [(index, payload)]
+            # 第一个项目之后，每个项目前还有一个逗号分隔符
+            separator = 1 if batch else 0
+            if size + separator + len(payload) > self.max_body_bytes:
+                carry.append((index, payload))
+                return 'batch', batch
+            batch.append((index, payload))
+            size += separator + len(payload)
+            if len(batch) >= self.batch_size:
+                return 'batch', batch
+        if batch:
+            return 'batch', batch
+        return None
+
+    async def _produce(self, bundles: BundleSource, count: Optional[int], queue: asyncio.Queue):
+        """生成与序列化在线程中进行，与网络请求重叠"""
+        payloads = self._pending_payloads(bundles, count)
+        carry: List[Tuple[int, bytes]] = []
+        while True:
+            job = await asyncio.to_thread(self._next_job, payloads, carry)
+            if job is None:
+                return
+            await queue.put(job)
+
+    async def _worker(self, session: Any, queue: asyncio.Queue, count: Optional[int]):
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            kind, items = job
+            with self.metrics.timer('upload', kind=kind):
+                if kind == 'batch':
+                    await self._send_batch(session, items)
+                else:
+                    await self._send_chunks(session, *items[0])
+
+            self.checkpoint.mark(index for index, _ in items)
+            self.checkpoint.save()
+            self.stats['uploaded'] += len(items)
+            self.metrics.count('projects_uploaded', len(items))
+            if self.progress:
+                done = len(self.checkpoint)
+                self.progress(done, count or done)
+
+    async def _send_batch(self, session: Any, items: List[Tuple[int, bytes]]):
+        try:
+            await self._post(session, BATCH_ENDPOINT, _batch_body([payload for _, payload in items]))
+            self.stats['batches'] += 1
+        except PayloadTooLarge:
+            # 服务器的实际上限比配置的小：批次对半拆分，单个项目改为分块上传
+            if len(items) == 1:
+                await self._send_chunks(session, *items[0])
+                return
+            middle = len(items) // 2
+            await self._send_batch(session, items[:middle])
+            await self._send_batch(session, items[middle:])
+
+    async def _send_chunks(self, session: Any, index: int, payload: bytes):
+        """
+        把单个项目拆成分块依次上传
+
+        upload_id 由内容和分块大小决定，续传时与上次一致；服务器仍返回 413 时减小分块重新上传。
+        """
+        text = payload.decode('utf-8')
+        digest = hashlib.sha256(payload).hexdigest()
+        while True:
+            # 最坏情况下每个字符转义为6字节（\\uXXXX），按此保守估计每块的字符数
+            step = max((self.max_body_bytes - 512) // 6, 1)
+            pieces = [text[start:start + step] for start in range(0, len(text), step)]
+            upload_id = f"{digest[:32]}-{index}-{step}"
+            try:
+                for part, piece in enumerate(pieces):
+                    body = json.dumps({
+                        'upload_id': upload_id,
+                        'index': part,
+                        'total': len(pieces),
+                        'sha256': digest,
+                        'chunk': piece
+                    }).encode('utf-8')
+                    await self._post(session, CHUNK_ENDPOINT, body)
+                break
+            except PayloadTooLarge:
+                if self.max_body_bytes <= MIN_BODY_BYTES:
+                    raise
+                self.max_body_bytes = max(self.max_body_bytes // 2, MIN_BODY_BYTES)
+        self.stats['chunked'] += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """重试前的等待秒数：服务器给出 Retry-After（秒数或HTTP日期）时完整遵守，不受 backoff_max 限制"""
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * (0.5 + random.random() / 2)
+
+    async def _post(self, session: Any, path: str, body: bytes) -> Any:
+        """POST 请求，429/5xx/连接错误时退避重试"""
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with session.post(url, data=body) as response:
+                    if response.status < 300:
+                        return await response.json(content_type=None)
+                    if response.status == 413:
+                        raise PayloadTooLarge(f"请求体过大: {len(body)} 字节")
+                    if response.status not in RETRY_STATUSES:
+                        text = await response.text()
+                        raise UploadError(f"HTTP {response.status} {path}: {text[:200]}")
+                    retry_after = response.headers.get('Retry-After')
+                    reason = str(response.status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                reason = type(e).__name__
+
+            if attempt == self.max_retries:
+                break
+            self.stats['retries'] += 1
+            self.metrics.count('upload_retries', reason=reason)
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise UploadError(f"{path} 重试 {self.max_retries} 次后仍失败（最后一次: {reason}）")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import numpy as np
+    from data_generator import DeSciDataGenerator
+
+    parser = argparse.ArgumentParser(description='把生成的研究项目批量上传到 DeSci 后端API')
+    parser.add_argument('--url', default='http://localhost:3000', help='后端API地址')
+    parser.add_argument('--count', type=int, required=True, help='项目数量')
+    parser.add_argument('--seed', type=int, required=True, help='随机种子（续传时必须与上次相同）')
+    parser.add_argument('--key-path', help='签名私钥文件（不存在时生成）')
+    parser.add_argument('--commitment-key-path', help='聚合承诺密钥文件（不存在时生成），之后用它打开承诺')
+    parser.add_argument('--checkpoint', help='检查点文件')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--max-body-bytes', type=int, default=DEFAULT_MAX_BODY_BYTES)
+    args = parser.parse_args(argv)
+
+    generator = DeSciDataGenerator(seed=args.seed, key_path=args.key_path, verbose=False,
+                                   commitment_key_path=args.commitment_key_path)
+    entropy = np.random.SeedSequence(args.seed).entropy
+
+    def make_bundle(index: int) -> Dict[str, Any]:
+        # 与 generate_researches_sharded 相同的派生方式：第 index 个项目只由 (seed, index) 决定
+        return generator.generate_research_story(seed=np.random.SeedSequence(entropy, spawn_key=(index,)))
+
+    def progress(done: int, total: int):
+        print(f"\r📤 已上传 {done}/{total}", end='', flush=True)
+
+    uploader = BulkUploader(
+        args.url,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_body_bytes=args.max_body_bytes,
+        checkpoint_path=args.checkpoint,
+        progress=progress
+    )
+    try:
+        summary = uploader.run(make_bundle, args.count)
+    except UploadError as e:
+        print(f"\n❌ 上传失败: {e}")
+        if args.checkpoint:
+            print(f"已完成的进度保存在 {args.checkpoint}，重新运行相同命令即可续传")
+        return 1
+
+    print(f"\n✅ 上传完成: {summary['uploaded']} 个项目（跳过 {summary['skipped']} 个），"
+          f"{summary['batches']} 个批次，{summary['chunked']} 个分块项目，"
+          f"重试 {summary['retries']} 次，耗时 {summary['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Canonical - 数据集的规范二进制编码
+
+签名和哈希不再依赖 json.dumps(..., sort_keys=True)：
+1. 每个值带类型标签和长度前缀，编码唯一且可逆
+2. 同质列（数值、布尔、字符串）按类型化列块编码，直接哈希NumPy缓冲区
+3. NumPy标量与Python原生类型编码一致，浮点数按IEEE-754二进制编码，不受repr影响
+4. 逐行记录、列表字典和列式数组三种布局的数据集得到相同的 dataset_digest
+
+编码格式 (canonical-v1)：
+    None     'n'
+    bool     't' / 'f'
+    int      'i' + int64 LE（超出范围时 'I' + 长度 + 十进制）
+    float    'd' + float64 LE
+    str      's' + uint64 长度 + UTF-8
+    bytes    'b' + uint64 长度 + 原始字节
+    dict     'm' + uint64 个数 + 按键排序的 (键, 值)
+    list     'l' + uint64 个数 + 各元素
+    列块     'c' + 类型('f8'/'i8'/'b1'/'U ') + uint64 行数 + 缓冲区
+    表       'r' + uint64 列数 + 按列名排序的 (列名, 列块)
+"""
+
+import sys
+import json
+import struct
+import hashlib
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional
+
+# 哈希方案名称，写入已签名记录的 hash_scheme 字段
+HASH_SCHEME_CANONICAL = 'canonical-v1'
+HASH_SCHEME_JSON = 'json-sha256'
+
+# 没有 hash_scheme 字段的旧记录使用 json.dumps(sort_keys=True) 的SHA-256
+LEGACY_HASH_SCHEME = HASH_SCHEME_JSON
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+_NUMERIC_TYPES = {int, float, np.int64, np.int32, np.float64, np.float32}
+_INT_TYPES = {int, np.int64, np.int32}
+
+
+def _u64(value: int) -> bytes:
+    return struct.pack('<Q', value)
+
+
+def _is_categorical(value: Any) -> bool:
+    """是否为 pd.Categorical（不主动导入 pandas：未导入时不可能存在分类列）"""
+    pd = sys.modules.get('pandas')
+    return pd is not None and isinstance(value, pd.Categorical)
+
+
+def _as_column(values: Any) -> Optional[np.ndarray]:
+    """把一列值转换为可按缓冲区编码的NumPy数组；不是同质标量列时返回 None"""
+    if _is_categorical(values):
+        return np.array(values.categories.tolist(), dtype=str)[values.codes]
+    if not isinstance(values, (list, tuple, np.ndarray)) and hasattr(values, '__array__'):
+        # 可转换为数组的列视图（如 column_store.StringColumn）与等价的数组编码相同
+        values = np.asarray(values)
+    if isinstance(values, np.ndarray):
+        if values.ndim != 1:
+            return None
+        if values.dtype.kind == 'M':
+            # 日期时间按能精确表示所有值的最粗单位格式化，与存储精度无关
+            return np.datetime_as_string(values, unit='auto')
+        if values.dtype.kind in 'fiubU':
+            return values
+        values = values.tolist()
+
+    if not isinstance(values, (list, tuple)) or not values:
+        return None
+
+    kinds = set(map(type, values))
+    if kinds == {str}:
+        return np.asarray(values, dtype=str)
+    if kinds == {bool}:
+        return np.asarray(values, dtype=bool)
+    if kinds <= _INT_TYPES:
+        if min(values) < _INT64_MIN or max(values) > _INT64_MAX:
+            return None
+        return np.asarray(values, dtype=np.int64)
+    if kinds <= _NUMERIC_TYPES:
+        # 数值列中只要有浮点数，就统一按 float64 规范化
+        return np.asarray(values, dtype=np.float64)
+    return None
+
+
+def _column_block(column: np.ndarray) -> List[bytes]:
+    """把同质列编码为类型化列块"""
+    kind = column.dtype.kind
+    if kind == 'f':
+        tag, buffer = b'f8', column.astype('<f8', copy=False)
+    elif kind in 'iu':
+        tag, buffer = b'i8', column.astype('<i8', copy=False)
+    elif kind == 'b':
+        tag, buffer = b'b1', column.astype(np.uint8)
+    else:
+        # 字符串列：UCS-4 小端、按列内最长字符串补零
+        width = int(np.char.str_len(column).max()) if column.size else 0
+        tag, buffer = b'U ', column.astype(f'<U{max(width, 1)}', copy=False)
+        return [b'c', tag, _u64(column.size), _u64(width), np.ascontiguousarray(buffer).tobytes()]
+    return [b'c', tag, _u64(column.size), np.ascontiguousarray(buffer).tobytes()]
+
+
+def _record_columns(records: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """键集合相同的逐行记录转换为列；否则返回 None"""
+    if not records or not all(isinstance(record, dict) for record in records):
+        return None
+    names = list(records[0])
+    key_set = set(names)
+    if any(record.keys() != key_set for record in records):
+        return None
+    return {name: [record[name] for record in records] for name in names}
+
+
+class CanonicalEncoder:
+    """把Python/NumPy对象按 canonical-v1 编码，输出写入 write 回调"""
+
+    def __init__(self, write: Callable[[bytes], Any]):
+        self.write = write
+
+    def encode(self, value: Any):
+        write = self.write
+        if isinstance(value, np.generic):
+            value = value.item()
+
+        if value is None:
+            write(b'n')
+        elif value is True:
+            write(b't')
+        elif value is False:
+            write(b'f')
+        elif isinstance(value, int):
+            if _INT64_MIN <= value <= _INT64_MAX:
+                write(b'i' + struct.pack('<q', value))
+            else:
+                digits = str(value).encode()
+                write(b'I' + _u64(len(digits)) + digits)
+        elif isinstance(value, float):
+            write(b'd' + struct.pack('<d', value))
+        elif isinstance(value, str):
+            data = value.encode('utf-8')
+            write(b's' + _u64(len(data)) + data)
+        elif isinstance(value, (bytes, bytearray)):
+            write(b'b' + _u64(len(value)) + bytes(value))
+        elif isinstance(value, dict):
+            self.encode_mapping(value)
+        elif isinstance(value, (list, tuple, np.ndarray)) or _is_categorical(value):
+            self.encode_sequence(value)
+        elif hasattr(value, 'to_columns'):
+            # 表格对象（如 records.RecordTable）与等价的逐行记录编码相同
+            self.encode_table(value.to_columns())
+        else:
+            raise TypeError(f"无法规范编码的类型: {type(value).__name__}")
+
+    def encode_mapping(self, mapping: Dict[Any, Any]):
+        items = sorted((str(key), value) for key, value in mapping.items())
+        self.write(b'm' + _u64(len(items)))
+        for key, value in items:
+            self.encode(key)
+            self.encode(value)
+
+    def encode_sequence(self, values: Any):
+        column = _as_column(values)
+        if column is not None:
+            for piece in _column_block(column):
+                self.write(piece)
+            return
+
+        if isinstance(values, (list, tuple)):
+            columns = _record_columns(values)
+            if columns is not None:
+                self.encode_table(columns)
+                return
+        else:
+            values = np.asarray(values).tolist()
+
+        self.write(b'l' + _u64(len(values)))
+        for value in values:
+            self.encode(value)
+
+    def encode_table(self, columns: Dict[str, Any]):
+        """按列编码一张表（列名排序，每列尽量使用列块）"""
+        names = sorted(columns)
+        self.write(b'r' + _u64(len(names)))
+        for name in names:
+            self.encode(str(name))
+            self.encode_sequence(columns[name])
+
+
+def encode(value: Any) -> bytes:
+    """返回值的规范编码"""
+    pieces = []
+    CanonicalEncoder(pieces.append).encode(value)
+    return b''.join(pieces)
+
+
+def canonical_digest(value: Any) -> bytes:
+    """规范编码的SHA-256（流式计算，不构建完整编码）"""
+    digest = hashlib.sha256()
+    CanonicalEncoder(digest.update).encode(value)
+    return digest.digest()
+
+
+def json_digest(value: Any) -> bytes:
+    """旧版哈希：json.dumps(value, sort_keys=True) 的SHA-256，仅用于验证旧记录"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).digest()
+
+
+def payload_digest(value: Any, hash_scheme: str = HASH_SCHEME_CANONICAL) -> bytes:
+    """按哈希方案计算载荷哈希"""
+    if hash_scheme == HASH_SCHEME_CANONICAL:
+        return canonical_digest(value)
+    if hash_scheme == HASH_SCHEME_JSON:
+        return json_digest(value)
+    raise ValueError(f"不支持的哈希方案: {hash_scheme}")
+
+
+def dataset_digest(data: Any) -> bytes:
+    """
+    数据集内容哈希，与布局无关
+
+    逐行记录和表格对象会先转为列，再与列表字典、列式数组一样按表编码。
+    """
+    if isinstance(data, dict):
+        columns = data
+    elif hasattr(data, 'to_columns'):
+        columns = data.to_columns()
+    else:
+        columns = _record_columns(list(data))
+        if columns is None:
+            return canonical_digest(data)
+
+    digest = hashlib.sha256()
+    CanonicalEncoder(digest.update).encode_table(columns)
+    return digest.digest()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+DeSci CLI - 数据生成器的命令行入口
+
+子命令：
+    generate  生成数据集或研究项目，写入JSON
+    sign      对JSON文件中的数据签名
+    verify    验证已签名的数据（单个对象、列表、区块链导出格式或NDJSON）
+    export    分块生成数据集并导出为列存储、NPZ/Parquet或流式JSON（--commit 同时计算聚合承诺）
+    check     对照公开的聚合承诺检查打开的统计量
+    bench     性能基准（参数同 benchmark.py）
+
+模块顶层只导入标准库；每个子命令在执行时才导入需要的模块：
+verify 和 sign 不加载 pandas 和生成器，只有签名时才创建或加载密钥。
+可以用 python -X importtime cli.py verify ... 查看启动开销。
+
+用法：
+    python cli.py generate genomics --size 1000 --seed 42 -o genomics.json
+    python cli.py sign genomics.json -o genomics.signed.json --key-path signing_key.pem
+    python cli.py verify genomics.signed.json
+    python cli.py export genomics --size 10000000 --format column-store -o variants/ --commit \
+        --commitment-key-path commitment.key
+    python cli.py check variants/dataset.openings.json --commitments variants/dataset.commitments.json
+    python cli.py bench --sizes 1000,10000
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Optional
+
+# 与 data_generator 中的数据集领域一致（这里不导入生成器）
+DATASET_DOMAINS = ['climate_science', 'drug_discovery', 'ai_models', 'genomics']
+RESEARCHES = 'researches'
+
+EXPORT_FORMATS = ['column-store', 'npz', 'parquet', 'ndjson', 'json']
+
+
+def _make_generator(args: argparse.Namespace) -> Any:
+    from data_generator import DeSciDataGenerator
+    from instrumentation import metrics_from_env
+
+    return DeSciDataGenerator(
+        seed=args.seed,
+        key_path=getattr(args, 'key_path', None),
+        commitment_key_path=getattr(args, 'commitment_key_path', None),
+        verbose=args.verbose,
+        metrics=metrics_from_env()
+    )
+
+
+def _load_json(filename: str) -> Any:
+    with open(filename, encoding='utf-8') as f:
+        if not filename.endswith('.ndjson'):
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_json(data: Any, filename: Optional[str]):
+    if filename in (None, '-'):
+        json.dump(data, sys.stdout, ensure_ascii=False)
+        sys.stdout.write('\n')
+        return
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _signed_items(document: Any) -> List[Dict[str, Any]]:
+    """从文件内容中取出已签名对象"""
+    if isinstance(document, list):
+        return document
+    if isinstance(document, dict) and 'researches' in document:
+        return document['researches']
+    if isinstance(document, dict) and 'signature' in document:
+        return [document]
+    raise ValueError("文件中没有已签名的数据")
+
+
+def _progress(label: str):
+    def report(done: int, total: int):
+        print(f"\r{label} {done}/{total}", end='', file=sys.stderr, flush=True)
+    return report
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    generator = _make_generator(args)
+    output = args.output or f"{args.domain}.json"
+
+    if args.domain == RESEARCHES:
+        # 研究项目包含签名，会创建或加载密钥
+        researches = generator.iter_researches(args.size)
+        count = generator.export_to_blockchain_format_stream(
+            researches, output, progress=None if args.quiet else _progress('🔬'), total=args.size
+        )
+    else:
+        dataset = generator.generate_dataset(args.domain, args.size, seed=args.seed, compact=True)
+        if args.sign:
+            dataset = generator.sign_data(dataset)
+        generator.export_to_json(dataset, output)
+        count = args.size
+
+    generator.metrics.flush()
+    if not args.quiet:
+        print(f"\n✅ 已生成 {count} 条数据: {output}", file=sys.stderr)
+    return 0
+
+
+def cmd_sign(args: argparse.Namespace) -> int:
+    from signing import create_signer, load_or_create_signer, sign_payload
+
+    data = _load_json(args.input)
+    signer = (load_or_create_signer(args.key_path, args.scheme) if args.key_path
+              else create_signer(args.scheme))
+    signed = sign_payload(signer, data)
+    _write_json(signed, args.output)
+    if not args.quiet:
+        print(f"✅ 已签名 ({signer.scheme}) data_hash={signed['data_hash']}", file=sys.stderr)
+    return 0
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    from signing import verify_many
+
+    items = _signed_items(_load_json(args.input))
+    results = verify_many(items, workers=args.workers)
+    failed = [result for result in results if not result['valid']]
+    for result in failed:
+        print(f"❌ #{result['index']}: {result['error']}", file=sys.stderr)
+    if not args.quiet:
+        print(f"{'✅' if not failed else '❌'} {len(results) - len(failed)}/{len(results)} 个签名有效")
+    return 1 if failed else 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    generator = _make_generator(args)
+    progress = None if args.quiet else _progress('📦')
+
+    if args.format == 'column-store':
+        count = generator.export_to_column_store(args.domain, args.size, args.output,
+                                                 chunk_size=args.chunk_size, progress=progress,
+                                                 seed=args.seed, commitments=args.commit)
+    elif args.format in ('ndjson', 'json'):
+        count = generator.export_dataset_stream(args.domain, args.size, args.output, fmt=args.format,
+                                                chunk_size=args.chunk_size, progress=progress,
+                                                seed=args.seed, commitments=args.commit)
+    else:
+        if args.commit:
+            raise ValueError("--commit 只支持 column-store、ndjson 和 json 格式")
+        dataset = generator.generate_dataset(args.domain, args.size, columnar=True, seed=args.seed)
+        basename = os.path.splitext(args.output)[0]
+        generator.export_to_columnar(dataset, basename, fmt=args.format)
+        count = args.size
+
+    generator.metrics.flush()
+    if not args.quiet:
+        print(f"\n✅ 已导出 {count} 行: {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_check(args: argparse.Namespace) -> int:
+    from commitments import verify_opening
+
+    public = _load_json(args.commitments)
+    openings = _load_json(args.input)
+    if isinstance(openings, dict):
+        openings = [openings]
+    failed = 0
+    for opening in openings:
+        valid = verify_opening(opening, public)
+        failed += not valid
+        if not args.quiet or not valid:
+            print(f"{'✅' if valid else '❌'} {opening['column']}.{opening['statistic']} = {opening['value']}")
+    return 1 if failed else 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    import benchmark
+    return benchmark.main(args.bench_args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description='DeSci 数据生成、签名与验证工具')
+    parser.add_argument('-q', '--quiet', action='store_true', help='不输出进度和结果提示')
+    parser.add_argument('-v', '--verbose', action='store_true', help='打印生成器的日志')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='生成数据集或研究项目')
+    generate.add_argument('domain', choices=DATASET_DOMAINS + [RESEARCHES])
+    generate.add_argument('-n', '--size', type=int, default=1000, help='行数（researches 为项目数）')
+    generate.add_argument('--seed', type=int, help='随机种子')
+    generate.add_argument('-o', '--output', help='输出JSON文件（默认 <domain>.json）')
+    generate.add_argument('--sign', action='store_true', help='对数据集签名')
+    generate.add_argument('--key-path', help='签名私钥文件（不存在时生成）')
+    generate.add_argument('--commitment-key-path', help='研究项目聚合承诺的密钥文件（不存在时生成）')
+    generate.set_defaults(handler=cmd_generate)
+
+    sign = commands.add_parser('sign', help='对JSON文件中的数据签名')
+    sign.add_argument('input')
+    sign.add_argument('-o', '--output', help='输出文件（默认标准输出）')
+    sign.add_argument('--key-path', help='签名私钥文件（不存在时生成）')
+    sign.add_argument('--scheme', default='ed25519', choices=['ed25519', 'rsa-pss-sha256'])
+    sign.set_defaults(handler=cmd_sign)
+
+    verify = commands.add_parser('verify', help='验证已签名的数据')
+    verify.add_argument('input')
+    verify.add_argument('--workers', type=int, help='验证进程数（默认全部CPU）')
+    verify.set_defaults(handler=cmd_verify)
+
+    export = commands.add_parser('export', help='分块生成并导出数据集')
+    export.add_argument('domain', choices=DATASET_DOMAINS)
+    export.add_argument('-n', '--size', type=int, required=True, help='行数')
+    export.add_argument('-o', '--output', required=True, help='输出文件或目录（column-store）')
+    export.add_argument('--format', default='column-store', choices=EXPORT_FORMATS)
+    export.add_argument('--chunk-size', type=int, default=100_000)
+    export.add_argument('--seed', type=int, help='随机种子')
+    export.add_argument('--commit', action='store_true', help='同时计算各列聚合统计的承诺')
+    export.add_argument('--commitment-key-path', help='承诺密钥文件（不存在时生成）')
+    export.set_defaults(handler=cmd_export)
+
+    check = commands.add_parser('check', help='检查打开的聚合统计量')
+    check.add_argument('input', help='打开信息JSON（单个对象或列表）')
+    check.add_argument('--commitments', required=True, help='公开的承诺JSON')
+    check.set_defaults(handler=cmd_check)
+
+    bench = commands.add_parser('bench', help='性能基准（其余参数传给 benchmark.py）', add_help=False)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    # bench 的参数（包括 --help）原样交给 benchmark.py 解析，其余子命令不接受未知参数
+    args, extra = parser.parse_known_args(argv)
+    if args.command == 'bench':
+        args.bench_args = extra[1:] if extra[:1] == ['--'] else extra
+    elif extra:
+        parser.error(f"无法识别的参数: {' '.join(extra)}")
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
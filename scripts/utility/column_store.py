@@ -0,0 +1,311 @@
+"""
+Column Store - 内存映射的定长列存储
+
+每个数据集写入一个目录：
+    manifest.json             行数与各列的类型、编码和文件名
+    <列名>.bin                定长列（数值、日期）的原始小端缓冲区
+    <列名>.codes.bin          分类列的 int32 编码，取值表保存在 manifest 中
+    <列名>.offsets.bin        变长字符串列（SMILES、ID等）的 uint64 偏移索引
+    <列名>.data.bin           变长字符串列的 UTF-8 字节
+
+读取时所有文件都通过 np.memmap 映射，按行或按列切片不需要加载整个文件，
+随机访问第 N 行是 O(1) 的。
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+MANIFEST_FILE = 'manifest.json'
+STORE_VERSION = 1
+
+KIND_FIXED = 'fixed'
+KIND_CATEGORICAL = 'categorical'
+KIND_STRING = 'string'
+
+_CODES_DTYPE = '<i4'
+_OFFSETS_DTYPE = '<u8'
+
+
+def _fixed_dtype(dtype: np.dtype) -> str:
+    """定长列在磁盘上使用的小端类型"""
+    if dtype.kind == 'b':
+        return '|b1'
+    return dtype.newbyteorder('<').str
+
+
+class ColumnStoreWriter:
+    """按块追加写入列存储，内存占用只取决于单个分块的大小"""
+
+    def __init__(self, path: str, metadata: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.num_rows = 0
+        self._columns: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Any] = {}
+        os.makedirs(path, exist_ok=True)
+
+    def __enter__(self) -> 'ColumnStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open(self, filename: str):
+        if filename not in self._files:
+            self._files[filename] = open(os.path.join(self.path, filename), 'wb')
+        return self._files[filename]
+
+    def append(self, columns: Dict[str, Any]):
+        """追加一个列式分块（各列行数必须相同）"""
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("分块中各列的行数不一致")
+        if self._columns and list(columns) != list(self._columns):
+            raise ValueError("分块的列与已写入的列不一致")
+
+        for name, column in columns.items():
+            spec = self._columns.get(name) or self._new_spec(name, column)
+            self._columns[name] = spec
+            if spec['kind'] == KIND_CATEGORICAL:
+                self._append_categorical(spec, column)
+            elif spec['kind'] == KIND_STRING:
+                self._append_strings(spec, column)
+            else:
+                values = np.ascontiguousarray(column, dtype=spec['dtype'])
+                self._open(spec['file']).write(values.tobytes())
+
+        self.num_rows += lengths.pop() if lengths else 0
+
+    def _new_spec(self, name: str, column: Any) -> Dict[str, Any]:
+        if isinstance(column, pd.Categorical):
+            return {
+                'name': name,
+                'kind': KIND_CATEGORICAL,
+                'file': f"{name}.codes.bin",
+                'dtype': _CODES_DTYPE,
+                'categories': []
+            }
+
+        array = np.asarray(column)
+        if array.dtype.kind in 'UO':
+            # 偏移索引以 0 开头，第 i 行的字节范围为 [offsets[i], offsets[i+1])
+            self._open(f"{name}.offsets.bin").write(np.zeros(1, dtype=_OFFSETS_DTYPE).tobytes())
+            return {
+                'name': name,
+                'kind': KIND_STRING,
+                'offsets_file': f"{name}.offsets.bin",
+                'data_file': f"{name}.data.bin",
+                'data_bytes': 0
+            }
+        return {
+            'name': name,
+            'kind': KIND_FIXED,
+            'file': f"{name}.bin",
+            'dtype': _fixed_dtype(array.dtype)
+        }
+
+    def _append_categorical(self, spec: Dict[str, Any], column: pd.Categorical):
+        categories = spec['categories']
+        chunk_categories = [str(value) for value in column.categories]
+        codes = np.asarray(column.codes)
+        if not categories:
+            categories.extend(chunk_categories)
+        if chunk_categories != categories[:len(chunk_categories)]:
+            # 分块的取值表与已有取值表不同：把编码映射到合并后的取值表
+            positions = {value: index for index, value in enumerate(categories)}
+            for value in chunk_categories:
+                if value not in positions:
+                    positions[value] = len(categories)
+                    categories.append(value)
+            mapping = np.array([positions[value] for value in chunk_categories], dtype=np.int64)
+            codes = mapping[codes]
+        self._open(spec['file']).write(codes.astype(_CODES_DTYPE).tobytes())
+
+    def _append_strings(self, spec: Dict[str, Any], column: Any):
+        encoded = [str(value).encode('utf-8') for value in np.asarray(column).tolist()]
+        lengths = np.fromiter(map(len, encoded), dtype=np.uint64, count=len(encoded))
+        offsets = spec['data_bytes'] + np.cumsum(lengths, dtype=np.uint64)
+        self._open(spec['offsets_file']).write(offsets.astype(_OFFSETS_DTYPE).tobytes())
+        self._open(spec['data_file']).write(b''.join(encoded))
+        spec['data_bytes'] = int(offsets[-1]) if len(offsets) else spec['data_bytes']
+
+    def close(self):
+        """关闭数据文件并写入 manifest"""
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+        manifest = {
+            'version': STORE_VERSION,
+            'num_rows': self.num_rows,
+            'columns': list(self._columns.values()),
+            'metadata': self.metadata
+        }
+        with open(os.path.join(self.path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def write_column_store(chunks: Iterable[Dict[str, Any]], path: str,
+                       metadata: Optional[Dict[str, Any]] = None) -> int:
+    """把列式分块依次写入列存储，返回总行数"""
+    with ColumnStoreWriter(path, metadata) as writer:
+        for chunk in chunks:
+            writer.append(chunk)
+    return writer.num_rows
+
+
+class StringColumn:
+    """变长字符串列的零拷贝视图：偏移索引和字节数据均为内存映射"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, index: int) -> memoryview:
+        """第 index 行的UTF-8字节（不拷贝）"""
+        start, stop = int(self.offsets[index]), int(self.offsets[index + 1])
+        return memoryview(self.data)[start:stop]
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                # 连续切片共享同一份字节数据，只截取偏移索引（零拷贝）
+                return StringColumn(self.offsets[start:max(start, stop) + 1], self.data)
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"行号越界: {index}")
+        return bytes(self.raw(index)).decode('utf-8')
+
+    def tolist(self) -> List[str]:
+        """解码为Python字符串列表（一次读取整段字节）"""
+        if not len(self):
+            return []
+        base = int(self.offsets[0])
+        blob = bytes(memoryview(self.data)[base:int(self.offsets[-1])])
+        bounds = (np.asarray(self.offsets) - base).tolist()
+        return [blob[start:stop].decode('utf-8') for start, stop in zip(bounds, bounds[1:])]
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        return np.array(self.tolist(), dtype=dtype or str)
+
+
+def _memmap(path: str, dtype: str) -> np.ndarray:
+    """只读映射文件；空文件无法映射，返回空数组"""
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+class ColumnStore:
+    """列存储读取器：按需映射列文件，支持 O(1) 行访问和零拷贝切片"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.num_rows = self.manifest['num_rows']
+        self.metadata = self.manifest.get('metadata', {})
+        self._specs = {spec['name']: spec for spec in self.manifest['columns']}
+        self._columns: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._specs)
+
+    def column(self, name: str) -> Any:
+        """
+        返回一列的内存映射视图
+
+        定长列返回 np.memmap，分类列返回编码的 np.memmap（取值表见 categories()），
+        字符串列返回 StringColumn。
+        """
+        if name not in self._columns:
+            spec = self._specs[name]
+            if spec['kind'] == KIND_STRING:
+                self._columns[name] = StringColumn(
+                    _memmap(os.path.join(self.path, spec['offsets_file']), _OFFSETS_DTYPE),
+                    _memmap(os.path.join(self.path, spec['data_file']), '|u1')
+                )
+            else:
+                self._columns[name] = _memmap(os.path.join(self.path, spec['file']), spec['dtype'])
+        return self._columns[name]
+
+    def views(self, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        各列的整列视图（不解码字符串）
+
+        定长列为 np.memmap，分类列为 pd.Categorical，字符串列为 StringColumn。
+        """
+        result = {}
+        for name in (columns or self.column_names):
+            spec = self._specs[name]
+            column = self.column(name)
+            if spec['kind'] == KIND_CATEGORICAL:
+                column = pd.Categorical.from_codes(column, categories=spec['categories'])
+            result[name] = column
+        return result
+
+    def categories(self, name: str) -> List[str]:
+        return self._specs[name]['categories']
+
+    def _value(self, name: str, index: int) -> Any:
+        spec = self._specs[name]
+        value = self.column(name)[index]
+        if spec['kind'] == KIND_CATEGORICAL:
+            return spec['categories'][value]
+        if spec['kind'] == KIND_FIXED:
+            if spec['dtype'].lstrip('<>|').startswith('M8'):
+                return np.datetime_as_string(value, unit='auto')
+            return value.item()
+        return value
+
+    def row(self, index: int, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """读取第 index 行（O(1)，只触及该行所在的页）"""
+        if index < 0:
+            index += self.num_rows
+        if not 0 <= index < self.num_rows:
+            raise IndexError(f"行号越界: {index}")
+        return {name: self._value(name, index) for name in (columns or self.column_names)}
+
+    def slice(self, start: int, stop: int, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        按行切片，返回列式数据
+
+        定长列和分类编码是内存映射上的视图，字符串列为共享字节数据的 StringColumn，均不拷贝数据。
+        """
+        result = {}
+        for name in (columns or self.column_names):
+            spec = self._specs[name]
+            column = self.column(name)
+            if spec['kind'] == KIND_CATEGORICAL:
+                result[name] = pd.Categorical.from_codes(column[start:stop], categories=spec['categories'])
+            else:
+                result[name] = column[start:stop]
+        return result
+
+    def read(self, name: str, start: int, stop: int) -> np.ndarray:
+        """
+        用普通文件读取定长列的一段行，返回内存中的数组
+
+        不经过内存映射，顺序扫描整列时读过的页不会留在进程的常驻内存中。
+        """
+        spec = self._specs[name]
+        if spec['kind'] != KIND_FIXED:
+            raise ValueError(f"只能按段读取定长列: {name}")
+        dtype = np.dtype(spec['dtype'])
+        start, stop = max(start, 0), min(stop, self.num_rows)
+        with open(os.path.join(self.path, spec['file']), 'rb') as f:
+            f.seek(start * dtype.itemsize)
+            return np.fromfile(f, dtype=dtype, count=max(stop - start, 0))
@@ -0,0 +1,144 @@
+"""
+Columnar IO - 数据集的列式文件读写
+
+支持两种格式：
+1. Parquet（需要 pyarrow 或 fastparquet）：类型化列、字典编码分类列、zstd压缩
+2. NPZ（仅依赖NumPy）：每列一个压缩数组，分类列拆成编码和取值表
+
+两种格式都可以只读取需要的列，无需加载整个数据集。
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Collection, Dict, List, Optional
+
+FORMAT_PARQUET = 'parquet'
+FORMAT_NPZ = 'npz'
+
+# NPZ中分类列的编码和取值表使用的键后缀
+_CODES_SUFFIX = '.codes'
+_CATEGORIES_SUFFIX = '.categories'
+
+# 字符串列的唯一值不超过行数的该比例时按字典编码保存
+DICTIONARY_RATIO = 0.5
+
+
+def parquet_available() -> bool:
+    """当前环境是否安装了 Parquet 引擎"""
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def to_columns(data: Any, categorical: Optional[Collection[str]] = None,
+               dates: Collection[str] = ()) -> Dict[str, Any]:
+    """
+    把任意布局的数据转换为类型化的列
+
+    数值列转为NumPy数组；低基数字符串列转为分类列（字典编码），其余字符串列保持字符串数组。
+    给出 categorical 时只对其中的列字典编码，dates 中的列转为 datetime64，
+    这样同一份数据无论是记录、列表还是数组布局，都得到相同的列类型。
+    """
+    if hasattr(data, 'to_columns'):
+        data = data.to_columns()
+    elif not isinstance(data, dict):
+        records = list(data)
+        names = list(records[0]) if records else []
+        data = {name: [record[name] for record in records] for name in names}
+
+    columns = {}
+    for name, values in data.items():
+        if name in dates:
+            columns[name] = np.asarray(values, dtype='datetime64')
+            continue
+        if isinstance(values, pd.Categorical) and (categorical is None or name in categorical):
+            columns[name] = values
+            continue
+        array = np.asarray(values)
+        if array.dtype.kind in 'UO':
+            codes, uniques = pd.factorize(array)
+            if (name in categorical if categorical is not None
+                    else len(uniques) <= max(1, DICTIONARY_RATIO * len(array))):
+                columns[name] = pd.Categorical.from_codes(codes, categories=uniques.astype(str))
+                continue
+            array = array.astype(str)
+        columns[name] = array
+    return columns
+
+
+def column_schema(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """描述各列的类型与编码方式"""
+    schema = []
+    for name, column in columns.items():
+        if isinstance(column, pd.Categorical):
+            schema.append({
+                'name': name,
+                'dtype': 'string',
+                'encoding': 'dictionary',
+                'categories': len(column.categories)
+            })
+        else:
+            dtype = 'string' if column.dtype.kind == 'U' else str(column.dtype)
+            schema.append({'name': name, 'dtype': dtype, 'encoding': 'plain'})
+    return schema
+
+
+def file_sha256(path: str) -> str:
+    """按块计算文件的SHA-256（十六进制）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_parquet(columns: Dict[str, Any], filename: str, compression: str = 'zstd'):
+    """写入Parquet文件，分类列自动使用字典编码"""
+    if not parquet_available():
+        raise ValueError("未安装 Parquet 引擎（pyarrow 或 fastparquet），请改用 npz 格式")
+    pd.DataFrame(columns).to_parquet(filename, compression=compression, index=False)
+
+
+def write_npz(columns: Dict[str, Any], filename: str):
+    """写入压缩的NPZ文件"""
+    arrays = {}
+    for name, column in columns.items():
+        if isinstance(column, pd.Categorical):
+            arrays[name + _CODES_SUFFIX] = column.codes
+            arrays[name + _CATEGORIES_SUFFIX] = np.array(column.categories.tolist(), dtype=str)
+        else:
+            # 对象数组（如SMILES）按字符串保存，读取时无需 allow_pickle
+            column = np.asarray(column)
+            arrays[name] = column.astype(str) if column.dtype.kind == 'O' else column
+    np.savez_compressed(filename, **arrays)
+
+
+def read_columns(filename: str, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """读取列式文件中的全部或部分列"""
+    if filename.endswith('.' + FORMAT_PARQUET):
+        frame = pd.read_parquet(filename, columns=columns)
+        return {name: (frame[name].array if isinstance(frame[name].dtype, pd.CategoricalDtype)
+                       else frame[name].to_numpy())
+                for name in frame.columns}
+
+    result = {}
+    with np.load(filename, allow_pickle=False) as npz:
+        names = []
+        for key in npz.files:
+            name = key.rsplit('.', 1)[0] if key.endswith((_CODES_SUFFIX, _CATEGORIES_SUFFIX)) else key
+            if name not in names:
+                names.append(name)
+        for name in (columns if columns is not None else names):
+            if name + _CODES_SUFFIX in npz.files:
+                result[name] = pd.Categorical.from_codes(
+                    npz[name + _CODES_SUFFIX],
+                    categories=npz[name + _CATEGORIES_SUFFIX]
+                )
+            else:
+                result[name] = npz[name]
+    return result
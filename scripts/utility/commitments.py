@@ -0,0 +1,244 @@
+"""
+Commitments - 数据集聚合统计的加盐哈希承诺
+
+生成数据的同一遍流式处理中逐块累加每列的聚合统计，然后对每个统计量分别做承诺：
+1. 数值列：count、sum（浮点数按 SUM_DECIMALS 位定点数精确累加，与分块方式无关）、min、max
+2. 分类列：count 与每个取值的行数 count[取值]；日期列：count、min、max；其余字符串列：count
+3. 承诺 = SHA-256(标签 + 盐 + 规范编码的陈述 {column, statistic, value})，
+   每个统计量的盐由私有密钥对 (nonce, 列名, 统计量) 做 HMAC 派生
+4. 全部承诺按 (列名, 统计量) 排序后作为叶子构建 Merkle 树，只需公开或上链一个根哈希
+
+公开部分（public()）只包含承诺和根哈希，不泄露任何统计值。
+数据所有者之后可以单独打开某个统计量（opening()），第三方用 verify_opening 对照
+公开的承诺和根哈希检查该值，无需下载数据行，也看不到未打开的其他统计量。
+打开承诺需要生成时的私有密钥，用 load_or_create_commitment_key 把它保存在磁盘上。
+"""
+
+import os
+import hmac
+import hashlib
+import secrets
+import numpy as np
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from canonical import canonical_digest
+from merkle_tree import MerkleTree
+
+COMMITMENT_SCHEME = 'sha256-salted-v1'
+_COMMITMENT_TAG = b'desci-aggregate-commitment-v1'
+
+# 浮点列的和按该位数的定点整数精确累加
+SUM_DECIMALS = 6
+_SUM_SCALE = 10 ** SUM_DECIMALS
+# 定点累加时每块的行数，以及浮点值绝对值的上限（保证块内 int64 求和不溢出）
+_SUM_BLOCK = 4096
+_FLOAT_SUM_LIMIT = float(2 ** 31)
+
+NONCE_BYTES = 16
+KEY_BYTES = 32
+
+
+def load_or_create_commitment_key(path: str) -> bytes:
+    """密钥文件存在时加载，否则生成新密钥并保存（仅所有者可读），使承诺可以跨运行打开"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            key = f.read()
+        if len(key) != KEY_BYTES:
+            raise ValueError(f"承诺密钥文件长度应为 {KEY_BYTES} 字节: {path}")
+        return key
+    key = secrets.token_bytes(KEY_BYTES)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def commitment_salt(key: bytes, nonce: bytes, column: str, statistic: str) -> bytes:
+    """由私有密钥派生某个统计量的盐"""
+    message = nonce + column.encode('utf-8') + b'\x00' + statistic.encode('utf-8')
+    return hmac.new(key, message, hashlib.sha256).digest()
+
+
+def statement(column: str, statistic: str, value: Any) -> Dict[str, Any]:
+    """被承诺的陈述"""
+    return {'column': column, 'statistic': statistic, 'value': value}
+
+
+def commit(salt: bytes, claim: Dict[str, Any]) -> bytes:
+    """对陈述做加盐哈希承诺"""
+    return hashlib.sha256(_COMMITMENT_TAG + salt + canonical_digest(claim)).digest()
+
+
+def _fixed_point_sum(values: np.ndarray) -> int:
+    """浮点数组按 SUM_DECIMALS 位定点数的精确和（Python 整数）"""
+    if not values.size:
+        return 0
+    if np.abs(values).max() >= _FLOAT_SUM_LIMIT:
+        raise ValueError(f"浮点值超出定点累加范围: |x| >= {_FLOAT_SUM_LIMIT:.0f}")
+    scaled = np.rint(values * _SUM_SCALE).astype(np.int64)
+    blocks = np.add.reduceat(scaled, np.arange(0, scaled.size, _SUM_BLOCK))
+    return sum(int(block) for block in blocks.tolist())
+
+
+class ColumnAggregate:
+    """单列的流式聚合统计"""
+
+    def __init__(self):
+        self.kind: Optional[str] = None
+        self.count = 0
+        self.total = 0
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.value_counts: Dict[str, int] = {}
+
+    def _extend_range(self, low: Any, high: Any):
+        if self.minimum is None or low < self.minimum:
+            self.minimum = low
+        if self.maximum is None or high > self.maximum:
+            self.maximum = high
+
+    def update(self, column: Any):
+        """累加一块数据"""
+        if hasattr(column, 'codes') and hasattr(column, 'categories'):
+            self.kind = 'categorical'
+            codes = np.asarray(column.codes)
+            counts = np.bincount(codes[codes >= 0], minlength=len(column.categories))
+            for value, count in zip(column.categories.tolist(), counts.tolist()):
+                if count:
+                    self.value_counts[str(value)] = self.value_counts.get(str(value), 0) + count
+            self.count += len(codes)
+            return
+
+        values = np.asarray(column)
+        self.count += values.size
+        kind = values.dtype.kind
+        if kind == 'f':
+            self.kind = 'float'
+            self.total += _fixed_point_sum(values)
+        elif kind in 'iu':
+            self.kind = 'integer'
+            self.total += int(values.sum(dtype=np.int64))
+        elif kind == 'b':
+            self.kind = 'boolean'
+            self.total += int(np.count_nonzero(values))
+            return
+        elif kind == 'M':
+            self.kind = 'date'
+        else:
+            self.kind = 'string'
+            return
+        if values.size:
+            self._extend_range(values.min(), values.max())
+
+    def statistics(self) -> Dict[str, Any]:
+        """统计量名 → 取值（均为可规范编码的原生类型）"""
+        stats: Dict[str, Any] = {'count': self.count}
+        if self.kind == 'categorical':
+            for value in sorted(self.value_counts):
+                stats[f"count[{value}]"] = self.value_counts[value]
+        elif self.kind in ('float', 'integer', 'boolean'):
+            stats['sum'] = (format(Decimal(self.total).scaleb(-SUM_DECIMALS), 'f')
+                            if self.kind == 'float' else self.total)
+        if self.minimum is not None:
+            if self.kind == 'date':
+                stats['min'] = str(np.datetime_as_string(self.minimum, unit='auto'))
+                stats['max'] = str(np.datetime_as_string(self.maximum, unit='auto'))
+            else:
+                stats['min'] = self.minimum.item()
+                stats['max'] = self.maximum.item()
+        return stats
+
+
+class AggregateAccumulator:
+    """按块累加整个数据集各列的聚合统计"""
+
+    def __init__(self):
+        self.columns: Dict[str, ColumnAggregate] = {}
+        self.num_rows = 0
+
+    def update(self, columns: Dict[str, Any]):
+        """累加一块列式数据"""
+        for name, column in columns.items():
+            self.columns.setdefault(name, ColumnAggregate()).update(column)
+        if columns:
+            self.num_rows += len(next(iter(columns.values())))
+
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        """列名 → {统计量名: 取值}"""
+        return {name: aggregate.statistics() for name, aggregate in self.columns.items()}
+
+    def commit(self, key: bytes, nonce: Optional[bytes] = None) -> 'AggregateCommitments':
+        """对全部统计量做承诺；nonce 为空时随机生成"""
+        return AggregateCommitments(self.statistics(), key, nonce or secrets.token_bytes(NONCE_BYTES),
+                                    self.num_rows)
+
+
+class AggregateCommitments:
+    """
+    一个数据集的聚合承诺
+
+    持有统计值和私有密钥（用于打开承诺）；public() 只导出可公开的承诺和Merkle根。
+    """
+
+    def __init__(self, statistics: Dict[str, Dict[str, Any]], key: bytes, nonce: bytes, num_rows: int):
+        self.statistics = statistics
+        self.nonce = nonce
+        self.num_rows = num_rows
+        self._key = key
+
+        self.leaves: List[Tuple[str, str]] = sorted(
+            (column, statistic) for column, stats in statistics.items() for statistic in stats
+        )
+        self._positions = {leaf: i for i, leaf in enumerate(self.leaves)}
+        self.commitments = [
+            commit(self._salt(column, statistic), statement(column, statistic, statistics[column][statistic]))
+            for column, statistic in self.leaves
+        ]
+        self.tree = MerkleTree(self.commitments)
+
+    def _salt(self, column: str, statistic: str) -> bytes:
+        return commitment_salt(self._key, self.nonce, column, statistic)
+
+    def public(self) -> Dict[str, Any]:
+        """可公开的部分：承诺、Merkle根和行数，不含任何统计值"""
+        commitments: Dict[str, Dict[str, str]] = {}
+        for (column, statistic), commitment in zip(self.leaves, self.commitments):
+            commitments.setdefault(column, {})[statistic] = commitment.hex()
+        return {
+            'scheme': COMMITMENT_SCHEME,
+            'sum_decimals': SUM_DECIMALS,
+            'nonce': self.nonce.hex(),
+            'num_rows': self.num_rows,
+            'root': self.tree.root_hex,
+            'commitments': commitments
+        }
+
+    def opening(self, column: str, statistic: str) -> Dict[str, Any]:
+        """打开一个统计量：陈述、盐和Merkle包含证明"""
+        index = self._positions.get((column, statistic))
+        if index is None:
+            raise KeyError(f"没有该统计量的承诺: {column}.{statistic}")
+        return {
+            **statement(column, statistic, self.statistics[column][statistic]),
+            'salt': self._salt(column, statistic).hex(),
+            'proof': self.tree.proof(index)
+        }
+
+    def openings(self) -> List[Dict[str, Any]]:
+        """全部统计量的打开信息（私有，只交给需要核对的一方）"""
+        return [self.opening(column, statistic) for column, statistic in self.leaves]
+
+
+def verify_opening(opening: Dict[str, Any], public: Dict[str, Any]) -> bool:
+    """对照公开的承诺与Merkle根，检查被打开的统计值"""
+    if public.get('scheme') != COMMITMENT_SCHEME:
+        return False
+    column, statistic = opening['column'], opening['statistic']
+    expected = public['commitments'].get(column, {}).get(statistic)
+    if expected is None:
+        return False
+    commitment = commit(bytes.fromhex(opening['salt']), statement(column, statistic, opening['value']))
+    if commitment.hex() != expected:
+        return False
+    return MerkleTree.verify_proof(commitment, opening['proof'], bytes.fromhex(public['root']))
@@ -12,18 +12,328 @@ DeSci Data Generator - 去中心化科学研究数据生成器
 5. 实现数据签名和验证
 """
 
+import os
 import json
 import hashlib
+import logging
+import zlib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
 import secrets
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import serialization
-import base64
+
+from canonical import canonical_digest, dataset_digest
+from commitments import KEY_BYTES, AggregateAccumulator, AggregateCommitments, load_or_create_commitment_key
+from columnar_io import (
+    FORMAT_PARQUET, FORMAT_NPZ, file_sha256, parquet_available, to_columns, column_schema,
+    write_parquet, write_npz
+)
+from column_store import ColumnStore, ColumnStoreWriter
+from generation_cache import GenerationCache, cache_key
+from genome import (
+    BASES, GENE_LOCI, REFERENCE_GENOME, REGION_INDEX_FILE, RegionIndex, VariantLayout,
+    alternate_bases, genes_at, reference_bases, sample_substitutions
+)
+from instrumentation import Metrics, NULL_METRICS, metrics_from_env
+from merkle_tree import MerkleTree
+from records import RecordTable
+from smiles import build_molecules, sample_molecule_draws
+from summaries import SummaryAccumulator, save_sidecars, write_sidecars
+from stat_models import (
+    CorrelatedModel, Categorical, Integers, LogUniform, Normal, Uniform, zipf_weights
+)
+from signing import (
+    Signer, DEFAULT_SCHEME, create_signer, load_or_create_signer, sign_payload, signer_from_pem,
+    verify_signed_item, verify_many, public_key_fingerprint
+)
+
+
+# 生成器版本：随机数的使用方式改变时递增，(seed, domain, size, version) 唯一确定生成的数据
+GENERATOR_VERSION = '2.9'
+
+logger = logging.getLogger(__name__)
+
+# 随机种子：整数、SeedSequence、现成的 Generator，或 None（使用系统熵）
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+# 研究故事中各领域数据集的默认规模（其余领域使用基因组学数据集）
+STORY_DATASET_SIZES = {
+    'climate_science': 500,
+    'drug_discovery': 200,
+    'ai_models': 1000,
+    'genomics': 100
+}
+
+# 各领域分类字段的取值表
+DRUG_TARGET_PROTEINS = [
+    'EGFR', 'BRAF', 'CDK4', 'mTOR', 'PI3K', 'MEK1',
+    'ALK', 'ROS1', 'RET', 'MET', 'HER2', 'BRCA1'
+]
+DRUG_DISEASE_TARGETS = [
+    'Non-small cell lung cancer',
+    'Melanoma',
+    'Breast cancer',
+    'Colorectal cancer',
+    'Glioblastoma',
+    'Acute myeloid leukemia'
+]
+AI_CATEGORIES = [
+    'Normal', 'Benign', 'Malignant', 'Suspicious',
+    'Inflammatory', 'Vascular', 'Cystic', 'Solid'
+]
+AI_MODALITIES = ['CT', 'MRI', 'X-ray', 'Ultrasound']
+AI_BODY_REGIONS = [
+    'Head', 'Chest', 'Abdomen', 'Pelvis',
+    'Extremities', 'Spine', 'Cardiac'
+]
+AI_SEXES = ['M', 'F']
+AI_ETHNICITIES = ['Caucasian', 'African', 'Asian', 'Hispanic', 'Other']
+GENOMICS_GENES = list(GENE_LOCI)
+GENOMICS_VARIANTS = ['Missense', 'Nonsense', 'Frameshift', 'Splice site', 'Deletion', 'Insertion', 'Duplication']
+CLINICAL_SIGNIFICANCE = [
+    'Pathogenic', 'Likely pathogenic', 'Uncertain significance',
+    'Likely benign', 'Benign', 'Not classified'
+]
+DISEASE_ASSOCIATIONS = [
+    'Breast cancer', 'Colorectal cancer', 'Lung cancer',
+    'Pancreatic cancer', 'Ovarian cancer', 'Endometrial cancer',
+    'Prostate cancer', 'Melanoma', 'Glioblastoma'
+]
+
+# 各领域相关列的默认统计模型（高斯 copula，见 stat_models），DeSciDataGenerator(models=...) 可按领域替换
+DEFAULT_DOMAIN_MODELS: Dict[str, CorrelatedModel] = {
+    # 温度与CO2、海平面同向，与北极海冰面积反向（长期趋势另外叠加）
+    'climate_science': CorrelatedModel(
+        {
+            'global_temperature': Normal(15.0, 2.0),
+            'co2_level': Normal(400.0, 20.0, decimals=2),
+            'sea_level': Normal(0.0, 0.1, decimals=3),
+            'arctic_ice_extent': Normal(12.0, 1.5, decimals=2),
+            'latitude': Uniform(-90, 90, decimals=4),
+            'longitude': Uniform(-180, 180, decimals=4)
+        },
+        {
+            ('global_temperature', 'co2_level'): 0.6,
+            ('global_temperature', 'sea_level'): 0.4,
+            ('global_temperature', 'arctic_ice_extent'): -0.7,
+            ('co2_level', 'sea_level'): 0.4,
+            ('co2_level', 'arctic_ice_extent'): -0.5
+        }
+    ),
+    # 亲脂性越强，溶解度越低、结合越强（结合能越负）、毒性和合成难度略高
+    'drug_discovery': CorrelatedModel(
+        {
+            'logp': Uniform(-2, 6, decimals=2),
+            'solubility': LogUniform(0.001, 100, decimals=3),
+            'toxicity_score': Uniform(0, 1, decimals=3),
+            'binding_affinity': Uniform(-10, -5, decimals=2),
+            'synthesis_complexity': Integers(1, 11),
+            'target_protein': Categorical(DRUG_TARGET_PROTEINS, zipf_weights(len(DRUG_TARGET_PROTEINS), 0.7)),
+            'disease_target': Categorical(DRUG_DISEASE_TARGETS, zipf_weights(len(DRUG_DISEASE_TARGETS), 0.5))
+        },
+        {
+            ('logp', 'solubility'): -0.7,
+            ('logp', 'binding_affinity'): -0.5,
+            ('logp', 'toxicity_score'): 0.3,
+            ('logp', 'synthesis_complexity'): 0.2,
+            ('binding_affinity', 'synthesis_complexity'): -0.3
+        }
+    ),
+    # 标注置信度、放射科医生一致性和模型置信度同向；诊断类别频率偏斜
+    'ai_models': CorrelatedModel(
+        {
+            'diagnosis': Categorical(AI_CATEGORIES, [0.40, 0.18, 0.10, 0.08, 0.09, 0.05, 0.06, 0.04]),
+            'confidence_score': Uniform(0.3, 1.0, decimals=3),
+            'radiologist_agreement': Uniform(0.6, 1.0, decimals=3),
+            'prediction_confidence': Uniform(0.4, 1.0, decimals=3),
+            'modality': Categorical(AI_MODALITIES, [0.30, 0.20, 0.35, 0.15]),
+            'body_region': Categorical(AI_BODY_REGIONS, [0.15, 0.30, 0.18, 0.07, 0.12, 0.10, 0.08]),
+            'age': Integers(18, 91),
+            'sex': Categorical(AI_SEXES),
+            'ethnicity': Categorical(AI_ETHNICITIES, [0.45, 0.15, 0.20, 0.15, 0.05])
+        },
+        {
+            ('confidence_score', 'radiologist_agreement'): 0.5,
+            ('confidence_score', 'prediction_confidence'): 0.6,
+            ('radiologist_agreement', 'prediction_confidence'): 0.4
+        }
+    ),
+    # 测序深度越高质量分越高；人群频率越低越可能致病；变异类型频率偏斜（基因由坐标决定，见 genome.py）
+    'genomics': CorrelatedModel(
+        {
+            'variant_type': Categorical(GENOMICS_VARIANTS, [0.55, 0.10, 0.10, 0.07, 0.09, 0.05, 0.04]),
+            'variant_frequency': LogUniform(0.001, 0.5, decimals=4),
+            'read_depth': Integers(10, 1001),
+            'quality_score': Uniform(20, 60, decimals=1),
+            'clinical_significance': Categorical(CLINICAL_SIGNIFICANCE, [0.12, 0.10, 0.40, 0.15, 0.13, 0.10]),
+            'disease_association': Categorical(DISEASE_ASSOCIATIONS, zipf_weights(len(DISEASE_ASSOCIATIONS), 0.6)),
+            'population_frequency': LogUniform(0.0001, 0.01, decimals=6)
+        },
+        {
+            ('read_depth', 'quality_score'): 0.7,
+            ('variant_frequency', 'population_frequency'): 0.5,
+            ('population_frequency', 'clinical_significance'): 0.4
+        }
+    )
+}
+
+# 导出时预计算倒排索引的字段，以及行号对应的ID列
+# （基因组数据按坐标排序，每条染色体是连续的行段，由 genome.RegionIndex 索引）
+DOMAIN_INDEX_FIELDS = {
+    'climate_science': [],
+    'drug_discovery': ['target_protein', 'disease_target'],
+    'ai_models': ['modality', 'diagnosis', 'body_region'],
+    'genomics': ['gene', 'variant_type', 'clinical_significance']
+}
+DOMAIN_ID_FIELDS = {
+    'climate_science': 'date',
+    'drug_discovery': 'compound_id',
+    'ai_models': 'image_id',
+    'genomics': 'sequence_id'
+}
+
+# 各领域 columnar 布局中字典编码的分类列和日期列；聚合承诺按此统一各种布局的列类型
+DOMAIN_CATEGORICAL_FIELDS = {
+    'climate_science': [],
+    'drug_discovery': ['target_protein', 'disease_target'],
+    'ai_models': ['diagnosis', 'ai_prediction', 'modality', 'body_region', 'sex', 'ethnicity'],
+    'genomics': ['gene', 'variant_type', 'reference_allele', 'alternate_allele',
+                 'clinical_significance', 'disease_association']
+}
+DOMAIN_DATE_FIELDS = {
+    'climate_science': ['date'],
+    'drug_discovery': [],
+    'ai_models': [],
+    'genomics': []
+}
+
+# 气候数据的起始日期与长期趋势（每20年升温2度，只取决于日期）
+CLIMATE_START_DATE = np.datetime64('2000-01-01')
+CLIMATE_WARMING_PER_DAY = 2.0 / (20 * 365.25)
+
+# 数据集每块行数：每块使用独立的随机子流，第 i 行的取值与数据集长度和分块方式无关
+DATASET_BLOCK_ROWS = 1024
+
+# 基因组坐标使用的子流编号（大于任何行块编号）
+_POSITION_STREAM = 1 << 40
+
+# 流式生成的默认分块大小（行）
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Merkle树每个分块包含的行数
+MERKLE_CHUNK_SIZE = 1024
+
+# 分片生成时每个分片文件包含的研究项目数
+DEFAULT_SHARD_SIZE = 100
+
+# 进度回调：progress(已完成数量, 总数量)
+ProgressCallback = Callable[[int, int], None]
+
+
+def as_seed_sequence(seed: SeedLike) -> np.random.SeedSequence:
+    """把各种形式的种子统一为 SeedSequence"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(int(seed.integers(2 ** 63)))
+    return np.random.SeedSequence(seed)
+
+
+def domain_seed_sequence(seed_sequence: np.random.SeedSequence, domain: str) -> np.random.SeedSequence:
+    """派生某个研究领域的独立随机子流（与调用顺序无关）"""
+    return np.random.SeedSequence(
+        seed_sequence.entropy,
+        spawn_key=tuple(seed_sequence.spawn_key) + (zlib.crc32(domain.encode()),),
+        pool_size=seed_sequence.pool_size
+    )
+
+
+def substream_rng(stream: np.random.SeedSequence, *keys: int) -> np.random.Generator:
+    """stream 按 spawn_key 追加 keys 派生的独立子流（例如第 block 个行块）"""
+    return np.random.default_rng(np.random.SeedSequence(
+        stream.entropy,
+        spawn_key=tuple(stream.spawn_key) + keys,
+        pool_size=stream.pool_size
+    ))
+
+
+def _concat_columns(pieces: List[Any]) -> Any:
+    """拼接同一列的多段数据（分类列保持 Categorical）"""
+    if isinstance(pieces[0], pd.Categorical):
+        return pd.Categorical.from_codes(np.concatenate([piece.codes for piece in pieces]),
+                                         dtype=pieces[0].dtype)
+    return np.concatenate(pieces)
+
+
+def seed_info(seed_sequence: np.random.SeedSequence) -> Dict[str, Any]:
+    """可写入JSON的种子描述，配合 seed_from_info 可以重新生成相同数据"""
+    entropy = seed_sequence.entropy
+    return {
+        'entropy': str(entropy) if isinstance(entropy, int) else [str(value) for value in entropy],
+        'spawn_key': [int(key) for key in seed_sequence.spawn_key]
+    }
+
+
+def seed_from_info(info: Dict[str, Any]) -> np.random.SeedSequence:
+    """从 seed_info 的结果恢复 SeedSequence"""
+    entropy = info['entropy']
+    entropy = int(entropy) if isinstance(entropy, str) else [int(value) for value in entropy]
+    return np.random.SeedSequence(entropy, spawn_key=tuple(info['spawn_key']))
+
+
+def _format_ids(prefix: str, numbers: np.ndarray, width: int = 0) -> np.ndarray:
+    """把整数列批量格式化为 "PREFIX_0001" 形式的ID列"""
+    digits = np.asarray(numbers).astype(str)
+    if width and digits.size:
+        digits = np.char.zfill(digits, width)
+    return np.char.add(f"{prefix}_", digits)
+
+
+def column_values(column: Any) -> List[Any]:
+    """把一列（NumPy数组或分类列）转换为原生Python列表"""
+    values = np.asarray(column)
+    if values.dtype.kind == 'M':
+        # 日期列保持原有的 'YYYY-MM-DD' 字符串形式
+        values = np.datetime_as_string(values, unit='auto')
+    return values.tolist()
+
+
+def columns_to_records(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """把列式数据转换为逐行字典（仅在调用方需要行布局时使用）"""
+    names = list(columns)
+    values = [column_values(columns[name]) for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def json_default(value: Any) -> Any:
+    """json.dump 的 default 钩子：紧凑记录表按逐行字典输出"""
+    if isinstance(value, RecordTable):
+        return list(value.to_dicts())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def count_rows(data: Any) -> int:
+    """统计任意布局数据（逐行列表、列表字典、列式数组或紧凑记录表）的行数"""
+    if isinstance(data, dict):
+        return len(next(iter(data.values()))) if data else 0
+    return len(data)
+
+
+def iter_data_slices(data: Any, chunk_size: int, start: int = 0) -> Iterator[Any]:
+    """从第 start 行起按行分块遍历任意布局的数据，每块保持原有布局"""
+    num_rows = count_rows(data)
+    for offset in range(start, num_rows, chunk_size):
+        if isinstance(data, dict):
+            yield {name: column[offset:offset + chunk_size] for name, column in data.items()}
+        else:
+            yield data[offset:offset + chunk_size]
+
+
+def hash_chunk(chunk: Any) -> bytes:
+    """计算一个数据分块的规范哈希（与布局无关）"""
+    return dataset_digest(chunk)
 
 
 class DeSciDataGenerator:
@@ -43,7 +353,20 @@ class DeSciDataGenerator:
     5. 协作性：全球科学家可以安全地协作
     """
 
-    def __init__(self):
+    def __init__(self, seed: SeedLike = None, signer: Optional[Signer] = None,
+                 key_path: Optional[str] = None, signature_scheme: str = DEFAULT_SCHEME,
+                 verbose: bool = False, cache: Optional[GenerationCache] = None,
+                 metrics: Optional[Metrics] = None,
+                 models: Optional[Dict[str, CorrelatedModel]] = None,
+                 commitment_key: Optional[bytes] = None, commitment_key_path: Optional[str] = None):
+        # 根种子：研究故事从中依次派生，各领域数据集使用独立的子流
+        self.seed_sequence = as_seed_sequence(seed)
+        self._seeded = seed is not None
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self._domain_rngs: Dict[str, np.random.Generator] = {}
+        self._last_variant_layout: Optional[Tuple[Any, VariantLayout]] = None
+        self.verbose = verbose
+
         self.research_domains = [
             "climate_science",
             "drug_discovery",
@@ -53,38 +376,194 @@ class DeSciDataGenerator:
             "materials_science"
         ]
 
-        # 生成RSA密钥对用于数据签名
-        self.private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
-        self.public_key = self.private_key.public_key()
+        # 签名器在第一次签名时才创建：指定 key_path 时从磁盘加载（不存在则生成并保存）
+        self._signer = signer
+        self.key_path = key_path
+        self.signature_scheme = signature_scheme
 
-    def generate_climate_dataset(self, num_records: int = 1000) -> Dict[str, Any]:
-        """生成气候变化研究数据集"""
-        print("🌍 生成气候变化数据集...")
+        # 生成结果缓存：只缓存种子可复现的数据集和研究故事
+        self.cache = cache
 
-        # 生成全球温度数据
-        dates = pd.date_range('2000-01-01', periods=num_records, freq='D')
-
-        data = {
-            'date': dates.strftime('%Y-%m-%d').tolist(),
-            'global_temperature': np.random.normal(15.0, 2.0, num_records).round(2).tolist(),
-            'co2_level': np.random.normal(400.0, 20.0, num_records).round(2).tolist(),
-            'sea_level': np.random.normal(0.0, 0.1, num_records).round(3).tolist(),
-            'arctic_ice_extent': np.random.normal(12.0, 1.5, num_records).round(2).tolist(),
-            'latitude': np.random.uniform(-90, 90, num_records).round(4).tolist(),
-            'longitude': np.random.uniform(-180, 180, num_records).round(4).tolist(),
-            'measurement_station': [f"Station_{i:03d}" for i in range(num_records)]
+        # 各阶段的计时与计数；未指定时为空操作
+        self.metrics = metrics or NULL_METRICS
+
+        # 各领域相关列的统计模型，未指定的领域使用默认模型
+        self.models = {**DEFAULT_DOMAIN_MODELS, **(models or {})}
+
+        # 聚合承诺的私有密钥：保存它才能在之后打开承诺。指定 commitment_key_path 时从磁盘加载
+        # （不存在则生成并保存），都未指定时在本实例内随机生成，运行结束后无法再打开
+        self._commitment_key = commitment_key
+        self.commitment_key_path = commitment_key_path
+        self._commitment_key_configured = commitment_key is not None or commitment_key_path is not None
+
+    @property
+    def signer(self) -> Signer:
+        """数据签名器（延迟加载）"""
+        if self._signer is None:
+            if self.key_path:
+                self._signer = load_or_create_signer(self.key_path, self.signature_scheme)
+            else:
+                self._signer = create_signer(self.signature_scheme)
+        return self._signer
+
+    @property
+    def commitment_key(self) -> bytes:
+        """聚合承诺的私有密钥（延迟加载或生成）"""
+        if self._commitment_key is None:
+            if self.commitment_key_path:
+                self._commitment_key = load_or_create_commitment_key(self.commitment_key_path)
+            else:
+                self._commitment_key = secrets.token_bytes(KEY_BYTES)
+        return self._commitment_key
+
+    def _log(self, message: str, level: int = logging.INFO):
+        """记录进度信息；verbose=True 时同时打印 INFO 及以上级别的信息（默认静默）"""
+        logger.log(level, message)
+        if self.verbose and level >= logging.INFO:
+            print(message)
+
+    def _dataset_rng(self, domain: str,
+                     seed: SeedLike = None) -> Tuple[np.random.Generator, Optional[np.random.SeedSequence]]:
+        """
+        返回生成某领域数据集使用的随机数生成器，以及可用于复现的种子
+
+        显式给出 seed 时，数据只由 (seed, domain, size, GENERATOR_VERSION) 决定；
+        否则使用实例上该领域的子流，依次调用得到不同的数据。
+        """
+        if isinstance(seed, np.random.Generator):
+            return seed, None
+        if seed is not None:
+            seed_sequence = as_seed_sequence(seed)
+            return np.random.default_rng(domain_seed_sequence(seed_sequence, domain)), seed_sequence
+        if domain not in self._domain_rngs:
+            self._domain_rngs[domain] = np.random.default_rng(domain_seed_sequence(self.seed_sequence, domain))
+        return self._domain_rngs[domain], None
+
+    def _reproducible(self, seed_sequence: Optional[np.random.SeedSequence]) -> bool:
+        """
+        种子能否在以后的运行中再次得到：显式给出的种子，或从有种子的实例派生
+
+        未指定种子的实例每次运行的根熵都不同，从它派生的种子写入缓存后永远不会再被命中。
+        """
+        if seed_sequence is None:
+            return False
+        return self._seeded or seed_sequence.entropy != self.seed_sequence.entropy
+
+    def _generation_info(self, domain: str, num_records: int,
+                         seed_sequence: Optional[np.random.SeedSequence]) -> Dict[str, Any]:
+        """数据集的生成参数；种子可复现时 (seed, domain, size, version) 足以重新生成数据"""
+        return {
+            'generator_version': GENERATOR_VERSION,
+            'domain': domain,
+            'num_records': num_records,
+            'seed': seed_info(seed_sequence) if seed_sequence is not None else None,
+            'model': self.models[domain].fingerprint() if domain in self.models else None
+        }
+
+    def _dataset_source(self, domain: str, seed: SeedLike = None) -> Tuple[Any, Optional[np.random.SeedSequence]]:
+        """
+        返回列生成函数使用的随机源（SeedSequence），以及可用于复现的种子
+
+        各领域都按 DATASET_BLOCK_ROWS 行分块从随机源派生子流（见 _sample_blocks）。
+        """
+        rng, seed_sequence = self._dataset_rng(domain, seed)
+        if seed_sequence is not None:
+            return domain_seed_sequence(seed_sequence, domain), seed_sequence
+        return as_seed_sequence(rng), None
+
+    def _dataset_columns(self, domain: str, num_records: int,
+                         seed: SeedLike = None) -> Tuple[Dict[str, Any], Optional[np.random.SeedSequence]]:
+        """生成整个数据集的列；种子可复现且配置了缓存时优先读取缓存"""
+        stream, seed_sequence = self._dataset_source(domain, seed)
+        key = None
+        if self.cache is not None and self._reproducible(seed_sequence):
+            params = self._generation_info(domain, num_records, seed_sequence)
+            key = cache_key(**params)
+            columns = self.cache.get_columns(key)
+            self.metrics.count('cache_lookups', domain=domain, result='hit' if columns is not None else 'miss')
+            if columns is not None:
+                return columns, seed_sequence
+
+        with self.metrics.timer('generate', domain=domain):
+            columns = self._column_builder(domain)(0, num_records, num_records, stream)
+        self.metrics.count('rows_generated', num_records, domain=domain)
+        if key is not None:
+            self.cache.put_columns(key, params, columns)
+        return columns, seed_sequence
+
+    def _block_stream(self, stream: Union[None, np.random.Generator, np.random.SeedSequence]) -> np.random.SeedSequence:
+        """列生成函数的随机源统一为 SeedSequence（未给出时取自实例的随机流）"""
+        if isinstance(stream, np.random.SeedSequence):
+            return stream
+        return as_seed_sequence(stream or self.rng)
+
+    def _sample_blocks(self, stream: np.random.SeedSequence, start: int, count: int,
+                       sample_block: Callable[[np.random.Generator, int], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        按 DATASET_BLOCK_ROWS 行的固定块采样第 start 行起的 count 行
+
+        第 block 块用 substream_rng(stream, block) 整块采样再截取，
+        所以每一行的取值只取决于随机源和行号，与数据集长度和分块方式无关。
+        """
+        end = start + count
+        first = start // DATASET_BLOCK_ROWS
+        blocks = []
+        # count 为 0 时也采样一块，以得到列名和类型
+        for block in range(first, max(-(-end // DATASET_BLOCK_ROWS), first + 1)):
+            block_start = block * DATASET_BLOCK_ROWS
+            rows = slice(max(start - block_start, 0), min(end - block_start, DATASET_BLOCK_ROWS))
+            sampled = sample_block(substream_rng(stream, block), DATASET_BLOCK_ROWS)
+            if rows != slice(0, DATASET_BLOCK_ROWS):
+                sampled = {name: column[rows] for name, column in sampled.items()}
+            blocks.append(sampled)
+        if len(blocks) == 1:
+            return blocks[0]
+        return {name: _concat_columns([block[name] for block in blocks]) for name in blocks[0]}
+
+    def _climate_columns(self, start: int, num_records: int, total: Optional[int] = None,
+                         stream: Union[None, np.random.Generator, np.random.SeedSequence] = None) -> Dict[str, Any]:
+        """
+        按列生成气候数据（第 start 行起的 num_records 行）
+
+        趋势只取决于日期，随机部分按行块采样，所以第 i 天的数值与数据集总长度
+        和分块方式无关，追加日期不会改变已有的行。
+        """
+        model = self.models['climate_science']
+        sampled = self._sample_blocks(self._block_stream(stream), start, num_records, model.sample)
+        end = start + num_records
+        index = np.arange(start, end)
+
+        # 添加趋势：温度随时间增加（20年内升温2度）
+        trend = index * CLIMATE_WARMING_PER_DAY
+
+        return {
+            'date': CLIMATE_START_DATE + index,
+            'global_temperature': (sampled['global_temperature'] + trend).round(2),
+            'co2_level': sampled['co2_level'],
+            'sea_level': sampled['sea_level'],
+            'arctic_ice_extent': sampled['arctic_ice_extent'],
+            'latitude': sampled['latitude'],
+            'longitude': sampled['longitude'],
+            'measurement_station': _format_ids('Station', index, 3)
         }
 
-        # 添加趋势：温度随时间增加
-        for i in range(len(data['date'])):
-            year_progress = i / len(data['date'])
-            data['global_temperature'][i] += year_progress * 2.0  # 20年内升温2度
+    def generate_climate_dataset(self, num_records: int = 1000, columnar: bool = False,
+                                 seed: SeedLike = None, compact: bool = False) -> Dict[str, Any]:
+        """生成气候变化研究数据集"""
+        self._log("🌍 生成气候变化数据集...")
+
+        # 生成全球温度数据
+        columns, seed_sequence = self._dataset_columns('climate_science', num_records, seed)
+        if compact:
+            data = RecordTable.for_domain('climate_science', columns)
+        elif columnar:
+            data = columns
+        else:
+            data = {name: column_values(column) for name, column in columns.items()}
 
         return {
             'domain': 'climate_science',
+            'generation': self._generation_info('climate_science', num_records, seed_sequence),
             'title': 'Global Climate Change Monitoring Dataset 2000-2024',
             'description': 'Comprehensive dataset tracking global climate indicators including temperature, CO2 levels, sea level rise, and Arctic ice extent. Data collected from distributed sensor networks worldwide.',
             'data': data,
@@ -98,39 +577,91 @@ class DeSciDataGenerator:
             }
         }
 
-    def generate_drug_discovery_dataset(self, num_compounds: int = 500) -> Dict[str, Any]:
+    def append_climate_days(self, dataset: Dict[str, Any], num_days: int,
+                            merkle_tree: Optional[MerkleTree] = None,
+                            chunk_size: int = MERKLE_CHUNK_SIZE) -> MerkleTree:
+        """
+        向气候数据集末尾追加 num_days 天（原地修改 dataset），返回更新后的Merkle树
+
+        只生成新增的日期。数据集的种子可复现时，结果与直接生成更长的数据集完全相同；
+        否则新增的日期取自实例的随机子流。传入已有数据的 merkle_tree 时只重新哈希
+        最后一个未满的分块和新增分块，不传入时先完整构建一次。
+        """
+        if dataset.get('domain') != 'climate_science':
+            raise ValueError("只能向气候数据集追加日期")
+        if num_days < 0:
+            raise ValueError("num_days 不能为负数")
+
+        data = dataset['data']
+        start = count_rows(data)
+        if merkle_tree is None:
+            merkle_tree = self.build_merkle_tree(data, chunk_size)
+
+        generation = dataset['generation']
+        seed = seed_from_info(generation['seed']) if generation.get('seed') else None
+        stream, _ = self._dataset_source('climate_science', seed)
+        with self.metrics.timer('generate', domain='climate_science'):
+            tail = self._climate_columns(start, num_days, start + num_days, stream)
+        self.metrics.count('rows_generated', num_days, domain='climate_science')
+
+        if isinstance(data, RecordTable):
+            data = RecordTable.for_domain('climate_science', {
+                name: np.concatenate([data.column(name), column]) for name, column in tail.items()
+            })
+        else:
+            for name, column in tail.items():
+                if isinstance(data[name], list):
+                    data[name].extend(column_values(column))
+                else:
+                    data[name] = np.concatenate([data[name], column])
+        dataset['data'] = data
+        generation['num_records'] = start + num_days
+        dataset['metadata']['total_records'] = start + num_days
+
+        with self.metrics.timer('hash', kind='merkle'):
+            return self.update_merkle_tree(merkle_tree, data, start, chunk_size)
+
+    def _drug_discovery_columns(self, start: int, num_compounds: int, total: Optional[int] = None,
+                                stream: Union[None, np.random.Generator, np.random.SeedSequence] = None) -> Dict[str, Any]:
+        """按列生成分子数据（按行块采样，与分块方式无关）"""
+        model = self.models['drug_discovery']
+
+        def sample_block(rng: np.random.Generator, size: int) -> Dict[str, Any]:
+            # 每块只抽取分子结构的随机量，组装在拼接各块之后一次完成
+            return {**sample_molecule_draws(rng, size), **model.sample(rng, size)}
+
+        sampled = self._sample_blocks(self._block_stream(stream), start, num_compounds, sample_block)
+        # 重原子数和分子量由结构计算而不是独立抽取
+        molecules = build_molecules(sampled)
+        return {
+            'compound_id': _format_ids('DS', np.arange(start, start + num_compounds), 4),
+            'smiles': molecules['smiles'],
+            'heavy_atom_count': molecules['heavy_atom_count'],
+            'molecular_weight': molecules['molecular_weight'],
+            'logp': sampled['logp'],
+            'solubility': sampled['solubility'],
+            'toxicity_score': sampled['toxicity_score'],
+            'binding_affinity': sampled['binding_affinity'],
+            'synthesis_complexity': sampled['synthesis_complexity'],
+            'target_protein': sampled['target_protein'],
+            'disease_target': sampled['disease_target']
+        }
+
+    def generate_drug_discovery_dataset(self, num_compounds: int = 500, columnar: bool = False,
+                                        seed: SeedLike = None, compact: bool = False) -> Dict[str, Any]:
         """生成药物研发数据集"""
-        print("💊 生成药物研发数据集...")
+        self._log("💊 生成药物研发数据集...")
 
         # 生成分子数据
-        compounds = []
-        for i in range(num_compounds):
-            compound = {
-                'compound_id': f"DS_{i:04d}",
-                'smiles': self._generate_random_smiles(),
-                'molecular_weight': np.random.uniform(100, 800).round(2),
-                'logp': np.random.uniform(-2, 6).round(2),
-                'solubility': np.random.uniform(0.001, 100).round(3),
-                'toxicity_score': np.random.uniform(0, 1).round(3),
-                'binding_affinity': np.random.uniform(-10, -5).round(2),
-                'synthesis_complexity': random.randint(1, 10),
-                'target_protein': random.choice([
-                    'EGFR', 'BRAF', 'CDK4', 'mTOR', 'PI3K', 'MEK1',
-                    'ALK', 'ROS1', 'RET', 'MET', 'HER2', 'BRCA1'
-                ]),
-                'disease_target': random.choice([
-                    'Non-small cell lung cancer',
-                    'Melanoma',
-                    'Breast cancer',
-                    'Colorectal cancer',
-                    'Glioblastoma',
-                    'Acute myeloid leukemia'
-                ])
-            }
-            compounds.append(compound)
+        columns, seed_sequence = self._dataset_columns('drug_discovery', num_compounds, seed)
+        if compact:
+            compounds = RecordTable.for_domain('drug_discovery', columns)
+        else:
+            compounds = columns if columnar else columns_to_records(columns)
 
         return {
             'domain': 'drug_discovery',
+            'generation': self._generation_info('drug_discovery', num_compounds, seed_sequence),
             'title': 'Novel Small Molecule Library for Cancer Therapy',
             'description': 'High-throughput screening results for 500+ novel small molecules targeting key oncogenic pathways. Includes molecular properties, toxicity profiles, and preliminary binding data.',
             'data': compounds,
@@ -145,48 +676,63 @@ class DeSciDataGenerator:
             }
         }
 
-    def generate_ai_model_dataset(self, num_samples: int = 10000) -> Dict[str, Any]:
+    def _ai_model_columns(self, start: int, num_samples: int, total: Optional[int] = None,
+                          stream: Union[None, np.random.Generator, np.random.SeedSequence] = None) -> Dict[str, Any]:
+        """按列生成医疗影像分类数据（按行块采样，与分块方式无关）"""
+        model = self.models['ai_models']
+
+        def sample_block(rng: np.random.Generator, size: int) -> Dict[str, Any]:
+            sampled = model.sample(rng, size)
+            # 模型预测以 prediction_confidence 的概率与诊断一致，否则随机给出另一个类别
+            diagnosis = sampled['diagnosis']
+            num_classes = len(diagnosis.categories)
+            agrees = rng.random(size) < sampled['prediction_confidence']
+            other = (diagnosis.codes + rng.integers(1, max(num_classes, 2), size)) % num_classes
+            prediction = np.where(agrees, diagnosis.codes, other).astype(diagnosis.codes.dtype)
+            return {
+                **sampled,
+                'ai_prediction': pd.Categorical.from_codes(prediction, categories=diagnosis.categories),
+                'patient_number': rng.integers(1000, 10000, size)
+            }
+
+        sampled = self._sample_blocks(self._block_stream(stream), start, num_samples, sample_block)
+        return {
+            'image_id': _format_ids('IMG', np.arange(start, start + num_samples), 6),
+            'patient_id': _format_ids('PAT', sampled['patient_number']),
+            'diagnosis': sampled['diagnosis'],
+            'confidence_score': sampled['confidence_score'],
+            'radiologist_agreement': sampled['radiologist_agreement'],
+            'ai_prediction': sampled['ai_prediction'],
+            'prediction_confidence': sampled['prediction_confidence'],
+            'modality': sampled['modality'],
+            'body_region': sampled['body_region'],
+            'age': sampled['age'],
+            'sex': sampled['sex'],
+            'ethnicity': sampled['ethnicity']
+        }
+
+    def generate_ai_model_dataset(self, num_samples: int = 10000, columnar: bool = False,
+                                  seed: SeedLike = None, compact: bool = False) -> Dict[str, Any]:
         """生成AI模型训练数据集"""
-        print("🤖 生成AI模型训练数据集...")
+        self._log("🤖 生成AI模型训练数据集...")
 
         # 生成医疗影像分类数据
-        categories = [
-            'Normal', 'Benign', 'Malignant', 'Suspicious',
-            'Inflammatory', 'Vascular', 'Cystic', 'Solid'
-        ]
-
-        data = []
-        for i in range(num_samples):
-            sample = {
-                'image_id': f"IMG_{i:06d}",
-                'patient_id': f"PAT_{random.randint(1000, 9999)}",
-                'diagnosis': random.choice(categories),
-                'confidence_score': np.random.uniform(0.3, 1.0).round(3),
-                'radiologist_agreement': np.random.uniform(0.6, 1.0).round(3),
-                'ai_prediction': random.choice(categories),
-                'prediction_confidence': np.random.uniform(0.4, 1.0).round(3),
-                'modality': random.choice(['CT', 'MRI', 'X-ray', 'Ultrasound']),
-                'body_region': random.choice([
-                    'Head', 'Chest', 'Abdomen', 'Pelvis',
-                    'Extremities', 'Spine', 'Cardiac'
-                ]),
-                'age': random.randint(18, 90),
-                'sex': random.choice(['M', 'F']),
-                'ethnicity': random.choice([
-                    'Caucasian', 'African', 'Asian', 'Hispanic', 'Other'
-                ])
-            }
-            data.append(sample)
+        columns, seed_sequence = self._dataset_columns('ai_models', num_samples, seed)
+        if compact:
+            data = RecordTable.for_domain('ai_models', columns)
+        else:
+            data = columns if columnar else columns_to_records(columns)
 
         return {
             'domain': 'ai_models',
+            'generation': self._generation_info('ai_models', num_samples, seed_sequence),
             'title': 'Medical Image Classification Dataset for AI Training',
             'description': 'Large-scale dataset of medical images with expert annotations for training AI models in medical image classification. Includes multi-modal imaging data and demographic information.',
             'data': data,
             'metadata': {
                 'total_samples': num_samples,
-                'modalities': ['CT', 'MRI', 'X-ray', 'Ultrasound'],
-                'classes': categories,
+                'modalities': list(AI_MODALITIES),
+                'classes': list(AI_CATEGORIES),
                 'annotation_quality': 'Double-blinded expert consensus',
                 'privacy_protection': 'All patient identifiers removed',
                 'intended_use': 'AI model training and validation',
@@ -195,46 +741,73 @@ class DeSciDataGenerator:
             }
         }
 
-    def generate_genomics_dataset(self, num_sequences: int = 200) -> Dict[str, Any]:
+    def _variant_layout(self, stream: np.random.SeedSequence, total: int) -> VariantLayout:
+        """total 个变异在窗口间的分配（缓存最近一次，逐块生成时不重复抽取）"""
+        key = (stream.entropy, tuple(stream.spawn_key), total)
+        if self._last_variant_layout is None or self._last_variant_layout[0] != key:
+            layout = VariantLayout.sample(substream_rng(stream, _POSITION_STREAM), total)
+            self._last_variant_layout = (key, layout)
+        return self._last_variant_layout[1]
+
+    def _genomics_columns(self, start: int, num_sequences: int, total: Optional[int] = None,
+                          stream: Union[None, np.random.Generator, np.random.SeedSequence] = None) -> Dict[str, Any]:
+        """
+        按列生成基因变异数据（第 start 行起，按 (chromosome, position) 排序）
+
+        坐标由整个数据集的窗口分配和每组窗口的子流决定，其余列按行块采样，
+        所以逐块生成与一次生成的结果相同，可以生成数千万行。
+        """
+        stream = self._block_stream(stream)
+        total = start + num_sequences if total is None else total
+        chromosome, position = self._variant_layout(stream, total).positions(
+            start, start + num_sequences, lambda group: substream_rng(stream, _POSITION_STREAM, group)
+        )
+        model = self.models['genomics']
+
+        def sample_block(rng: np.random.Generator, size: int) -> Dict[str, Any]:
+            return {**model.sample(rng, size), 'substitution': sample_substitutions(rng, size)}
+
+        sampled = self._sample_blocks(stream, start, num_sequences, sample_block)
+        # 参考碱基只取决于位点，替代碱基按采样的转换/颠换得到
+        reference = reference_bases(chromosome, position)
+        alternate = alternate_bases(reference, sampled['substitution'])
+        return {
+            'sequence_id': _format_ids('SEQ', np.arange(start, start + num_sequences), 5),
+            'gene': genes_at(chromosome, position),
+            'variant_type': sampled['variant_type'],
+            'chromosome': chromosome,
+            'position': position,
+            'reference_allele': pd.Categorical.from_codes(reference, categories=BASES),
+            'alternate_allele': pd.Categorical.from_codes(alternate, categories=BASES),
+            'variant_frequency': sampled['variant_frequency'],
+            'read_depth': sampled['read_depth'],
+            'quality_score': sampled['quality_score'],
+            'clinical_significance': sampled['clinical_significance'],
+            'disease_association': sampled['disease_association'],
+            'population_frequency': sampled['population_frequency']
+        }
+
+    def generate_genomics_dataset(self, num_sequences: int = 200, columnar: bool = False,
+                                  seed: SeedLike = None, compact: bool = False) -> Dict[str, Any]:
         """生成基因组学数据集"""
-        print("🧬 生成基因组学数据集...")
-
-        genes = ['BRCA1', 'TP53', 'EGFR', 'KRAS', 'PIK3CA', 'PTEN', 'APC', 'MLH1', 'MSH2', 'CDKN2A']
-        variants = ['Missense', 'Nonsense', 'Frameshift', 'Splice site', 'Deletion', 'Insertion', 'Duplication']
-
-        data = []
-        for i in range(num_sequences):
-            sequence = {
-                'sequence_id': f"SEQ_{i:05d}",
-                'gene': random.choice(genes),
-                'variant_type': random.choice(variants),
-                'chromosome': random.randint(1, 22),
-                'position': random.randint(1000000, 200000000),
-                'reference_allele': random.choice(['A', 'T', 'C', 'G']),
-                'alternate_allele': random.choice(['A', 'T', 'C', 'G']),
-                'variant_frequency': np.random.uniform(0.001, 0.5).round(4),
-                'read_depth': random.randint(10, 1000),
-                'quality_score': np.random.uniform(20, 60).round(1),
-                'clinical_significance': random.choice([
-                    'Pathogenic', 'Likely pathogenic', 'Uncertain significance',
-                    'Likely benign', 'Benign', 'Not classified'
-                ]),
-                'disease_association': random.choice([
-                    'Breast cancer', 'Colorectal cancer', 'Lung cancer',
-                    'Pancreatic cancer', 'Ovarian cancer', 'Endometrial cancer',
-                    'Prostate cancer', 'Melanoma', 'Glioblastoma'
-                ]),
-                'population_frequency': np.random.uniform(0.0001, 0.01).round(6)
-            }
-            data.append(sequence)
+        self._log("🧬 生成基因组学数据集...")
+
+        columns, seed_sequence = self._dataset_columns('genomics', num_sequences, seed)
+        if compact:
+            data = RecordTable.for_domain('genomics', columns)
+        else:
+            data = columns if columnar else columns_to_records(columns)
 
         return {
             'domain': 'genomics',
+            'generation': self._generation_info('genomics', num_sequences, seed_sequence),
             'title': 'Comprehensive Cancer Genome Variant Database',
             'description': 'Large-scale genomic variant analysis from cancer patients, including germline and somatic mutations across multiple cancer types. Data includes variant annotations, clinical correlations, and population frequencies.',
             'data': data,
             'metadata': {
                 'total_variants': num_sequences,
+                'reference_genome': REFERENCE_GENOME,
+                'sort_order': ['chromosome', 'position'],
                 'sequencing_platform': 'Illumina NovaSeq 6000',
                 'coverage_depth': '100x average',
                 'variant_calling_pipeline': 'GATK Best Practices',
@@ -246,108 +819,199 @@ class DeSciDataGenerator:
             }
         }
 
-    def _generate_random_smiles(self) -> str:
-        """生成随机的SMILES字符串（简化版）"""
-        atoms = ['C', 'N', 'O', 'S', 'P', 'F', 'Cl', 'Br', 'I']
-        bonds = ['', '=', '#']
-
-        smiles_parts = []
-        for _ in range(random.randint(5, 15)):
-            atom = random.choice(atoms)
-            if random.random() < 0.3:
-                # 添加支链
-                smiles_parts.append(f"({atom})")
-            else:
-                smiles_parts.append(atom)
+    def generate_dataset(self, domain: str, num_records: int, columnar: bool = False,
+                         seed: SeedLike = None, compact: bool = False) -> Dict[str, Any]:
+        """
+        按领域名称生成数据集
+
+        compact=True 时 data 为 records.RecordTable：按行返回 NamedTuple，
+        内存占用接近列式数组，仍可直接签名、构建Merkle树和导出JSON。
+        """
+        generators = {
+            'climate_science': self.generate_climate_dataset,
+            'drug_discovery': self.generate_drug_discovery_dataset,
+            'ai_models': self.generate_ai_model_dataset,
+            'genomics': self.generate_genomics_dataset
+        }
+        if domain not in generators:
+            raise ValueError(f"不支持的研究领域: {domain}")
+        return generators[domain](num_records, columnar=columnar, seed=seed, compact=compact)
 
-            # 添加键
-            if random.random() < 0.2:
-                smiles_parts.append(random.choice(bonds))
+    def _column_builder(self, domain: str) -> Callable[..., Dict[str, Any]]:
+        """返回指定领域的列生成函数"""
+        builders = {
+            'climate_science': self._climate_columns,
+            'drug_discovery': self._drug_discovery_columns,
+            'ai_models': self._ai_model_columns,
+            'genomics': self._genomics_columns
+        }
+        if domain not in builders:
+            raise ValueError(f"不支持的研究领域: {domain}")
+        return builders[domain]
 
-        return ''.join(smiles_parts)
+    def iter_dataset_chunks(self, domain: str, num_records: int,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            progress: Optional[ProgressCallback] = None,
+                            seed: SeedLike = None) -> Iterator[Dict[str, Any]]:
+        """
+        按固定大小分块生成数据集的列，内存占用只取决于 chunk_size
 
-    def sign_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """使用私钥对数据进行签名"""
-        # 将数据转换为JSON字符串
-        data_str = json.dumps(data, sort_keys=True)
+        每块从固定的行块子流中截取，给出 seed 时结果与 generate_dataset 相同，与 chunk_size 无关。
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size 必须为正整数")
 
-        # 计算数据的哈希值
-        data_hash = hashlib.sha256(data_str.encode()).digest()
+        build_columns = self._column_builder(domain)
+        stream, _ = self._dataset_source(domain, seed)
+        chunks = (build_columns(start, min(chunk_size, num_records - start), num_records, stream)
+                  for start in range(0, num_records, chunk_size))
 
-        # 使用私钥签名
-        signature = self.private_key.sign(
-            data_hash,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        done = 0
+        while True:
+            with self.metrics.timer('generate', domain=domain):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            count = count_rows(chunk)
+            done += count
+            self.metrics.count('rows_generated', count, domain=domain)
+            yield chunk
+            if progress:
+                progress(done, num_records)
 
-        # 转换为base64编码
-        signature_b64 = base64.b64encode(signature).decode()
+    def iter_dataset_records(self, domain: str, num_records: int,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             progress: Optional[ProgressCallback] = None,
+                             seed: SeedLike = None) -> Iterator[List[Dict[str, Any]]]:
+        """按块生成逐行记录"""
+        for chunk in self.iter_dataset_chunks(domain, num_records, chunk_size, progress, seed):
+            yield columns_to_records(chunk)
 
+    def build_merkle_tree(self, data: Any, chunk_size: int = MERKLE_CHUNK_SIZE) -> MerkleTree:
+        """按行分块构建数据集的Merkle树"""
+        with self.metrics.timer('hash', kind='merkle'):
+            return MerkleTree(hash_chunk(chunk) for chunk in iter_data_slices(data, chunk_size))
+
+    def update_merkle_tree(self, tree: MerkleTree, data: Any, start_row: int,
+                           chunk_size: int = MERKLE_CHUNK_SIZE) -> MerkleTree:
+        """数据从 start_row 起被追加或修改后，只重新哈希受影响的分块"""
+        first_chunk = start_row // chunk_size
+        if first_chunk > len(tree):
+            raise ValueError("start_row 超出已有Merkle树覆盖的范围")
+
+        chunks = iter_data_slices(data, chunk_size, first_chunk * chunk_size)
+        for index, chunk in enumerate(chunks, start=first_chunk):
+            if index < len(tree):
+                tree.update(index, hash_chunk(chunk))
+            else:
+                tree.append(hash_chunk(chunk))
+        return tree
+
+    def merkle_proof(self, data: Any, row_index: int, chunk_size: int = MERKLE_CHUNK_SIZE,
+                     tree: Optional[MerkleTree] = None) -> Dict[str, Any]:
+        """生成某一行所在分块的包含证明"""
+        tree = tree or self.build_merkle_tree(data, chunk_size)
+        chunk_index = row_index // chunk_size
         return {
-            'data': data,
-            'signature': signature_b64,
-            'public_key': self.public_key.public_key_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            ).decode(),
-            'timestamp': datetime.now().isoformat(),
-            'data_hash': hashlib.sha256(data_str.encode()).hexdigest()
+            'root': tree.root_hex,
+            'chunk_size': chunk_size,
+            'chunk_index': chunk_index,
+            'chunk_hash': tree.chunk_hashes[chunk_index].hex(),
+            'proof': tree.proof(chunk_index)
         }
 
+    def commit_aggregates(self, data: Any, domain: Optional[str] = None,
+                          nonce: Optional[bytes] = None) -> AggregateCommitments:
+        """
+        计算数据集各列聚合统计（count、sum、min、max、分类计数）的加盐承诺
+
+        给出已公开承诺中的 nonce 可以用同一密钥重新得到承诺，进而打开其中的统计量。
+        已知领域的数据先转换为 columnar 布局的列类型，记录、列表和数组布局得到相同的承诺。
+        """
+        aggregates = AggregateAccumulator()
+        with self.metrics.timer('commit', domain=domain):
+            if domain in DOMAIN_CATEGORICAL_FIELDS:
+                columns = to_columns(data, DOMAIN_CATEGORICAL_FIELDS[domain], DOMAIN_DATE_FIELDS[domain])
+            else:
+                columns = to_columns(data)
+            aggregates.update(columns)
+            return aggregates.commit(self.commitment_key, nonce)
+
+    def _write_commitments(self, commitments: AggregateCommitments, basename: str):
+        """写入可公开的 <basename>.commitments.json 和私有的 <basename>.openings.json（仅所有者可读）"""
+        self.export_to_json(commitments.public(), f"{basename}.commitments.json")
+        fd = os.open(f"{basename}.openings.json", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(commitments.openings(), f, indent=2, ensure_ascii=False)
+
+    def sign_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """使用私钥对数据进行签名"""
+        # 计算数据规范编码的哈希值（不经过JSON序列化）
+        with self.metrics.timer('hash', kind='payload'):
+            data_hash = canonical_digest(data)
+
+        # 使用私钥签名
+        with self.metrics.timer('sign', scheme=self.signer.scheme):
+            signed = sign_payload(self.signer, data, data_hash)
+        self.metrics.count('signatures', scheme=self.signer.scheme)
+        return signed
+
     def verify_signature(self, signed_data: Dict[str, Any]) -> bool:
         """验证数据签名"""
-        try:
-            data = signed_data['data']
-            signature_b64 = signed_data['signature']
-            public_key_pem = signed_data['public_key']
-
-            # 重新构建数据字符串
-            data_str = json.dumps(data, sort_keys=True)
-            data_hash = hashlib.sha256(data_str.encode()).digest()
-
-            # 解码签名
-            signature = base64.b64decode(signature_b64)
-
-            # 加载公钥
-            public_key = serialization.load_pem_public_key(public_key_pem.encode())
-
-            # 验证签名
-            public_key.verify(
-                signature,
-                data_hash,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+        with self.metrics.timer('verify', mode='single'):
+            result = verify_signed_item(signed_data)
+        self.metrics.count('verifications', valid=result['valid'])
+        if not result['valid']:
+            self._log(f"签名验证失败: {result['error']}", logging.WARNING)
+        return result['valid']
 
-            return True
+    def verify_many(self, signed_items: Iterable[Dict[str, Any]],
+                    workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """使用进程池批量验证签名，返回逐项的结构化结果"""
+        with self.metrics.timer('verify', mode='batch'):
+            results = verify_many(signed_items, workers=workers)
+        for valid in (True, False):
+            matched = sum(1 for result in results if result['valid'] is valid)
+            if matched:
+                self.metrics.count('verifications', matched, valid=valid)
+        return results
 
-        except Exception as e:
-            print(f"签名验证失败: {e}")
-            return False
+    def generate_research_story(self, seed: SeedLike = None) -> Dict[str, Any]:
+        """
+        生成一个完整的研究故事
+
+        不指定 seed 时从实例的根种子依次派生；指定 seed 时研究内容（不含时间戳和签名）可复现。
+        """
+        self._log("📖 生成研究故事...")
+        story_seed = as_seed_sequence(seed) if seed is not None else self.seed_sequence.spawn(1)[0]
+        rng = np.random.default_rng(story_seed)
 
-    def generate_research_story(self) -> Dict[str, Any]:
-        """生成一个完整的研究故事"""
-        print("📖 生成研究故事...")
+        # 缓存的已签名故事与签名密钥绑定，换用其他密钥时重新生成并签名；
+        # 承诺密钥只有显式给出或保存在磁盘上时才参与缓存键，临时密钥不影响跨运行命中。
+        # 种子不可复现（实例和调用都未指定种子）时不读写缓存
+        key = None
+        if self.cache is not None and self._reproducible(story_seed):
+            params = {
+                'generator_version': GENERATOR_VERSION,
+                'kind': 'research_story',
+                'seed': seed_info(story_seed),
+                'signature_scheme': self.signer.scheme,
+                'key_fingerprint': public_key_fingerprint(self.signer.public_key_pem()),
+                'models': {domain: model.fingerprint() for domain, model in self.models.items()}
+            }
+            if self._commitment_key_configured:
+                params['commitment_key'] = hashlib.sha256(self.commitment_key).hexdigest()[:16]
+            key = cache_key(**params)
+            signed_research = self.cache.get_envelope(key)
+            if signed_research is not None:
+                return signed_research
 
         # 选择研究领域
-        domain = random.choice(self.research_domains)
+        domain = self.research_domains[rng.integers(len(self.research_domains))]
 
         # 根据领域生成相应数据集
-        if domain == 'climate_science':
-            dataset = self.generate_climate_dataset(500)
-        elif domain == 'drug_discovery':
-            dataset = self.generate_drug_discovery_dataset(200)
-        elif domain == 'ai_models':
-            dataset = self.generate_ai_model_dataset(1000)
-        else:
-            dataset = self.generate_genomics_dataset(100)
+        dataset_domain = domain if domain in STORY_DATASET_SIZES else 'genomics'
+        dataset = self.generate_dataset(dataset_domain, STORY_DATASET_SIZES[dataset_domain], seed=story_seed)
 
         # 创建研究元数据
         research_metadata = {
@@ -397,69 +1061,370 @@ class DeSciDataGenerator:
             ]
         }
 
+        # 数据集内容哈希和分块Merkle树（支持按分块验证）
+        with self.metrics.timer('hash', kind='dataset'):
+            dataset_hash = dataset_digest(dataset['data']).hex()
+        merkle_tree = self.build_merkle_tree(dataset['data'])
+        commitments = self.commit_aggregates(dataset['data'], dataset_domain)
+
         # 合并数据集和研究元数据
         complete_research = {
             **dataset,
             'research_metadata': research_metadata,
             'blockchain_integration': {
                 'contract_address': '0x1234567890abcdef...',
-                'nft_token_id': random.randint(1000, 9999),
-                'zk_proof_ids': [random.randint(10000, 99999) for _ in range(3)],
-                'data_hash': hashlib.sha256(json.dumps(dataset['data'], sort_keys=True).encode()).hexdigest(),
+                'nft_token_id': int(rng.integers(1000, 10000)),
+                'zk_proof_ids': rng.integers(10000, 100000, 3).tolist(),
+                'data_hash': dataset_hash,
+                'merkle_root': merkle_tree.root_hex,
+                'merkle_chunk_size': MERKLE_CHUNK_SIZE,
+                'merkle_chunk_hashes': [chunk_hash.hex() for chunk_hash in merkle_tree.chunk_hashes],
+                'aggregate_commitments': commitments.public(),
                 'timestamp': datetime.now().isoformat(),
                 'network': 'Ethereum Mainnet'
             }
         }
 
-        return self.sign_data(complete_research)
+        signed_research = self.sign_data(complete_research)
+        self.metrics.count('researches_generated', domain=dataset_domain)
+        if key is not None:
+            self.cache.put_envelope(key, params, signed_research)
+        return signed_research
+
+    def open_aggregate_commitments(self, research: Dict[str, Any]) -> AggregateCommitments:
+        """
+        重新得到研究项目中的聚合承诺，用于打开其中的统计量（opening()/openings()）
+
+        按项目记录的种子重新生成数据集，再用本实例的承诺密钥和公开的 nonce 计算承诺；
+        需要生成时使用的同一个密钥（commitment_key 或 commitment_key_path），不一致时抛出 ValueError。
+        """
+        research = research.get('data', research)
+        integration = research['blockchain_integration']
+        public = integration['aggregate_commitments']
+        generation = research['generation']
+        if not generation.get('seed'):
+            raise ValueError("研究项目没有记录种子，无法重新生成数据集")
+
+        dataset = self.generate_dataset(generation['domain'], generation['num_records'],
+                                        seed=seed_from_info(generation['seed']))
+        if dataset_digest(dataset['data']).hex() != integration['data_hash']:
+            raise ValueError("重新生成的数据集与研究项目的数据哈希不一致")
+        commitments = self.commit_aggregates(dataset['data'], generation['domain'], bytes.fromhex(public['nonce']))
+        if commitments.tree.root_hex != public['root']:
+            raise ValueError("承诺根哈希不一致：承诺密钥与生成时不同")
+        return commitments
+
+    def iter_researches(self, count: int = 5,
+                        progress: Optional[ProgressCallback] = None) -> Iterator[Dict[str, Any]]:
+        """逐个生成研究项目，不在内存中保留已生成的项目"""
+        for i in range(count):
+            yield self.generate_research_story()
+            if progress:
+                progress(i + 1, count)
 
     def generate_multiple_researches(self, count: int = 5) -> List[Dict[str, Any]]:
         """生成多个研究项目"""
         researches = []
         for i in range(count):
-            print(f"生成研究项目 {i+1}/{count}...")
+            self._log(f"生成研究项目 {i+1}/{count}...", logging.DEBUG)
             research = self.generate_research_story()
             researches.append(research)
 
         return researches
 
+    def generate_researches_sharded(self, count: int, output_dir: str, seed: Optional[int] = None,
+                                    workers: Optional[int] = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                                    progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        使用进程池分片生成研究项目
+
+        第 i 个研究项目的随机种子由 SeedSequence(seed, spawn_key=(i,)) 派生，与工作进程数无关，
+        因此相同的 seed 总能得到相同的数据。各工作进程直接把分片写入 output_dir，
+        只向父进程返回分片清单和哈希；完整清单写入 output_dir/manifest.json 并返回。
+        各工作进程使用本实例的签名密钥和承诺密钥，承诺可以之后用同一密钥打开。
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        entropy = np.random.SeedSequence(seed).entropy
+        key_pem = self.signer.private_key_pem()
+
+        tasks = [
+            (shard, start, min(start + shard_size, count), entropy, output_dir, key_pem, self.commitment_key)
+            for shard, start in enumerate(range(0, count, shard_size))
+        ]
+
+        shards = []
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_manifest in executor.map(_generate_research_shard, tasks):
+                shards.append(shard_manifest)
+                done += shard_manifest['count']
+                if progress:
+                    progress(done, count)
+
+        manifest = {
+            'count': count,
+            'seed_entropy': str(entropy),
+            'shard_size': shard_size,
+            'signature_scheme': self.signer.scheme,
+            'public_key': self.signer.public_key_pem(),
+            'shards': shards
+        }
+        with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        return manifest
+
     def export_to_json(self, data: Dict[str, Any], filename: str):
         """导出数据到JSON文件"""
+        with self.metrics.timer('export', format='json'):
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False, default=json_default)
+        self._log(f"✅ 数据已导出到 {filename}")
+
+    def export_to_columnar(self, dataset: Dict[str, Any], basename: str,
+                           fmt: str = 'auto', compression: str = 'zstd') -> Dict[str, Any]:
+        """
+        以列式格式导出数据集
+
+        数据写入 <basename>.parquet（或无Parquet引擎时写入 <basename>.npz），
+        <basename>.json 只保存元数据、列结构和内容哈希，同时写入摘要和倒排索引附属文件。
+        返回该JSON信封。
+        """
+        if fmt == 'auto':
+            fmt = FORMAT_PARQUET if parquet_available() else FORMAT_NPZ
+        if fmt not in (FORMAT_PARQUET, FORMAT_NPZ):
+            raise ValueError(f"不支持的列式导出格式: {fmt}")
+        if fmt == FORMAT_PARQUET and not parquet_available():
+            raise ValueError("未安装 Parquet 引擎（pyarrow 或 fastparquet），请改用 npz 格式")
+
+        with self.metrics.timer('serialize', format=fmt):
+            columns = to_columns(dataset['data'])
+        data_file = f"{basename}.{fmt}"
+        with self.metrics.timer('export', format=fmt):
+            if fmt == FORMAT_PARQUET:
+                write_parquet(columns, data_file, compression)
+            else:
+                write_npz(columns, data_file)
+                compression = 'zlib'
+
+        envelope = {
+            key: value for key, value in dataset.items() if key != 'data'
+        }
+        envelope['columnar_export'] = {
+            'format': fmt,
+            'data_file': os.path.basename(data_file),
+            'compression': compression,
+            'num_rows': count_rows(columns),
+            'columns': column_schema(columns),
+            'data_hash': dataset_digest(columns).hex(),
+            'file_sha256': file_sha256(data_file)
+        }
+        summary = self.export_summary(dataset.get('domain'), columns, basename)
+        envelope['columnar_export']['summary_file'] = os.path.basename(f"{basename}.summary.json")
+        if 'indexes' in summary:
+            envelope['columnar_export']['index_file'] = summary['indexes']['file']
+
+        self.export_to_json(envelope, f"{basename}.json")
+        return envelope
+
+    def export_summary(self, domain: Optional[str], data: Any, basename: str) -> Dict[str, Any]:
+        """
+        写入数据集的摘要 <basename>.summary.json 和倒排索引 <basename>.index.npz，返回摘要
+
+        摘要包含各列统计、直方图和分类取值计数；索引字段见 DOMAIN_INDEX_FIELDS。
+        """
+        columns = data if isinstance(data, dict) else to_columns(data)
+        with self.metrics.timer('summarize', domain=domain):
+            return write_sidecars(
+                columns, basename,
+                index_fields=DOMAIN_INDEX_FIELDS.get(domain, []),
+                id_field=DOMAIN_ID_FIELDS.get(domain),
+                extra={'domain': domain, 'generator_version': GENERATOR_VERSION}
+            )
+
+    def _export_store_summary(self, domain: str, summaries: SummaryAccumulator, store: ColumnStore,
+                              chunk_size: int) -> Dict[str, Any]:
+        """逐块读取数值列补齐摘要中的直方图，写入列存储目录下的摘要和倒排索引"""
+        with self.metrics.timer('summarize', domain=domain):
+            names = summaries.histogram_columns
+            for start in range(0, len(store), chunk_size):
+                summaries.update_histograms({name: store.read(name, start, start + chunk_size) for name in names})
+            return save_sidecars(
+                summaries.summary(), summaries.indexes(), os.path.join(store.path, 'dataset'),
+                id_field=DOMAIN_ID_FIELDS.get(domain),
+                extra={'domain': domain, 'generator_version': GENERATOR_VERSION}
+            )
+
+    def export_to_column_store(self, domain: str, num_records: int, path: str,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE,
+                               progress: Optional[ProgressCallback] = None,
+                               seed: SeedLike = None, commitments: bool = False) -> int:
+        """
+        分块生成数据集并写入内存映射列存储目录（用 column_store.ColumnStore 读取），返回行数
+
+        摘要和倒排索引在写入的同一遍中累加，写完后在同一目录下生成 dataset.summary.json 和
+        dataset.index.npz；基因组数据另外生成按坐标的区间索引 region_index.npz（用 genome.query_region 查询）。
+        commitments=True 时在同一遍中累加聚合统计，写入 dataset.commitments.json 和 dataset.openings.json。
+        元数据中的 generation 记录种子和生成器版本，给出 seed 时可以据此重新生成相同的数据。
+        """
+        _, seed_sequence = self._dataset_rng(domain, seed)
+        metadata = {
+            'domain': domain,
+            'chunk_size': chunk_size,
+            'generation': self._generation_info(domain, num_records, seed_sequence)
+        }
+        aggregates = AggregateAccumulator() if commitments else None
+        summaries = SummaryAccumulator(DOMAIN_INDEX_FIELDS.get(domain, []))
+        chunks = self.iter_dataset_chunks(domain, num_records, chunk_size, progress, seed)
+        with ColumnStoreWriter(path, metadata) as writer:
+            for chunk in chunks:
+                with self.metrics.timer('summarize', domain=domain):
+                    summaries.update(chunk)
+                if aggregates is not None:
+                    with self.metrics.timer('commit', domain=domain):
+                        aggregates.update(chunk)
+                with self.metrics.timer('export', format='column_store'):
+                    writer.append(chunk)
+        self.metrics.count('rows_exported', writer.num_rows, format='column_store')
+        store = ColumnStore(path)
+        if domain == 'genomics':
+            with self.metrics.timer('index', domain=domain):
+                index = RegionIndex.build(store.column('chromosome'), store.column('position'))
+                index.save(os.path.join(path, REGION_INDEX_FILE))
+        self._export_store_summary(domain, summaries, store, chunk_size)
+        if aggregates is not None:
+            self._write_commitments(aggregates.commit(self.commitment_key), os.path.join(path, 'dataset'))
+        return writer.num_rows
+
+    def export_dataset_stream(self, domain: str, num_records: int, filename: str,
+                              fmt: str = 'ndjson', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              progress: Optional[ProgressCallback] = None,
+                              seed: SeedLike = None, commitments: bool = False) -> int:
+        """
+        分块生成数据集并增量写入文件（fmt 为 'ndjson' 或流式 'json' 数组），返回写入行数
+
+        commitments=True 时在同一遍中累加聚合统计，写入 <文件名去扩展名>.commitments.json 和 .openings.json。
+        """
+        if fmt not in ('ndjson', 'json'):
+            raise ValueError(f"不支持的流式导出格式: {fmt}")
+
+        aggregates = AggregateAccumulator() if commitments else None
+        written = 0
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"✅ 数据已导出到 {filename}")
+            if fmt == 'json':
+                f.write('[')
+            for chunk in self.iter_dataset_chunks(domain, num_records, chunk_size, progress, seed):
+                if aggregates is not None:
+                    with self.metrics.timer('commit', domain=domain):
+                        aggregates.update(chunk)
+                records = columns_to_records(chunk)
+                with self.metrics.timer('serialize', format=fmt):
+                    lines = [json.dumps(record, ensure_ascii=False) for record in records]
+                with self.metrics.timer('export', format=fmt):
+                    if fmt == 'ndjson':
+                        f.write('\n'.join(lines))
+                        f.write('\n')
+                    else:
+                        f.write(',\n' if written else '\n')
+                        f.write(',\n'.join(lines))
+                written += len(records)
+                self.metrics.count('rows_exported', len(records), format=fmt)
+            if fmt == 'json':
+                f.write('\n]\n')
+
+        if aggregates is not None:
+            self._write_commitments(aggregates.commit(self.commitment_key), os.path.splitext(filename)[0])
+        return written
+
+    def _platform_metadata(self, total_researches: int, total_researchers: int) -> Dict[str, Any]:
+        """区块链导出格式中的平台元数据"""
+        return {
+            'name': 'DeSci Platform',
+            'version': '1.0.0',
+            'network': 'Ethereum',
+            'contract_addresses': {
+                'platform': '0x1234567890abcdef...',
+                'user_profile': '0x234567890abcdef...',
+                'zk_proof': '0x34567890abcdef...',
+                'nft': '0x4567890abcdef...',
+                'dataset': '0x567890abcdef...'
+            },
+            'total_researches': total_researches,
+            'total_researchers': total_researchers,
+            'data_integrity_verified': True,
+            'timestamp': datetime.now().isoformat()
+        }
 
     def export_to_blockchain_format(self, researches: List[Dict[str, Any]], filename: str):
         """导出为区块链可用的格式"""
         blockchain_data = {
             'researches': researches,
-            'platform_metadata': {
-                'name': 'DeSci Platform',
-                'version': '1.0.0',
-                'network': 'Ethereum',
-                'contract_addresses': {
-                    'platform': '0x1234567890abcdef...',
-                    'user_profile': '0x234567890abcdef...',
-                    'zk_proof': '0x34567890abcdef...',
-                    'nft': '0x4567890abcdef...',
-                    'dataset': '0x567890abcdef...'
-                },
-                'total_researches': len(researches),
-                'total_researchers': len(set(r['data']['research_metadata']['researcher']['orcid_id'] for r in researches)),
-                'data_integrity_verified': True,
-                'timestamp': datetime.now().isoformat()
-            }
+            'platform_metadata': self._platform_metadata(
+                len(researches),
+                len(set(r['data']['research_metadata']['researcher']['orcid_id'] for r in researches))
+            )
         }
 
         self.export_to_json(blockchain_data, filename)
 
+    def export_to_blockchain_format_stream(self, researches: Iterable[Dict[str, Any]], filename: str,
+                                           progress: Optional[ProgressCallback] = None,
+                                           total: int = 0) -> int:
+        """逐个写入研究项目的区块链导出格式，研究项目可以来自生成器，返回写入数量"""
+        count = 0
+        researchers = set()
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('{"researches": [')
+            for research in researches:
+                f.write(',\n' if count else '\n')
+                with self.metrics.timer('serialize', format='blockchain'):
+                    line = json.dumps(research, ensure_ascii=False)
+                f.write(line)
+                researchers.add(research['data']['research_metadata']['researcher']['orcid_id'])
+                count += 1
+                if progress:
+                    progress(count, total or count)
+            f.write('\n], "platform_metadata": ')
+            f.write(json.dumps(self._platform_metadata(count, len(researchers)), ensure_ascii=False))
+            f.write('}\n')
+
+        return count
+
+
+def _generate_research_shard(task: Tuple[int, int, int, int, str, bytes, bytes]) -> Dict[str, Any]:
+    """工作进程：生成一个分片的研究项目并写入 NDJSON 文件，返回分片清单"""
+    shard, start, stop, entropy, output_dir, key_pem, commitment_key = task
+    generator = DeSciDataGenerator(signer=signer_from_pem(key_pem), verbose=False,
+                                   commitment_key=commitment_key)
+    filename = f"shard-{shard:05d}.ndjson"
+
+    data_hashes = []
+    file_digest = hashlib.sha256()
+    with open(os.path.join(output_dir, filename), 'wb') as f:
+        for index in range(start, stop):
+            seed_sequence = np.random.SeedSequence(entropy, spawn_key=(index,))
+            research = generator.generate_research_story(seed=seed_sequence)
+            data_hashes.append(research['data']['blockchain_integration']['data_hash'])
+            line = (json.dumps(research, ensure_ascii=False) + '\n').encode('utf-8')
+            file_digest.update(line)
+            f.write(line)
+
+    return {
+        'shard': shard,
+        'file': filename,
+        'start': start,
+        'count': stop - start,
+        'sha256': file_digest.hexdigest(),
+        'data_hashes': data_hashes
+    }
+
 
 def main():
     """主函数"""
     print("🚀 DeSci Data Generator - 去中心化科学研究数据生成器")
     print("=" * 60)
 
-    generator = DeSciDataGenerator()
+    # 设置 DESCI_METRICS_PROM / DESCI_METRICS_JSON / DESCI_METRICS_LOG 时输出各阶段指标
+    generator = DeSciDataGenerator(verbose=True, metrics=metrics_from_env())
 
     # 生成多个研究项目
     print("生成示例研究数据集...")
@@ -470,9 +1435,10 @@ def main():
 
     # 验证签名
     print("验证数据签名...")
-    for i, research in enumerate(researches):
-        is_valid = generator.verify_signature(research)
-        print(f"研究项目 {i+1} 签名验证: {'✅ 通过' if is_valid else '❌ 失败'}")
+    for result in generator.verify_many(researches):
+        status = '✅ 通过' if result['valid'] else f"❌ 失败 ({result['error']})"
+        print(f"研究项目 {result['index'] + 1} 签名验证: {status}")
+    generator.metrics.flush()
 
     print("\n" + "=" * 60)
     print("🎉 数据生成完成！")
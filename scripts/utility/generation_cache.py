@@ -0,0 +1,157 @@
+"""
+Generation Cache - 内容寻址的生成结果缓存
+
+以 (生成器版本, 领域, 规模, 种子, 参数) 的规范哈希作为键，缓存：
+1. 生成的数据集列（NPZ）
+2. 已签名的研究信封（JSON）
+
+每个条目保存各文件的SHA-256，读取时校验，损坏的条目会被删除并视为未命中。
+缓存总大小超过上限时，按最近访问时间淘汰最久未使用的条目（LRU）。
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from canonical import canonical_digest
+from columnar_io import file_sha256, read_columns, write_npz
+
+ENTRY_FILE = 'entry.json'
+COLUMNS_FILE = 'columns.npz'
+ENVELOPE_FILE = 'envelope.json'
+
+# 默认缓存上限：2 GiB
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def cache_key(**params: Any) -> str:
+    """根据生成参数计算内容寻址的缓存键"""
+    return canonical_digest(params).hex()
+
+
+class GenerationCache:
+    """磁盘上的内容寻址缓存，带大小上限和LRU淘汰"""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _open_entry(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """读取并校验条目；命中时刷新访问时间"""
+        entry_dir = self._entry_dir(key)
+        entry_path = os.path.join(entry_dir, ENTRY_FILE)
+        try:
+            with open(entry_path, encoding='utf-8') as f:
+                entry = json.load(f)
+            for name, expected in entry['files'].items():
+                if file_sha256(os.path.join(entry_dir, name)) != expected:
+                    raise ValueError(f"缓存文件校验失败: {name}")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError):
+            # 条目损坏：删除后按未命中处理
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.misses += 1
+            return None
+
+        os.utime(entry_path)
+        self.hits += 1
+        return entry_dir, entry
+
+    def _store_entry(self, key: str, params: Dict[str, Any], write_files):
+        """在临时目录中写入条目文件，校验信息写好后原子地移动到位"""
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.root)
+        try:
+            names = write_files(tmp_dir)
+            files = {name: file_sha256(os.path.join(tmp_dir, name)) for name in names}
+            size = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in names)
+            with open(os.path.join(tmp_dir, ENTRY_FILE), 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'params': params, 'files': files, 'size': size}, f)
+
+            entry_dir = self._entry_dir(key)
+            os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+
+    def get_columns(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的数据集列；未命中返回 None"""
+        opened = self._open_entry(key)
+        if opened is None:
+            return None
+        entry_dir, entry = opened
+        if COLUMNS_FILE not in entry['files']:
+            return None
+        return read_columns(os.path.join(entry_dir, COLUMNS_FILE))
+
+    def put_columns(self, key: str, params: Dict[str, Any], columns: Dict[str, Any]):
+        """缓存数据集列"""
+        def write_files(directory: str) -> List[str]:
+            write_npz(columns, os.path.join(directory, COLUMNS_FILE))
+            return [COLUMNS_FILE]
+        self._store_entry(key, params, write_files)
+
+    def get_envelope(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的（已签名）信封；未命中返回 None"""
+        opened = self._open_entry(key)
+        if opened is None:
+            return None
+        entry_dir, entry = opened
+        if ENVELOPE_FILE not in entry['files']:
+            return None
+        with open(os.path.join(entry_dir, ENVELOPE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+
+    def put_envelope(self, key: str, params: Dict[str, Any], envelope: Dict[str, Any]):
+        """缓存（已签名）信封"""
+        def write_files(directory: str) -> List[str]:
+            with open(os.path.join(directory, ENVELOPE_FILE), 'w', encoding='utf-8') as f:
+                json.dump(envelope, f, ensure_ascii=False)
+            return [ENVELOPE_FILE]
+        self._store_entry(key, params, write_files)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """列出所有条目（按最近访问时间从旧到新）"""
+        result = []
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if prefix.startswith('.') or not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                entry_path = os.path.join(prefix_dir, key, ENTRY_FILE)
+                try:
+                    with open(entry_path, encoding='utf-8') as f:
+                        size = json.load(f)['size']
+                    result.append({'key': key, 'size': size, 'last_access': os.path.getmtime(entry_path)})
+                except (OSError, ValueError, KeyError):
+                    continue
+        return sorted(result, key=lambda entry: entry['last_access'])
+
+    def total_bytes(self) -> int:
+        return sum(entry['size'] for entry in self.entries())
+
+    def evict(self):
+        """淘汰最久未使用的条目，直到总大小不超过上限"""
+        entries = self.entries()
+        total = sum(entry['size'] for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(entry['key']), ignore_errors=True)
+            total -= entry['size']
+
+    def clear(self):
+        """清空缓存"""
+        for name in os.listdir(self.root):
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
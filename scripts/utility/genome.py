@@ -0,0 +1,307 @@
+"""
+Genome - 按坐标排序的变异生成与区间索引
+
+变异按 (chromosome, position) 有序生成，内存占用只取决于分块大小，可以生成数千万行：
+1. 基因组（GRCh38 常染色体）切成 SAMPLING_WINDOW 大小的窗口，先一次性按窗口权重多项分布
+   分配每个窗口的变异数（VariantLayout），每 WINDOW_GROUP 个窗口的位置由各自的随机子流生成，
+   组内排序即得到全局有序；第 i 行的坐标与分块方式无关
+2. 每个窗口内无放回抽取位置，同一位点最多一个变异（窗口的变异数不超过窗口长度）
+3. 癌症基因所在区域的窗口权重更高（GENE_FRACTION 的变异落在基因区域内），基因列由位置决定
+4. 参考碱基由坐标的哈希决定，同一位点在所有数据集中相同；替代碱基总是不同，转换/颠换比约为 2
+
+RegionIndex 类似 tabix 的线性索引：每条染色体按 LINEAR_WINDOW 分箱，记录每个箱内第一个变异的行号。
+查询 "chr7:55,000,000-55,300,000" 时先由索引得到行号范围，再只在这一小段位置上二分查找。
+"""
+
+import os
+import re
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REFERENCE_GENOME = 'GRCh38'
+
+# GRCh38 常染色体长度（bp）
+CHROMOSOME_LENGTHS = {
+    1: 248956422, 2: 242193529, 3: 198295559, 4: 190214555, 5: 181538259,
+    6: 170805979, 7: 159345973, 8: 145138636, 9: 138394717, 10: 133797422,
+    11: 135086622, 12: 133275309, 13: 114364328, 14: 107043718, 15: 101991189,
+    16: 90338345, 17: 83257441, 18: 80373285, 19: 58617616, 20: 64444167,
+    21: 46709983, 22: 50818468
+}
+
+# 癌症相关基因在 GRCh38 上的大致区间：(染色体, 起点, 终点)，1-based 闭区间
+GENE_LOCI = {
+    'BRCA1': (17, 43044295, 43125483),
+    'TP53': (17, 7661779, 7687550),
+    'EGFR': (7, 55019017, 55211628),
+    'KRAS': (12, 25205246, 25250929),
+    'PIK3CA': (3, 179148114, 179240093),
+    'PTEN': (10, 87863113, 87971930),
+    'APC': (5, 112707498, 112846239),
+    'MLH1': (3, 36993332, 37050918),
+    'MSH2': (2, 47403067, 47634501),
+    'CDKN2A': (9, 21967752, 21995301)
+}
+INTERGENIC = 'Intergenic'
+GENE_CATEGORIES = list(GENE_LOCI) + [INTERGENIC]
+
+# 落在基因区域内的变异比例（模拟靶向测序对癌症基因的富集；基因区域的位点用完后多出的变异落在其他窗口）
+GENE_FRACTION = 0.3
+
+# 生成时的采样窗口与索引的线性分箱大小（bp）
+SAMPLING_WINDOW = 1 << 14
+LINEAR_WINDOW = 1 << 14
+
+# 每组窗口的位置使用同一个随机子流生成
+WINDOW_GROUP = 1024
+
+# 碱基编码：A/C/G/T；转换为 A<->G、C<->T，其余为颠换
+BASES = ['A', 'C', 'G', 'T']
+_TRANSITION = np.array([2, 3, 0, 1], dtype=np.int8)
+_TRANSVERSIONS = np.array([[1, 3], [0, 2], [1, 3], [0, 2]], dtype=np.int8)
+TRANSITION_PROBABILITY = 2 / 3
+
+_REGION_PATTERN = re.compile(r'^(?:chr)?(\w+)(?::([\d,]+)(?:-([\d,]+))?)?$', re.IGNORECASE)
+
+_window_layout_cache: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def parse_region(region: str) -> Tuple[int, int, int]:
+    """解析 'chr7:55,000,000-55,300,000'、'7:55000000' 或 'chr7'，返回 (染色体, 起点, 终点)"""
+    match = _REGION_PATTERN.match(region.strip())
+    if not match:
+        raise ValueError(f"无法解析的区间: {region}")
+    name, start, end = match.groups()
+    if not name.isdigit() or int(name) not in CHROMOSOME_LENGTHS:
+        raise ValueError(f"未知的染色体: {name}")
+    chromosome = int(name)
+    if start is None:
+        # 只给出染色体：整条染色体
+        start, end = 1, CHROMOSOME_LENGTHS[chromosome]
+    else:
+        start = int(start.replace(',', ''))
+        end = int(end.replace(',', '')) if end else start
+    if start < 1 or end < start:
+        raise ValueError(f"无效的区间范围: {region}")
+    return chromosome, start, end
+
+
+def _window_layout() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """全基因组采样窗口：(染色体, 起点(0-based), 长度, 采样权重)"""
+    global _window_layout_cache
+    if _window_layout_cache is not None:
+        return _window_layout_cache
+
+    chromosomes, starts, lengths = [], [], []
+    for chromosome, length in CHROMOSOME_LENGTHS.items():
+        window_starts = np.arange(0, length, SAMPLING_WINDOW, dtype=np.int64)
+        chromosomes.append(np.full(len(window_starts), chromosome, dtype=np.uint8))
+        starts.append(window_starts)
+        lengths.append(np.minimum(SAMPLING_WINDOW, length - window_starts))
+    chromosome = np.concatenate(chromosomes)
+    start = np.concatenate(starts)
+    length = np.concatenate(lengths)
+
+    # 与基因区间重叠的碱基按更高的密度计权，使约 GENE_FRACTION 的变异落在基因内
+    overlap = np.zeros(len(start), dtype=np.int64)
+    for gene_chromosome, gene_start, gene_end in GENE_LOCI.values():
+        in_chromosome = chromosome == gene_chromosome
+        lo = np.maximum(start, gene_start - 1)
+        hi = np.minimum(start + length, gene_end)
+        overlap += np.where(in_chromosome, np.clip(hi - lo, 0, None), 0)
+    gene_bases = overlap.sum()
+    other_bases = length.sum() - gene_bases
+    density = GENE_FRACTION * other_bases / ((1 - GENE_FRACTION) * gene_bases)
+    weight = (length - overlap) + density * overlap
+
+    _window_layout_cache = (chromosome, start, length, weight / weight.sum())
+    return _window_layout_cache
+
+
+def reference_bases(chromosome: np.ndarray, position: np.ndarray) -> np.ndarray:
+    """参考碱基编码：由 (染色体, 位置) 的64位整数哈希（splitmix64 末轮）决定"""
+    key = (chromosome.astype(np.uint64) << np.uint64(32)) | position.astype(np.uint64)
+    key ^= key >> np.uint64(30)
+    key *= np.uint64(0xbf58476d1ce4e5b9)
+    key ^= key >> np.uint64(27)
+    key *= np.uint64(0x94d049bb133111eb)
+    key ^= key >> np.uint64(31)
+    return (key >> np.uint64(62)).astype(np.int8)
+
+
+def sample_substitutions(rng: np.random.Generator, size: int) -> np.ndarray:
+    """采样替代方式：0 为转换（约 2/3），1 和 2 为两种颠换"""
+    transition = rng.random(size) < TRANSITION_PROBABILITY
+    transversion = rng.integers(1, 3, size, dtype=np.int8)
+    return np.where(transition, np.int8(0), transversion)
+
+
+def alternate_bases(reference: np.ndarray, substitution: np.ndarray) -> np.ndarray:
+    """按替代方式得到替代碱基编码（总是与参考碱基不同）"""
+    transversion = _TRANSVERSIONS[reference, np.maximum(substitution, 1) - 1]
+    return np.where(substitution == 0, _TRANSITION[reference], transversion)
+
+
+def genes_at(chromosome: np.ndarray, position: np.ndarray) -> pd.Categorical:
+    """按坐标查找所在基因（不在任何基因区间内为 Intergenic）"""
+    codes = np.full(len(position), len(GENE_LOCI), dtype=np.int8)
+    for code, (gene_chromosome, gene_start, gene_end) in enumerate(GENE_LOCI.values()):
+        inside = (chromosome == gene_chromosome) & (position >= gene_start) & (position <= gene_end)
+        codes[inside] = code
+    return pd.Categorical.from_codes(codes, categories=GENE_CATEGORIES)
+
+
+def _positions_for_windows(rng: np.random.Generator, counts: np.ndarray,
+                           first: int, last: int) -> Tuple[np.ndarray, np.ndarray]:
+    """生成窗口 [first, last) 内的全部变异坐标（已排序，每个窗口内无放回）"""
+    chromosome, start, length, _ = _window_layout()
+    windows = np.arange(first, last, dtype=np.int64)
+    window_counts = counts[first:last]
+    # 变异数超过窗口一半的窗口逐个无放回抽取；其余窗口有放回抽取后重抽重复的位置
+    dense = window_counts * 2 > length[first:last]
+    keys = [window * SAMPLING_WINDOW + rng.choice(length[window], counts[window], replace=False)
+            for window in windows[dense].tolist()]
+    # 窗口按坐标递增，只需在窗口内排序：对 (窗口序号, 偏移) 组合键排序
+    key = np.empty(0, dtype=np.int64)
+    pending = np.repeat(windows[~dense], window_counts[~dense])
+    while pending.size:
+        key = np.concatenate([key, pending * SAMPLING_WINDOW + rng.integers(0, length[pending])])
+        key.sort()
+        duplicate = np.flatnonzero(key[1:] == key[:-1]) + 1
+        pending = key[duplicate] // SAMPLING_WINDOW
+        key = np.delete(key, duplicate)
+    if keys:
+        key = np.sort(np.concatenate([key] + keys))
+    window = key // SAMPLING_WINDOW
+    return chromosome[window], (start[window] + key % SAMPLING_WINDOW + 1).astype(np.uint32)
+
+
+class VariantLayout:
+    """total 个变异在采样窗口间的分配，可按行号区间取出已排序的坐标"""
+
+    def __init__(self, counts: np.ndarray):
+        self.counts = counts
+        self.cumulative = np.cumsum(counts)
+
+    @classmethod
+    def sample(cls, rng: np.random.Generator, total: int) -> 'VariantLayout':
+        """按窗口权重多项分布分配 total 个变异；超出窗口长度的部分重新分配到未满的窗口"""
+        _, _, length, probabilities = _window_layout()
+        if total > length.sum():
+            raise ValueError(f"变异数超过基因组位点数: {total} > {length.sum()}")
+        counts = rng.multinomial(total, probabilities)
+        while True:
+            excess = np.maximum(counts - length, 0)
+            extra = int(excess.sum())
+            if not extra:
+                return cls(counts)
+            counts -= excess
+            weights = np.where(counts < length, probabilities, 0.0)
+            counts += rng.multinomial(extra, weights / weights.sum())
+
+    def positions(self, start: int, stop: int,
+                  group_rng: Callable[[int], np.random.Generator]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        第 [start, stop) 行的 (染色体, 位置)
+
+        group_rng(g) 返回第 g 组窗口的随机生成器；整组生成再截取，
+        所以每一行的坐标只取决于分配结果和该组的子流。
+        """
+        if stop <= start:
+            return np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.uint32)
+        num_windows = len(self.counts)
+        first = int(np.searchsorted(self.cumulative, start, side='right')) // WINDOW_GROUP
+        last = int(np.searchsorted(self.cumulative, stop - 1, side='right')) // WINDOW_GROUP
+        # 只生成包含变异的窗口组（行数很少时大部分组为空）
+        group_ends = self.cumulative[np.minimum(np.arange(first, last + 1) * WINDOW_GROUP + WINDOW_GROUP, num_windows) - 1]
+        group_starts = np.concatenate([[self.cumulative[first * WINDOW_GROUP - 1] if first else 0], group_ends[:-1]])
+        chromosomes, positions = [], []
+        for group in (first + np.flatnonzero(group_ends > group_starts)).tolist():
+            window = group * WINDOW_GROUP
+            chromosome, position = _positions_for_windows(group_rng(group), self.counts, window,
+                                                          min(window + WINDOW_GROUP, num_windows))
+            chromosomes.append(chromosome)
+            positions.append(position)
+        offset = int(self.cumulative[first * WINDOW_GROUP - 1]) if first else 0
+        rows = slice(start - offset, stop - offset)
+        return np.concatenate(chromosomes)[rows], np.concatenate(positions)[rows]
+
+
+class RegionIndex:
+    """
+    按坐标排序的变异的区间索引
+
+    chromosome_rows[c] 为第 c 条染色体的起始行号（c 从 1 开始）；
+    第 c 条染色体的第 k 个线性分箱 [k*W+1, (k+1)*W] 中第一个变异的行号为
+    linear[linear_offsets[c] + k]。
+    """
+
+    def __init__(self, chromosome_rows: np.ndarray, linear: np.ndarray, linear_offsets: np.ndarray,
+                 window: int = LINEAR_WINDOW):
+        self.chromosome_rows = chromosome_rows
+        self.linear = linear
+        self.linear_offsets = linear_offsets
+        self.window = window
+
+    @classmethod
+    def build(cls, chromosome: np.ndarray, position: np.ndarray,
+              window: int = LINEAR_WINDOW) -> 'RegionIndex':
+        """从已排序的坐标列（可以是内存映射）建立索引"""
+        max_chromosome = max(CHROMOSOME_LENGTHS)
+        chromosome_rows = np.searchsorted(chromosome, np.arange(max_chromosome + 2)).astype(np.int64)
+        linear, linear_offsets = [], [0] * (max_chromosome + 2)
+        total = 0
+        for c in range(max_chromosome + 1):
+            linear_offsets[c] = total
+            if c not in CHROMOSOME_LENGTHS:
+                continue
+            lo, hi = chromosome_rows[c], chromosome_rows[c + 1]
+            bins = np.arange(0, CHROMOSOME_LENGTHS[c], window, dtype=np.int64) + 1
+            linear.append(np.searchsorted(position[lo:hi], bins) + lo)
+            total += len(bins)
+        linear_offsets[max_chromosome + 1] = total
+        return cls(chromosome_rows, np.concatenate(linear).astype(np.int64),
+                   np.asarray(linear_offsets, dtype=np.int64), window)
+
+    def _bin_row(self, chromosome: int, bin_index: int) -> int:
+        first, last = self.linear_offsets[chromosome], self.linear_offsets[chromosome + 1]
+        if bin_index >= last - first:
+            return int(self.chromosome_rows[chromosome + 1])
+        return int(self.linear[first + bin_index])
+
+    def rows(self, position: np.ndarray, region: Any) -> Tuple[int, int]:
+        """区间内变异的行号范围 [start, stop)；region 为字符串或 (染色体, 起点, 终点)"""
+        chromosome, start, end = parse_region(region) if isinstance(region, str) else region
+        lo = self._bin_row(chromosome, (start - 1) // self.window)
+        hi = self._bin_row(chromosome, (end - 1) // self.window + 1)
+        # 只在这一段位置上二分查找，内存映射时只会读取相关的页
+        segment = position[lo:hi]
+        return lo + int(np.searchsorted(segment, start, side='left')), \
+            lo + int(np.searchsorted(segment, end, side='right'))
+
+    def save(self, filename: str):
+        np.savez_compressed(
+            filename,
+            chromosome_rows=self.chromosome_rows,
+            linear=self.linear,
+            linear_offsets=self.linear_offsets,
+            window=np.int64(self.window)
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> 'RegionIndex':
+        with np.load(filename, allow_pickle=False) as npz:
+            return cls(npz['chromosome_rows'], npz['linear'], npz['linear_offsets'], int(npz['window']))
+
+
+REGION_INDEX_FILE = 'region_index.npz'
+
+
+def query_region(store: Any, region: Any, columns: Optional[List[str]] = None,
+                 index: Optional[RegionIndex] = None) -> Dict[str, Any]:
+    """在列存储（column_store.ColumnStore）中查询一个区间的变异，返回列式数据"""
+    if index is None:
+        index = RegionIndex.load(os.path.join(store.path, REGION_INDEX_FILE))
+    start, stop = index.rows(store.column('position'), region)
+    return store.slice(start, stop, columns)
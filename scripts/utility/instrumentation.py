@@ -0,0 +1,294 @@
+"""
+Instrumentation - 数据生成流水线的计时器、计数器和指标输出
+
+Metrics 按 (阶段, 标签) 累计耗时，按 (名称, 标签) 累计计数，flush() 时把快照写入各个输出：
+1. LogSink：结构化日志（每个计时事件一行JSON）
+2. JSONFileSink：JSON指标文件
+3. PrometheusSink：Prometheus 文本格式，可由 monitoring.sh 读取或 node_exporter 的 textfile collector 采集
+
+不需要指标时使用 NULL_METRICS，计时器和计数器都是空操作。
+"""
+
+import os
+import json
+from abc import ABC, abstractmethod
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_NAMESPACE = 'desci_generator'
+
+# metrics_from_env 读取的环境变量
+ENV_PROMETHEUS_FILE = 'DESCI_METRICS_PROM'
+ENV_JSON_FILE = 'DESCI_METRICS_JSON'
+ENV_LOG = 'DESCI_METRICS_LOG'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels_key(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _write_atomic(path: str, text: str):
+    """先写临时文件再替换，读取方不会看到写了一半的文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class MetricsSink(ABC):
+    """指标输出基类"""
+
+    def on_event(self, event: Dict[str, Any]):
+        """每个计时结束时调用（默认忽略）"""
+
+    @abstractmethod
+    def write(self, snapshot: Dict[str, Any]):
+        """写出累计指标快照"""
+
+
+class LogSink(MetricsSink):
+    """以结构化日志行输出计时事件和快照摘要"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger(DEFAULT_NAMESPACE)
+        self.level = level
+
+    def on_event(self, event: Dict[str, Any]):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps(event, ensure_ascii=False))
+
+    def write(self, snapshot: Dict[str, Any]):
+        if self.logger.isEnabledFor(self.level):
+            summary = {
+                'event': 'metrics',
+                'timers': {_series_name(t['phase'], t['labels']): round(t['seconds'], 6)
+                           for t in snapshot['timers']},
+                'counters': {_series_name(c['name'], c['labels']): c['value']
+                             for c in snapshot['counters']}
+            }
+            self.logger.log(self.level, json.dumps(summary, ensure_ascii=False))
+
+
+class JSONFileSink(MetricsSink):
+    """把快照写入JSON文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, snapshot: Dict[str, Any]):
+        _write_atomic(self.path, json.dumps(snapshot, indent=2, ensure_ascii=False))
+
+
+class PrometheusSink(MetricsSink):
+    """把快照写成 Prometheus 文本格式"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, snapshot: Dict[str, Any]):
+        _write_atomic(self.path, format_prometheus(snapshot))
+
+
+def _series_name(name: str, labels: Dict[str, str]) -> str:
+    if not labels:
+        return name
+    return name + '{' + ','.join(f"{key}={value}" for key, value in labels.items()) + '}'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _prometheus_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + '}'
+
+
+def format_prometheus(snapshot: Dict[str, Any]) -> str:
+    """快照转 Prometheus 文本格式：计时器为 summary（_sum/_count），计数器为 counter"""
+    namespace = snapshot['namespace']
+    lines = []
+
+    if snapshot['timers']:
+        metric = f"{namespace}_phase_seconds"
+        lines.append(f"# HELP {metric} Time spent in each pipeline phase.")
+        lines.append(f"# TYPE {metric} summary")
+        for timer in snapshot['timers']:
+            labels = _prometheus_labels({'phase': timer['phase'], **timer['labels']})
+            lines.append(f"{metric}_sum{labels} {timer['seconds']:.9f}")
+            lines.append(f"{metric}_count{labels} {timer['count']}")
+
+        metric = f"{namespace}_phase_max_seconds"
+        lines.append(f"# HELP {metric} Longest single call of each pipeline phase.")
+        lines.append(f"# TYPE {metric} gauge")
+        for timer in snapshot['timers']:
+            labels = _prometheus_labels({'phase': timer['phase'], **timer['labels']})
+            lines.append(f"{metric}{labels} {timer['max_seconds']:.9f}")
+
+    names = []
+    for counter in snapshot['counters']:
+        if counter['name'] not in names:
+            names.append(counter['name'])
+    for name in names:
+        metric = f"{namespace}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for counter in snapshot['counters']:
+            if counter['name'] == name:
+                lines.append(f"{metric}{_prometheus_labels(counter['labels'])} {counter['value']}")
+
+    return '\n'.join(lines) + '\n'
+
+
+class _Timer:
+    """计时上下文：退出时把耗时记到 Metrics"""
+
+    __slots__ = ('metrics', 'phase', 'labels', 'start')
+
+    def __init__(self, metrics: 'Metrics', phase: str, labels: Dict[str, Any]):
+        self.metrics = metrics
+        self.phase = phase
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.phase, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """线程安全的计时器与计数器集合"""
+
+    enabled = True
+
+    def __init__(self, sinks: Optional[List[MetricsSink]] = None, namespace: str = DEFAULT_NAMESPACE):
+        self.sinks = list(sinks or [])
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._timers: Dict[Tuple[str, Labels], List[float]] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+
+    def add_sink(self, sink: MetricsSink):
+        self.sinks.append(sink)
+
+    def timer(self, phase: str, **labels: Any) -> Any:
+        """计时上下文：with metrics.timer('generate', domain='genomics'): ..."""
+        return _Timer(self, phase, labels)
+
+    def observe(self, phase: str, seconds: float, **labels: Any):
+        """记录一次阶段耗时"""
+        key = (phase, _labels_key(labels))
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                self._timers[key] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+        if self.sinks:
+            event = {'event': 'timer', 'phase': phase, 'seconds': round(seconds, 6), **labels}
+            for sink in self.sinks:
+                sink.on_event(event)
+
+    def count(self, name: str, value: float = 1, **labels: Any):
+        """累加计数器"""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前累计指标"""
+        with self._lock:
+            timers = [
+                {'phase': phase, 'labels': dict(labels), 'count': stats[0],
+                 'seconds': stats[1], 'max_seconds': stats[2]}
+                for (phase, labels), stats in self._timers.items()
+            ]
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in self._counters.items()
+            ]
+        return {
+            'namespace': self.namespace,
+            'timestamp': datetime.now().isoformat(),
+            'timers': timers,
+            'counters': counters
+        }
+
+    def flush(self):
+        """把快照写入所有输出"""
+        if not self.sinks:
+            return
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.write(snapshot)
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+class NullMetrics(Metrics):
+    """关闭指标时使用：所有操作都是空操作"""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+
+    def timer(self, phase: str, **labels: Any) -> Any:
+        return _NULL_TIMER
+
+    def observe(self, phase: str, seconds: float, **labels: Any):
+        pass
+
+    def count(self, name: str, value: float = 1, **labels: Any):
+        pass
+
+    def flush(self):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def metrics_from_env() -> Metrics:
+    """
+    按环境变量创建指标
+
+    DESCI_METRICS_PROM 为 Prometheus 文本文件路径，DESCI_METRICS_JSON 为JSON文件路径，
+    DESCI_METRICS_LOG=1 时输出结构化日志。都未设置时返回 NULL_METRICS。
+    """
+    sinks: List[MetricsSink] = []
+    if os.environ.get(ENV_PROMETHEUS_FILE):
+        sinks.append(PrometheusSink(os.environ[ENV_PROMETHEUS_FILE]))
+    if os.environ.get(ENV_JSON_FILE):
+        sinks.append(JSONFileSink(os.environ[ENV_JSON_FILE]))
+    if os.environ.get(ENV_LOG, '').lower() in ('1', 'true', 'yes'):
+        sinks.append(LogSink())
+    return Metrics(sinks) if sinks else NULL_METRICS
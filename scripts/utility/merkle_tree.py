@@ -0,0 +1,138 @@
+"""
+Merkle Tree - 数据集分块Merkle树
+
+把数据集按固定行数分块，每块的哈希作为一个叶子节点。
+相比对整个数据集做一次SHA-256：
+1. 追加或修改一个分块只需重新计算 O(log n) 个节点
+2. 可以为任意分块生成包含证明，验证方无需下载整个数据集
+3. 根哈希可以直接作为 Dataset.sol 中的 dataHash 上链
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+# 叶子与内部节点使用不同前缀，防止第二原像攻击
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+# 空树的根哈希
+EMPTY_ROOT = hashlib.sha256(b'').digest()
+
+
+def hash_leaf(chunk_hash: bytes) -> bytes:
+    """计算叶子节点哈希"""
+    return hashlib.sha256(LEAF_PREFIX + chunk_hash).digest()
+
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    """计算内部节点哈希"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """
+    支持追加和原地更新的Merkle树
+
+    每一层保存全部节点哈希；某层节点数为奇数时，最后一个节点直接提升到上一层。
+    追加叶子或更新叶子时只重新计算该叶子到根路径上的节点。
+    """
+
+    def __init__(self, chunk_hashes: Iterable[bytes] = ()):
+        self._levels: List[List[bytes]] = [[]]
+        self._chunk_hashes: List[bytes] = []
+        for chunk_hash in chunk_hashes:
+            self.append(chunk_hash)
+
+    def __len__(self) -> int:
+        return len(self._chunk_hashes)
+
+    @property
+    def root(self) -> bytes:
+        """树根哈希"""
+        if not self._chunk_hashes:
+            return EMPTY_ROOT
+        return self._levels[-1][0]
+
+    @property
+    def root_hex(self) -> str:
+        return self.root.hex()
+
+    @property
+    def chunk_hashes(self) -> List[bytes]:
+        """各分块的原始哈希（未加叶子前缀）"""
+        return list(self._chunk_hashes)
+
+    def append(self, chunk_hash: bytes) -> int:
+        """追加一个分块哈希，返回其叶子序号"""
+        index = len(self._chunk_hashes)
+        self._chunk_hashes.append(chunk_hash)
+        self._levels[0].append(hash_leaf(chunk_hash))
+        self._refresh(index)
+        return index
+
+    def update(self, index: int, chunk_hash: bytes):
+        """替换指定分块的哈希"""
+        if not 0 <= index < len(self._chunk_hashes):
+            raise IndexError(f"分块序号越界: {index}")
+        self._chunk_hashes[index] = chunk_hash
+        self._levels[0][index] = hash_leaf(chunk_hash)
+        self._refresh(index)
+
+    def _refresh(self, index: int):
+        """沿叶子到根的路径重新计算节点"""
+        level = 0
+        while len(self._levels[level]) > 1:
+            nodes = self._levels[level]
+            parent = index // 2
+            left = nodes[2 * parent]
+            node = hash_node(left, nodes[2 * parent + 1]) if 2 * parent + 1 < len(nodes) else left
+
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+            upper = self._levels[level + 1]
+            if parent < len(upper):
+                upper[parent] = node
+            else:
+                upper.append(node)
+
+            level += 1
+            index = parent
+
+    def proof(self, index: int) -> List[Dict[str, str]]:
+        """生成指定分块的包含证明（自底向上的兄弟节点列表）"""
+        if not 0 <= index < len(self._chunk_hashes):
+            raise IndexError(f"分块序号越界: {index}")
+
+        path = []
+        for nodes in self._levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(nodes):
+                path.append({
+                    'position': 'left' if sibling < index else 'right',
+                    'hash': nodes[sibling].hex()
+                })
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify_proof(chunk_hash: bytes, proof: List[Dict[str, str]], root: bytes) -> bool:
+        """验证分块哈希是否包含在给定根哈希的树中"""
+        node = hash_leaf(chunk_hash)
+        for step in proof:
+            sibling = bytes.fromhex(step['hash'])
+            if step['position'] == 'left':
+                node = hash_node(sibling, node)
+            else:
+                node = hash_node(node, sibling)
+        return node == root
+
+    def summary(self, chunk_size: Optional[int] = None) -> Dict[str, object]:
+        """导出根哈希与各分块哈希"""
+        result = {
+            'root': self.root_hex,
+            'num_chunks': len(self._chunk_hashes),
+            'chunk_hashes': [chunk_hash.hex() for chunk_hash in self._chunk_hashes]
+        }
+        if chunk_size is not None:
+            result['chunk_size'] = chunk_size
+        return result
@@ -0,0 +1,235 @@
+"""
+Records - 紧凑的类型化逐行记录
+
+需要逐行访问但不需要 dict 的调用方可以使用 RecordTable：
+1. 数据仍以列保存：数值列为NumPy数组，低基数字符串列为小整数编码 + 驻留字符串取值表，
+   其余ASCII字符串列按定长字节保存（每字符1字节）
+2. 按行访问时才构造对应领域的 NamedTuple（没有 __dict__，字段名不随行重复）
+3. 分类值都指向同一组驻留字符串
+4. record._asdict() / table.to_dicts() 可直接用于JSON
+
+百万行AI样本数据集约占 51MB，逐行字典约为 660MB。
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, List, NamedTuple, Type, Union
+
+from columnar_io import DICTIONARY_RATIO
+
+# 迭代时每次把这么多行转换为Python对象
+ITER_BATCH_ROWS = 4096
+
+
+class ClimateRecord(NamedTuple):
+    """气候观测记录"""
+    date: str
+    global_temperature: float
+    co2_level: float
+    sea_level: float
+    arctic_ice_extent: float
+    latitude: float
+    longitude: float
+    measurement_station: str
+
+
+class CompoundRecord(NamedTuple):
+    """化合物筛选记录"""
+    compound_id: str
+    smiles: str
+    heavy_atom_count: int
+    molecular_weight: float
+    logp: float
+    solubility: float
+    toxicity_score: float
+    binding_affinity: float
+    synthesis_complexity: int
+    target_protein: str
+    disease_target: str
+
+
+class ImagingRecord(NamedTuple):
+    """医疗影像样本记录"""
+    image_id: str
+    patient_id: str
+    diagnosis: str
+    confidence_score: float
+    radiologist_agreement: float
+    ai_prediction: str
+    prediction_confidence: float
+    modality: str
+    body_region: str
+    age: int
+    sex: str
+    ethnicity: str
+
+
+class VariantRecord(NamedTuple):
+    """基因变异记录"""
+    sequence_id: str
+    gene: str
+    variant_type: str
+    chromosome: int
+    position: int
+    reference_allele: str
+    alternate_allele: str
+    variant_frequency: float
+    read_depth: int
+    quality_score: float
+    clinical_significance: str
+    disease_association: str
+    population_frequency: float
+
+
+RECORD_TYPES: Dict[str, Type[tuple]] = {
+    'climate_science': ClimateRecord,
+    'drug_discovery': CompoundRecord,
+    'ai_models': ImagingRecord,
+    'genomics': VariantRecord
+}
+
+
+class _CategoricalColumn:
+    """分类列：最小整数类型的编码 + 驻留字符串取值表"""
+
+    __slots__ = ('codes', 'categories')
+
+    def __init__(self, codes: np.ndarray, categories: List[str]):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, categories: Any) -> '_CategoricalColumn':
+        categories = [sys.intern(str(value)) for value in categories]
+        dtype = np.min_scalar_type(-max(len(categories), 1))
+        return cls(np.asarray(codes).astype(dtype, copy=False), categories)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return _CategoricalColumn(self.codes[index], self.categories)
+        return self.categories[self.codes[index]]
+
+    def tolist(self) -> List[str]:
+        categories = self.categories
+        return [categories[code] for code in self.codes.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    def to_categorical(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.codes, categories=self.categories)
+
+
+def _compact_column(values: Any) -> Any:
+    if isinstance(values, pd.Categorical):
+        return _CategoricalColumn.from_codes(values.codes, values.categories)
+    array = np.asarray(values)
+    if array.dtype.kind not in 'UO':
+        return array
+
+    codes, uniques = pd.factorize(array)
+    if len(uniques) <= max(1, DICTIONARY_RATIO * len(array)):
+        return _CategoricalColumn.from_codes(codes, uniques)
+    array = array.astype(str)
+    try:
+        return np.char.encode(array, 'ascii')
+    except UnicodeEncodeError:
+        return array
+
+
+def _decoded(column: np.ndarray) -> np.ndarray:
+    """字节列还原为字符串数组，日期列转为 'YYYY-MM-DD' 字符串"""
+    if column.dtype.kind == 'S':
+        return column.astype(str)
+    if column.dtype.kind == 'M':
+        return np.datetime_as_string(column, unit='auto')
+    return column
+
+
+def _column_list(column: Any) -> List[Any]:
+    """把一段列转换为Python对象列表"""
+    if isinstance(column, np.ndarray):
+        column = _decoded(column)
+    return column.tolist()
+
+
+class RecordTable:
+    """以列保存、按行返回 NamedTuple 的只读表"""
+
+    __slots__ = ('record_type', '_columns')
+
+    def __init__(self, record_type: Type[tuple], columns: Dict[str, Any]):
+        missing = set(record_type._fields) - set(columns)
+        if missing:
+            raise ValueError(f"{record_type.__name__} 缺少列: {', '.join(sorted(missing))}")
+        self.record_type = record_type
+        self._columns = [_compact_column(columns[name]) for name in record_type._fields]
+
+    @classmethod
+    def for_domain(cls, domain: str, columns: Dict[str, Any]) -> 'RecordTable':
+        """使用领域对应的记录类型创建表"""
+        if domain not in RECORD_TYPES:
+            raise ValueError(f"不支持的研究领域: {domain}")
+        return cls(RECORD_TYPES[domain], columns)
+
+    @classmethod
+    def _from_compact(cls, record_type: Type[tuple], columns: List[Any]) -> 'RecordTable':
+        table = cls.__new__(cls)
+        table.record_type = record_type
+        table._columns = columns
+        return table
+
+    @property
+    def fields(self) -> tuple:
+        return self.record_type._fields
+
+    def __len__(self) -> int:
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            # 切片是共享底层数组的视图
+            return RecordTable._from_compact(self.record_type, [column[index] for column in self._columns])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"行号越界: {index}")
+        return self.record_type._make(
+            _column_list(column[index:index + 1])[0] for column in self._columns
+        )
+
+    def __iter__(self) -> Iterator[tuple]:
+        make = self.record_type._make
+        for start in range(0, len(self), ITER_BATCH_ROWS):
+            values = [_column_list(column[start:start + ITER_BATCH_ROWS]) for column in self._columns]
+            for row in zip(*values):
+                yield make(row)
+
+    def to_dicts(self) -> Iterator[Dict[str, Any]]:
+        """逐行产生 dict（用于JSON序列化）"""
+        for record in self:
+            yield record._asdict()
+
+    def column(self, name: str) -> Any:
+        """返回一列（分类列返回 pd.Categorical）"""
+        column = self._columns[self.fields.index(name)]
+        if isinstance(column, _CategoricalColumn):
+            return column.to_categorical()
+        return column.astype(str) if column.dtype.kind == 'S' else column
+
+    def to_columns(self) -> Dict[str, Any]:
+        """转换为列式数据，与生成器的 columnar 布局一致"""
+        return {name: self.column(name) for name in self.fields}
+
+    @property
+    def nbytes(self) -> int:
+        """列数据占用的字节数"""
+        return sum(column.nbytes for column in self._columns)
+
+    def __repr__(self) -> str:
+        return f"RecordTable({self.record_type.__name__}, rows={len(self)})"
@@ -0,0 +1,248 @@
+"""
+Signing - 研究数据签名与验证工具
+
+提供可插拔的签名方案和批量、并行的签名验证：
+1. 支持 Ed25519（默认，签名和验证开销很小）与 RSA-PSS（兼容旧数据）
+2. 私钥可以持久化到磁盘并在多次运行之间复用
+3. 公钥按指纹缓存，同一公钥只解析一次PEM
+4. 载荷哈希使用规范二进制编码（canonical-v1），旧记录仍按JSON哈希验证
+5. 使用进程池并行验证，返回结构化的逐项结果
+"""
+
+import os
+import hashlib
+from abc import ABC, abstractmethod
+import base64
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ed25519
+from cryptography.hazmat.primitives import serialization
+
+from canonical import HASH_SCHEME_CANONICAL, LEGACY_HASH_SCHEME, canonical_digest, payload_digest
+
+# 签名方案名称，写入已签名记录的 signature_scheme 字段
+SCHEME_RSA_PSS = 'rsa-pss-sha256'
+SCHEME_ED25519 = 'ed25519'
+DEFAULT_SCHEME = SCHEME_ED25519
+
+# 没有 signature_scheme 字段的旧记录均由 RSA-PSS 签名
+LEGACY_SCHEME = SCHEME_RSA_PSS
+
+
+def _pss_padding() -> padding.PSS:
+    return padding.PSS(
+        mgf=padding.MGF1(hashes.SHA256()),
+        salt_length=padding.PSS.MAX_LENGTH
+    )
+
+
+class Signer(ABC):
+    """签名器基类：持有私钥，对数据哈希进行签名"""
+
+    scheme = ''
+
+    def __init__(self, private_key: Any):
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+
+    @classmethod
+    @abstractmethod
+    def generate(cls) -> 'Signer':
+        """生成新的密钥对"""
+
+    @abstractmethod
+    def sign(self, digest: bytes) -> bytes:
+        """对数据哈希签名"""
+
+    def public_key_pem(self) -> str:
+        """以PEM格式导出公钥"""
+        return self.public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    def private_key_pem(self, password: Optional[bytes] = None) -> bytes:
+        """以PKCS8 PEM格式导出私钥"""
+        encryption = (serialization.BestAvailableEncryption(password) if password
+                      else serialization.NoEncryption())
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=encryption
+        )
+
+    def save(self, path: str, password: Optional[bytes] = None):
+        """把私钥以PKCS8 PEM格式保存到磁盘（仅所有者可读）"""
+        pem = self.private_key_pem(password)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pem)
+
+
+class RSAPSSSigner(Signer):
+    """RSA-PSS (SHA-256) 签名，与旧版数据兼容"""
+
+    scheme = SCHEME_RSA_PSS
+
+    @classmethod
+    def generate(cls, key_size: int = 2048) -> 'RSAPSSSigner':
+        return cls(rsa.generate_private_key(public_exponent=65537, key_size=key_size))
+
+    def sign(self, digest: bytes) -> bytes:
+        return self.private_key.sign(digest, _pss_padding(), hashes.SHA256())
+
+
+class Ed25519Signer(Signer):
+    """Ed25519 签名，密钥生成和签名验证都远快于RSA"""
+
+    scheme = SCHEME_ED25519
+
+    @classmethod
+    def generate(cls) -> 'Ed25519Signer':
+        return cls(ed25519.Ed25519PrivateKey.generate())
+
+    def sign(self, digest: bytes) -> bytes:
+        return self.private_key.sign(digest)
+
+
+SIGNERS = {
+    SCHEME_RSA_PSS: RSAPSSSigner,
+    SCHEME_ED25519: Ed25519Signer
+}
+
+
+def create_signer(scheme: str = DEFAULT_SCHEME) -> Signer:
+    """为指定方案生成新的签名器"""
+    if scheme not in SIGNERS:
+        raise ValueError(f"不支持的签名方案: {scheme}")
+    return SIGNERS[scheme].generate()
+
+
+def load_signer(path: str, password: Optional[bytes] = None) -> Signer:
+    """从PEM私钥文件加载签名器，根据密钥类型选择方案"""
+    with open(path, 'rb') as f:
+        return signer_from_pem(f.read(), password)
+
+
+def signer_from_pem(pem: bytes, password: Optional[bytes] = None) -> Signer:
+    """从PEM私钥创建签名器（例如把签名器传给子进程）"""
+    private_key = serialization.load_pem_private_key(pem, password=password)
+
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return Ed25519Signer(private_key)
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return RSAPSSSigner(private_key)
+    raise ValueError(f"不支持的私钥类型: {type(private_key).__name__}")
+
+
+def load_or_create_signer(path: str, scheme: str = DEFAULT_SCHEME,
+                          password: Optional[bytes] = None) -> Signer:
+    """密钥文件存在时加载，否则生成新密钥并保存，使签名可以跨运行关联"""
+    if os.path.exists(path):
+        return load_signer(path, password)
+    signer = create_signer(scheme)
+    signer.save(path, password)
+    return signer
+
+
+def sign_payload(signer: Signer, data: Any, data_hash: Optional[bytes] = None) -> Dict[str, Any]:
+    """对载荷签名，返回带签名、公钥和哈希的已签名对象（data_hash 为已算好的规范编码哈希）"""
+    if data_hash is None:
+        data_hash = canonical_digest(data)
+    return {
+        'data': data,
+        'signature': base64.b64encode(signer.sign(data_hash)).decode(),
+        'signature_scheme': signer.scheme,
+        'hash_scheme': HASH_SCHEME_CANONICAL,
+        'public_key': signer.public_key_pem(),
+        'timestamp': datetime.now().isoformat(),
+        'data_hash': data_hash.hex()
+    }
+
+
+def verify_digest(scheme: str, public_key: Any, signature: bytes, digest: bytes):
+    """按签名方案验证数据哈希的签名，失败时抛出异常"""
+    if scheme == SCHEME_ED25519:
+        if not isinstance(public_key, ed25519.Ed25519PublicKey):
+            raise ValueError("公钥类型与签名方案 ed25519 不匹配")
+        public_key.verify(signature, digest)
+    elif scheme == SCHEME_RSA_PSS:
+        if not isinstance(public_key, rsa.RSAPublicKey):
+            raise ValueError("公钥类型与签名方案 rsa-pss-sha256 不匹配")
+        public_key.verify(signature, digest, _pss_padding(), hashes.SHA256())
+    else:
+        raise ValueError(f"不支持的签名方案: {scheme}")
+
+
+# 每个进程内的公钥缓存：指纹 -> 已加载的公钥对象
+_PUBLIC_KEY_CACHE: Dict[str, Any] = {}
+
+# 少于该数量时直接在当前进程中验证，避免进程池启动开销
+PARALLEL_THRESHOLD = 32
+
+
+def public_key_fingerprint(public_key_pem: str) -> str:
+    """计算PEM公钥的SHA-256指纹"""
+    return hashlib.sha256(public_key_pem.strip().encode()).hexdigest()
+
+
+def load_public_key(public_key_pem: str) -> Any:
+    """加载PEM公钥，按指纹缓存"""
+    fingerprint = public_key_fingerprint(public_key_pem)
+    public_key = _PUBLIC_KEY_CACHE.get(fingerprint)
+    if public_key is None:
+        public_key = serialization.load_pem_public_key(public_key_pem.encode())
+        _PUBLIC_KEY_CACHE[fingerprint] = public_key
+    return public_key
+
+
+def verify_signed_item(signed_data: Dict[str, Any]) -> Dict[str, Any]:
+    """验证单个已签名对象，返回结构化结果"""
+    result = {
+        'valid': False,
+        'scheme': signed_data.get('signature_scheme', LEGACY_SCHEME),
+        'hash_scheme': signed_data.get('hash_scheme', LEGACY_HASH_SCHEME),
+        'data_hash': None,
+        'key_fingerprint': None,
+        'error': None
+    }
+    try:
+        data_hash = payload_digest(signed_data['data'], result['hash_scheme'])
+        result['data_hash'] = data_hash.hex()
+        result['key_fingerprint'] = public_key_fingerprint(signed_data['public_key'])
+
+        # 签名只覆盖数据本身，记录的 data_hash 与数据不一致时同样视为无效
+        recorded_hash = signed_data.get('data_hash')
+        if recorded_hash is not None and recorded_hash != result['data_hash']:
+            raise ValueError(f"记录的数据哈希与数据不一致: {recorded_hash}")
+
+        public_key = load_public_key(signed_data['public_key'])
+        verify_digest(result['scheme'], public_key, base64.b64decode(signed_data['signature']), data_hash)
+        result['valid'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def verify_many(signed_items: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                chunksize: int = 16) -> List[Dict[str, Any]]:
+    """
+    批量验证签名
+
+    workers 为进程数（None 表示使用全部CPU，1 表示在当前进程中串行验证）。
+    返回与输入顺序一致的结果列表，每项包含 index、valid、scheme、hash_scheme、data_hash、key_fingerprint、error。
+    """
+    items = list(signed_items)
+    if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+        results = [verify_signed_item(item) for item in items]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(verify_signed_item, items, chunksize=chunksize))
+
+    for index, result in enumerate(results):
+        result['index'] = index
+    return results
@@ -0,0 +1,218 @@
+"""
+SMILES - 批量、向量化的随机分子生成
+
+一次为 N 个分子按位置采样令牌矩阵 (N, max_atoms)，只对位置做 max_atoms 次向量化循环：
+1. 主链原子取自 C/N/O/S/P，相邻原子之间的键级受两端原子剩余价态约束
+2. 支链只出现在主链原子之后、且原子还有剩余价态时，不会出现在键之后或分子开头
+3. 键符号只出现在两个主链原子之间，不会出现在分子末尾
+4. 重原子数和分子量（按SMILES有机子集的隐式氢计算）在同一次采样中得到
+
+随机抽取（sample_molecule_draws）与组装（build_molecules）分开：组装逐行独立，
+可以把多批各自用独立随机流抽取的结果拼接起来一次组装，SMILES 字符串在定长字节矩阵上一次写出。
+各类取值的概率都是 1% 或 0.1% 的整数倍，用小整数随机数查表得到，分布与按概率抽样完全相同。
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+# 主链原子：符号、默认价态、原子量、采样权重
+BACKBONE_ATOMS = ['C', 'N', 'O', 'S', 'P']
+_BACKBONE_VALENCE = np.array([4, 3, 2, 2, 3], dtype=np.int8)
+_BACKBONE_MASS = np.array([12.011, 14.007, 15.999, 32.06, 30.974])
+_BACKBONE_WEIGHTS = np.array([0.70, 0.12, 0.10, 0.05, 0.03])
+
+# 支链：(SMILES片段, 键级, 原子量, 支链原子自身的隐式氢数)
+BRANCHES = [
+    ('', 0, 0.0, 0),
+    ('(C)', 1, 12.011, 3),
+    ('(N)', 1, 14.007, 2),
+    ('(O)', 1, 15.999, 1),
+    ('(F)', 1, 18.998, 0),
+    ('(Cl)', 1, 35.45, 0),
+    ('(Br)', 1, 79.904, 0),
+    ('(I)', 1, 126.904, 0),
+    ('(=O)', 2, 15.999, 0),
+]
+_BRANCH_ORDER = np.array([branch[1] for branch in BRANCHES], dtype=np.int8)
+_BRANCH_MASS = np.array([branch[2] for branch in BRANCHES])
+_BRANCH_HYDROGENS = np.array([branch[3] for branch in BRANCHES])
+_BRANCH_WEIGHTS = np.array([0.0, 0.30, 0.12, 0.18, 0.12, 0.10, 0.06, 0.04, 0.08])
+
+# 主链键级 1/2/3 对应的SMILES符号与采样概率
+BOND_SYMBOLS = ['', '', '=', '#']
+_BOND_PROBABILITIES = np.array([0.85, 0.11, 0.04])
+
+# 含支链的概率
+BRANCH_PROBABILITY = 0.3
+
+HYDROGEN_MASS = 1.008
+
+
+def _lookup_table(probabilities: np.ndarray, resolution: int) -> np.ndarray:
+    """把概率表展开为 resolution 项的查找表：均匀整数 [0, resolution) 查表即按该概率抽样"""
+    repeats = np.rint(probabilities * resolution).astype(np.int64)
+    assert repeats.sum() == resolution, "概率必须是 1/resolution 的整数倍"
+    return np.repeat(np.arange(len(probabilities)), repeats).astype(np.int8)
+
+
+_ATOM_TABLE = _lookup_table(_BACKBONE_WEIGHTS, 100)
+_BOND_TABLE = _lookup_table(_BOND_PROBABILITIES, 100) + 1
+# 是否含支链与支链种类合成一次抽样：第 0 项（无支链）的概率为 1 - BRANCH_PROBABILITY
+_BRANCH_TABLE = _lookup_table(
+    np.concatenate([[1 - BRANCH_PROBABILITY], BRANCH_PROBABILITY * _BRANCH_WEIGHTS[1:]]), 1000
+)
+# 每个位置一次抽取的取值个数：(原子, 键级, 支链) 三个查表下标的所有组合
+_STRUCTURE_DRAWS = len(_ATOM_TABLE) * len(_BOND_TABLE) * len(_BRANCH_TABLE)
+# 抽取值整除支链查表长度后的 (原子, 键级) 下标 -> 原子 * 3 + (键级 - 1)
+_ATOM_BOND_TABLE = (_ATOM_TABLE[:, None] * len(_BOND_PROBABILITIES) + _BOND_TABLE - 1).astype(np.int16).ravel()
+# 每个位置抽到的 (原子, 期望键级, 期望支链) 组合数
+_COMBINATIONS = len(BACKBONE_ATOMS) * len(_BOND_PROBABILITIES) * len(BRANCHES)
+
+
+def _token_table() -> np.ndarray:
+    """所有 (键级, 主链原子, 支链) 组合对应的令牌字符串；最后一项为空令牌，用于分子末尾之后的位置"""
+    tokens = [
+        BOND_SYMBOLS[bond] + atom + branch[0]
+        for bond in range(4)
+        for atom in BACKBONE_ATOMS
+        for branch in BRANCHES
+    ]
+    return np.array(tokens + [''])
+
+
+_TOKENS = _token_table()
+_EMPTY_TOKEN = len(_TOKENS) - 1
+
+
+# 令牌的UTF-8字节（不足最长令牌的部分补0）与长度，用于按字节拼接SMILES
+_TOKEN_LENGTHS = np.char.str_len(_TOKENS).astype(np.int32)
+_TOKEN_WIDTH = int(_TOKEN_LENGTHS.max())
+_TOKEN_BYTES = np.frombuffer(_TOKENS.astype(f'S{_TOKEN_WIDTH}').tobytes(), dtype=np.uint8).reshape(-1, _TOKEN_WIDTH)
+
+
+def _token_properties() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    每个令牌贡献的重原子数和质量（空令牌为 0）
+
+    主链原子的隐式氢按“价态 - 支链键级 - 2 × 左侧键级”计入：分子里每个主链键都是一个原子的左侧键、
+    另一个原子的右侧键，对整个分子求和与逐个原子扣除两侧键级的结果相同。
+    """
+    bond, atom, branch = np.unravel_index(np.arange(_EMPTY_TOKEN), (len(BOND_SYMBOLS), len(BACKBONE_ATOMS), len(BRANCHES)))
+    heavy_atoms = 1 + (branch > 0)
+    hydrogens = (_BACKBONE_VALENCE[atom] - _BRANCH_ORDER[branch] - 2 * bond) + _BRANCH_HYDROGENS[branch]
+    mass = _BACKBONE_MASS[atom] + _BRANCH_MASS[branch] + hydrogens * HYDROGEN_MASS
+    return np.append(heavy_atoms, 0).astype(np.int8), np.append(mass, 0.0)
+
+
+_TOKEN_HEAVY_ATOMS, _TOKEN_MASS = _token_properties()
+
+
+def _step_table() -> np.ndarray:
+    """
+    组装时逐个位置的状态转移表
+
+    前一个主链原子留给下一个键的剩余价态（0-4）是唯一需要沿位置传递的状态。下标为
+    (剩余价态 * 2 + 后面是否还有原子) * _COMBINATIONS + 抽到的组合，值为 令牌编码 * 8 + 新的剩余价态。
+    """
+    table = np.zeros(5 * 2 * _COMBINATIONS, dtype=np.int16)
+    for previous_free in range(5):
+        for has_next in range(2):
+            for atom, valence in enumerate(_BACKBONE_VALENCE.tolist()):
+                for wanted_bond in range(1, len(_BOND_PROBABILITIES) + 1):
+                    for wanted_branch, (_, order, _, _) in enumerate(BRANCHES):
+                        # 与前一个原子的键：不超过两端原子的剩余价态，并为后一个原子保留一个价；
+                        # 分子第一个原子的状态为 0，没有左侧的键
+                        bond = min(wanted_bond, previous_free, valence - has_next)
+                        # 支链：键级超过剩余价态时不加支链
+                        branch = wanted_branch if order <= valence - bond - has_next else 0
+                        free = valence - bond - BRANCHES[branch][1]
+                        code = (bond * len(BACKBONE_ATOMS) + atom) * len(BRANCHES) + branch
+                        combination = (atom * len(_BOND_PROBABILITIES) + wanted_bond - 1) * len(BRANCHES) + wanted_branch
+                        table[(previous_free * 2 + has_next) * _COMBINATIONS + combination] = code * 8 + free
+    return table
+
+
+_STEP_TABLE = _step_table()
+
+
+def sample_molecule_draws(rng: np.random.Generator, count: int,
+                          min_atoms: int = 5, max_atoms: int = 15) -> Dict[str, np.ndarray]:
+    """
+    抽取 count 个分子的随机量（主链长度，以及每个位置的原子、键级和支链），不做组装
+
+    每个位置的三个查表下标合成一个均匀整数抽取，组装时再拆开。
+    返回的各数组第一维为分子，可以按行切片和拼接后交给 build_molecules。
+    """
+    return {
+        'backbone_length': rng.integers(min_atoms, max_atoms + 1, count, dtype=np.uint8),
+        'structure_draw': rng.integers(0, _STRUCTURE_DRAWS, (count, max_atoms), dtype=np.uint32),
+    }
+
+
+def _join_tokens(codes: np.ndarray) -> np.ndarray:
+    """
+    把每行的令牌编码按顺序拼接成字符串
+
+    先按令牌长度展开出所有字符（每个字符取自所属令牌在字节表中的对应位置），
+    再按每行的总长度一次填入宽度为最长一行的矩阵，最后整体视为 UTF-32 字符串数组。
+    """
+    count, max_atoms = codes.shape
+    codes = codes.ravel()
+    lengths = _TOKEN_LENGTHS[codes]
+    starts = np.cumsum(lengths, dtype=np.int32) - lengths
+    total = int(lengths.sum())
+    chars = _TOKEN_BYTES.ravel()[np.repeat(codes.astype(np.int32) * _TOKEN_WIDTH - starts, lengths)
+                                 + np.arange(total, dtype=np.int32)]
+    row_lengths = lengths.reshape(count, max_atoms).sum(axis=1)
+    width = max(int(row_lengths.max()), 1)
+    buffer = np.zeros((count, width), dtype=np.uint32)
+    buffer[np.arange(width) < row_lengths[:, None]] = chars
+    return buffer.view(f'U{width}').ravel()
+
+
+def build_molecules(draws: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    由 sample_molecule_draws 的随机量组装分子
+
+    返回列：smiles（字符串数组）、heavy_atom_count、molecular_weight（保留两位小数）。
+    """
+    lengths = draws['backbone_length']
+    count, max_atoms = draws['structure_draw'].shape
+    if count == 0:
+        return {
+            'smiles': np.zeros(0, dtype='<U1'),
+            'heavy_atom_count': np.zeros(0, dtype=np.int64),
+            'molecular_weight': np.zeros(0)
+        }
+
+    # 按位置逐列处理，转为 (位置, 分子) 布局使每个位置的数据连续
+    atom_bond, branch_draw = np.divmod(draws['structure_draw'].T, len(_BRANCH_TABLE))
+    inputs = _ATOM_BOND_TABLE[atom_bond] * len(BRANCHES) + _BRANCH_TABLE[branch_draw]
+    inputs += (np.arange(1, max_atoms + 1)[:, None] < lengths) * np.int16(_COMBINATIONS)
+
+    codes = np.empty((max_atoms, count), dtype=np.int16)
+    previous_free = np.zeros(count, dtype=np.int16)
+    for position in range(max_atoms):
+        step = _STEP_TABLE[previous_free * np.int16(2 * _COMBINATIONS) + inputs[position]]
+        codes[position] = step >> 3
+        previous_free = step & 7
+
+    present = np.arange(max_atoms)[:, None] < lengths
+    codes[~present] = _EMPTY_TOKEN
+    codes = np.ascontiguousarray(codes.T)
+
+    return {
+        'smiles': _join_tokens(codes),
+        'heavy_atom_count': _TOKEN_HEAVY_ATOMS[codes].sum(axis=1, dtype=np.int64),
+        'molecular_weight': _TOKEN_MASS[codes].sum(axis=1).round(2)
+    }
+
+
+def generate_smiles_batch(rng: np.random.Generator, count: int,
+                          min_atoms: int = 5, max_atoms: int = 15) -> Dict[str, np.ndarray]:
+    """
+    批量生成随机分子
+
+    返回列：smiles（字符串数组）、heavy_atom_count、molecular_weight（保留两位小数）。
+    """
+    return build_molecules(sample_molecule_draws(rng, count, min_atoms, max_atoms))
@@ -0,0 +1,272 @@
+"""
+Stat Models - 相关列的批量采样模型
+
+真实数据中的数值列并不相互独立：结合力随 logP 变化，质量分随测序深度变化，
+AI预测置信度随诊断一致性变化。CorrelatedModel 用高斯 copula 一次采样一组相关列：
+1. 一次生成 (相关列数, 行数) 的独立标准正态矩阵，乘以相关矩阵的 Cholesky 因子得到相关正态
+2. 每列再按各自的边缘分布做向量化变换：正态、均匀、对数均匀、整数、带频率的分类
+3. 分类列按累积频率切分潜在正态变量，频率可以偏斜（如 Zipf），也可以与数值列相关
+4. 不与其他列相关的列直接按边缘分布采样
+
+边缘分布只改变取值范围和形状，列之间的秩相关由相关矩阵决定。
+"""
+
+import math
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 独立分类列按查表采样：表长 2^16，类别频率的分辨率为 1/65536
+_CATEGORY_TABLE_BITS = 16
+
+# 标准正态分布函数的有理近似系数（Abramowitz & Stegun 7.1.26，绝对误差 < 1.5e-7）
+_ERF_P = 0.3275911
+_ERF_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+
+
+def normal_cdf(z: np.ndarray) -> np.ndarray:
+    """向量化的标准正态分布函数（原地计算，只分配两个临时数组）"""
+    x = np.abs(z)
+    x *= 1 / math.sqrt(2)
+    t = x * _ERF_P
+    t += 1.0
+    np.reciprocal(t, out=t)
+
+    # Horner 求多项式，结果再乘以 exp(-x^2) / 2 得到单侧尾概率
+    a1, a2, a3, a4, a5 = _ERF_A
+    tail = t * a5
+    for coefficient in (a4, a3, a2, a1):
+        tail += coefficient
+        tail *= t
+    np.square(x, out=x)
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    tail *= x
+    tail *= 0.5
+    np.subtract(1.0, tail, out=tail, where=z >= 0)
+    return tail
+
+
+def zipf_weights(count: int, exponent: float = 1.0) -> List[float]:
+    """按 Zipf 分布生成 count 个类别的偏斜频率（第一个类别最常见）"""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return (weights / weights.sum()).tolist()
+
+
+def _rounded(values: np.ndarray, decimals: Optional[int]) -> np.ndarray:
+    return values if decimals is None else values.round(decimals, out=values)
+
+
+def _scaled(u: np.ndarray, low: float, high: float) -> np.ndarray:
+    """把 [0, 1) 上的值原地线性映射到 [low, high)"""
+    u *= high - low
+    u += low
+    return u
+
+
+class Marginal(ABC):
+    """边缘分布基类：把标准正态变量变换为该列的取值"""
+
+    kind = ''
+
+    @abstractmethod
+    def transform(self, z: np.ndarray) -> Any:
+        """把标准正态变量变换为该列的取值"""
+
+    @abstractmethod
+    def sample(self, rng: np.random.Generator, size: int) -> Any:
+        """与其他列无关时直接采样，不经过正态变换"""
+
+    def describe(self) -> Dict[str, Any]:
+        """可写入JSON的参数描述"""
+        params = {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
+        return {'kind': self.kind, **params}
+
+
+class Normal(Marginal):
+    """正态分布"""
+
+    kind = 'normal'
+
+    def __init__(self, loc: float = 0.0, scale: float = 1.0, decimals: Optional[int] = None):
+        self.loc = loc
+        self.scale = scale
+        self.decimals = decimals
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        return _rounded(self.loc + self.scale * z, self.decimals)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return _rounded(rng.normal(self.loc, self.scale, size), self.decimals)
+
+
+class Uniform(Marginal):
+    """[low, high) 上的均匀分布"""
+
+    kind = 'uniform'
+
+    def __init__(self, low: float = 0.0, high: float = 1.0, decimals: Optional[int] = None):
+        self.low = low
+        self.high = high
+        self.decimals = decimals
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        return _rounded(_scaled(normal_cdf(z), self.low, self.high), self.decimals)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return _rounded(rng.uniform(self.low, self.high, size), self.decimals)
+
+
+class LogUniform(Marginal):
+    """对数均匀分布（取值跨多个数量级，如溶解度、等位基因频率）"""
+
+    kind = 'log_uniform'
+
+    def __init__(self, low: float, high: float, decimals: Optional[int] = None):
+        if low <= 0 or high <= low:
+            raise ValueError("LogUniform 需要 0 < low < high")
+        self.low = low
+        self.high = high
+        self.decimals = decimals
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        return self._from_unit(normal_cdf(z))
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return self._from_unit(rng.random(size))
+
+    def _from_unit(self, u: np.ndarray) -> np.ndarray:
+        u = _scaled(u, math.log(self.low), math.log(self.high))
+        return _rounded(np.exp(u, out=u), self.decimals)
+
+
+class Integers(Marginal):
+    """[low, high) 上的均匀整数"""
+
+    kind = 'integers'
+
+    def __init__(self, low: int, high: int):
+        self.low = low
+        self.high = high
+
+    def transform(self, z: np.ndarray) -> np.ndarray:
+        values = np.floor(_scaled(normal_cdf(z), self.low, self.high)).astype(np.int64)
+        return np.clip(values, self.low, self.high - 1, out=values)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.integers(self.low, self.high, size)
+
+
+class Categorical(Marginal):
+    """
+    带频率的分类分布
+
+    潜在正态变量按累积频率的分位点切分；与数值列相关时，
+    排在后面的类别对应更大的潜在值。独立采样时用16位随机数查表，
+    与等概率的 rng.integers 开销相当。
+    """
+
+    kind = 'categorical'
+
+    def __init__(self, categories: Sequence[str], weights: Optional[Sequence[float]] = None):
+        if weights is None:
+            weights = [1.0] * len(categories)
+        if len(weights) != len(categories):
+            raise ValueError("weights 与 categories 长度不一致")
+        total = float(sum(weights))
+        self.categories = list(categories)
+        self.weights = [weight / total for weight in weights]
+        self._table: Optional[np.ndarray] = None
+        self._dtype: Optional[pd.CategoricalDtype] = None
+
+    def transform(self, z: np.ndarray) -> pd.Categorical:
+        standard = NormalDist()
+        thresholds = [standard.inv_cdf(min(max(p, 1e-12), 1 - 1e-12)) for p in self._cumulative()]
+        return self._from_codes(np.searchsorted(thresholds, z, side='right'))
+
+    def sample(self, rng: np.random.Generator, size: int) -> pd.Categorical:
+        if len(set(self.weights)) == 1:
+            return self._from_codes(rng.integers(0, len(self.categories), size))
+        if self._table is None:
+            slots = 1 << _CATEGORY_TABLE_BITS
+            self._table = self._from_codes(
+                np.searchsorted(self._cumulative(), (np.arange(slots) + 0.5) / slots, side='right')
+            ).codes
+        index = rng.integers(0, 1 << _CATEGORY_TABLE_BITS, size, dtype=np.uint16)
+        return self._from_codes(self._table[index])
+
+    def _cumulative(self) -> np.ndarray:
+        return np.cumsum(self.weights)[:-1]
+
+    def _from_codes(self, codes: np.ndarray) -> pd.Categorical:
+        # 复用同一个 CategoricalDtype，按行块采样时不必每次重新校验类别
+        if self._dtype is None:
+            self._dtype = pd.CategoricalDtype(self.categories)
+        dtype = np.min_scalar_type(-len(self.categories))
+        return pd.Categorical.from_codes(codes.astype(dtype), dtype=self._dtype)
+
+
+class CorrelatedModel:
+    """
+    高斯 copula：按相关系数一次采样多列
+
+    correlations 只需给出相关的列对，未给出的列对相互独立。
+    相关矩阵必须正定，否则构造时抛出 ValueError。
+    不参与任何相关的列按边缘分布直接采样，不付出正态变换的开销。
+    """
+
+    def __init__(self, marginals: Dict[str, Marginal],
+                 correlations: Optional[Dict[Tuple[str, str], float]] = None):
+        self.marginals = dict(marginals)
+        self.names = list(self.marginals)
+        self.correlations = dict(correlations or {})
+
+        for first, second in self.correlations:
+            if first not in self.marginals or second not in self.marginals:
+                raise ValueError(f"相关系数引用了未知的列: {first}, {second}")
+        linked = {name for pair in self.correlations for name in pair}
+        self._correlated = [name for name in self.names if name in linked]
+        self._independent = [name for name in self.names if name not in linked]
+
+        position = {name: i for i, name in enumerate(self._correlated)}
+        matrix = np.eye(len(self._correlated))
+        for (first, second), rho in self.correlations.items():
+            if not -1 < rho < 1:
+                raise ValueError(f"相关系数必须在 (-1, 1) 之间: {first}, {second} = {rho}")
+            matrix[position[first], position[second]] = rho
+            matrix[position[second], position[first]] = rho
+        try:
+            self._cholesky = np.linalg.cholesky(matrix)
+        except np.linalg.LinAlgError:
+            raise ValueError("相关矩阵不是正定矩阵")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def sample(self, rng: np.random.Generator, size: int) -> Dict[str, Any]:
+        """采样 size 行：相关列一次矩阵运算，独立列逐列直接采样"""
+        columns = {}
+        if self._correlated:
+            z = self._cholesky @ rng.standard_normal((len(self._correlated), size))
+            for i, name in enumerate(self._correlated):
+                columns[name] = self.marginals[name].transform(z[i])
+        for name in self._independent:
+            columns[name] = self.marginals[name].sample(rng, size)
+        return {name: columns[name] for name in self.names}
+
+    def describe(self) -> Dict[str, Any]:
+        """可写入JSON的模型描述"""
+        return {
+            'marginals': {name: marginal.describe() for name, marginal in self.marginals.items()},
+            'correlations': [[first, second, rho] for (first, second), rho in self.correlations.items()]
+        }
+
+    def fingerprint(self) -> str:
+        """模型描述的短哈希，用于区分生成参数"""
+        encoded = json.dumps(self.describe(), sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
@@ -0,0 +1,498 @@
+"""
+Summaries - 数据集的预计算摘要与倒排索引
+
+生成数据集时一并输出两个附属文件，常见的筛选和统计无需读取数据本体：
+1. <basename>.summary.json：行数；数值列的 min/max/mean/std 与直方图；
+   分类列的取值计数；日期列的范围；长字符串列（ID、SMILES）的长度范围
+2. <basename>.index.npz：分类字段的倒排索引（取值 → 行号），如 gene → 变异行、
+   target_protein → 化合物行、modality → 影像行；行号再对应到数据集的ID列
+
+倒排索引按取值分组保存：values（取值表）、offsets（每个取值在 rows 中的起止位置）、
+rows（按取值排序、组内按行号升序的行号），查询一个取值只需一次切片。
+
+分块生成的数据用 SummaryAccumulator 在同一遍中累加摘要和倒排索引，不需要再读取整列。
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+SUMMARY_VERSION = 1
+
+# 数值列直方图的默认分箱数
+DEFAULT_HISTOGRAM_BINS = 20
+
+# 唯一值不超过该数量的字符串列按分类列统计取值
+MAX_VALUE_COUNTS = 1000
+
+# 流式统计字符串列取值时每段的行数
+_VALUE_COUNT_BLOCK = 4 * MAX_VALUE_COUNTS
+
+# 索引文件中各数组的键后缀
+_VALUES_SUFFIX = '.values'
+_OFFSETS_SUFFIX = '.offsets'
+_ROWS_SUFFIX = '.rows'
+
+
+def _as_categorical(column: Any) -> Optional[pd.Categorical]:
+    """把分类列或低基数的字符串列转为 pd.Categorical；其余返回 None"""
+    if isinstance(column, pd.Categorical):
+        return column
+    if hasattr(column, 'to_categorical'):
+        return column.to_categorical()
+    if hasattr(column, 'offsets'):
+        # column_store.StringColumn：高基数字符串，不做取值统计
+        return None
+    array = np.asarray(column)
+    if array.dtype.kind not in 'UOS':
+        return None
+    codes, uniques = pd.factorize(array)
+    if len(uniques) > MAX_VALUE_COUNTS:
+        return None
+    return pd.Categorical.from_codes(codes, categories=np.asarray(uniques).astype(str))
+
+
+def _histogram_edges(low: Any, high: Any, kind: str, bins: int) -> np.ndarray:
+    """按整列的取值范围确定直方图的箱边界"""
+    if kind in 'iu':
+        # 整数列的箱边界对齐到整数，取值范围小于分箱数时每个整数一箱
+        bins = int(min(bins, high - low + 1))
+        return np.linspace(low, high + 1, bins + 1)
+    return np.linspace(low, high, bins + 1) if high > low else np.array([low, low + 1.0])
+
+
+def _numeric_summary(values: np.ndarray, bins: int) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {'type': 'numeric', 'dtype': str(values.dtype), 'count': int(values.size)}
+    if not values.size:
+        return summary
+
+    low, high = values.min(), values.max()
+    counts, edges = np.histogram(values, bins=_histogram_edges(low, high, values.dtype.kind, bins))
+
+    summary.update({
+        'min': low.item(),
+        'max': high.item(),
+        'mean': float(values.mean(dtype=np.float64)),
+        'std': float(values.std(dtype=np.float64)),
+        'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()}
+    })
+    return summary
+
+
+def summarize_column(column: Any, bins: int = DEFAULT_HISTOGRAM_BINS) -> Dict[str, Any]:
+    """单列摘要"""
+    categorical = _as_categorical(column)
+    if categorical is not None:
+        counts = np.bincount(categorical.codes[categorical.codes >= 0], minlength=len(categorical.categories))
+        return {
+            'type': 'categorical',
+            'count': len(categorical),
+            'distinct': int(np.count_nonzero(counts)),
+            'value_counts': {str(value): int(count)
+                             for value, count in zip(categorical.categories, counts) if count}
+        }
+
+    if hasattr(column, 'offsets'):
+        lengths = np.diff(np.asarray(column.offsets))
+        return _string_summary(len(column), lengths)
+
+    values = np.asarray(column)
+    if values.dtype.kind == 'M':
+        summary = {'type': 'date', 'count': int(values.size)}
+        if values.size:
+            summary['min'] = str(np.datetime_as_string(values.min(), unit='auto'))
+            summary['max'] = str(np.datetime_as_string(values.max(), unit='auto'))
+        return summary
+    if values.dtype.kind in 'UOS':
+        return _string_summary(values.size, np.char.str_len(values.astype(str)))
+    if values.dtype.kind == 'b':
+        return {'type': 'boolean', 'count': int(values.size), 'true': int(np.count_nonzero(values))}
+    return _numeric_summary(values, bins)
+
+
+def _string_summary(count: int, lengths: np.ndarray) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {'type': 'string', 'count': int(count)}
+    if len(lengths):
+        summary['min_length'] = int(lengths.min())
+        summary['max_length'] = int(lengths.max())
+    return summary
+
+
+def summarize_columns(columns: Dict[str, Any], bins: int = DEFAULT_HISTOGRAM_BINS) -> Dict[str, Any]:
+    """整个数据集（列式）的摘要"""
+    num_rows = len(next(iter(columns.values()))) if columns else 0
+    return {
+        'summary_version': SUMMARY_VERSION,
+        'num_rows': num_rows,
+        'columns': {name: summarize_column(column, bins) for name, column in columns.items()}
+    }
+
+
+class InvertedIndex:
+    """分类字段的倒排索引：取值 → 升序行号"""
+
+    __slots__ = ('values', 'offsets', 'rows', '_positions')
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray, rows: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+        self.rows = rows
+        self._positions: Optional[Dict[Any, int]] = None
+
+    @classmethod
+    def build(cls, column: Any) -> 'InvertedIndex':
+        """按一列建立索引（一次稳定排序，组内行号保持升序）"""
+        categorical = column if isinstance(column, pd.Categorical) else None
+        if categorical is None and hasattr(column, 'to_categorical'):
+            categorical = column.to_categorical()
+        if categorical is not None:
+            codes = np.asarray(categorical.codes)
+            values = np.asarray(categorical.categories.tolist())
+        else:
+            codes, values = pd.factorize(np.asarray(column), sort=True)
+            values = np.asarray(values)
+        if values.dtype.kind == 'O':
+            values = values.astype(str)
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        row_dtype = np.int32 if len(codes) < np.iinfo(np.int32).max else np.int64
+        rows = np.argsort(codes, kind='stable').astype(row_dtype)
+        # 缺失值（编码 -1）排在最前面，不属于任何取值
+        rows = rows[len(codes) - offsets[-1]:]
+        return cls(values, offsets, rows)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _position(self, value: Any) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {item: i for i, item in enumerate(self.values.tolist())}
+        return self._positions.get(value)
+
+    def lookup(self, value: Any) -> np.ndarray:
+        """取值对应的升序行号（不存在时为空数组）"""
+        position = self._position(value)
+        if position is None:
+            return self.rows[:0]
+        return self.rows[self.offsets[position]:self.offsets[position + 1]]
+
+    def lookup_many(self, values: Iterable[Any]) -> np.ndarray:
+        """多个取值的行号并集（升序）"""
+        parts = [self.lookup(value) for value in values]
+        return np.sort(np.concatenate(parts)) if parts else self.rows[:0]
+
+    def counts(self) -> Dict[str, int]:
+        """各取值的行数"""
+        sizes = np.diff(self.offsets)
+        return {str(value): int(size) for value, size in zip(self.values.tolist(), sizes)}
+
+    def describe(self) -> Dict[str, Any]:
+        return {'values': len(self), 'rows': int(self.offsets[-1])}
+
+
+def build_indexes(columns: Dict[str, Any], fields: Iterable[str]) -> Dict[str, InvertedIndex]:
+    """为指定字段建立倒排索引（数据中不存在的字段跳过）"""
+    return {field: InvertedIndex.build(columns[field]) for field in fields if field in columns}
+
+
+def save_indexes(indexes: Dict[str, InvertedIndex], filename: str):
+    """把多个倒排索引写入一个压缩NPZ文件"""
+    arrays = {}
+    for field, index in indexes.items():
+        arrays[field + _VALUES_SUFFIX] = index.values
+        arrays[field + _OFFSETS_SUFFIX] = index.offsets
+        arrays[field + _ROWS_SUFFIX] = index.rows
+    np.savez_compressed(filename, **arrays)
+
+
+def load_indexes(filename: str, fields: Optional[List[str]] = None) -> Dict[str, InvertedIndex]:
+    """读取全部或部分字段的倒排索引"""
+    indexes = {}
+    with np.load(filename, allow_pickle=False) as npz:
+        available = [key[:-len(_VALUES_SUFFIX)] for key in npz.files if key.endswith(_VALUES_SUFFIX)]
+        for field in (fields if fields is not None else available):
+            indexes[field] = InvertedIndex(
+                npz[field + _VALUES_SUFFIX],
+                npz[field + _OFFSETS_SUFFIX],
+                npz[field + _ROWS_SUFFIX]
+            )
+    return indexes
+
+
+class _ColumnAccumulator:
+    """单列摘要的流式累加，结果与 summarize_column 相同（均值和标准差按块合并）"""
+
+    def __init__(self):
+        self.type: Optional[str] = None
+        self.dtype: Optional[np.dtype] = None
+        self.count = 0
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.true = 0
+        # 分类取值计数（按首次出现的顺序）；字符串列的唯一值超过 MAX_VALUE_COUNTS 时置为 None
+        self.value_counts: Optional[Dict[str, int]] = {}
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+        self.edges: Optional[np.ndarray] = None
+        self.histogram: Optional[np.ndarray] = None
+
+    def _extend_range(self, low: Any, high: Any):
+        if self.minimum is None or low < self.minimum:
+            self.minimum = low
+        if self.maximum is None or high > self.maximum:
+            self.maximum = high
+
+    def _count_values(self, categorical: pd.Categorical):
+        counts = np.bincount(categorical.codes[categorical.codes >= 0], minlength=len(categorical.categories))
+        for value, count in zip(categorical.categories.tolist(), counts.tolist()):
+            if count or self.type == 'categorical':
+                self.value_counts[str(value)] = self.value_counts.get(str(value), 0) + count
+
+    def _extend_lengths(self, lengths: np.ndarray):
+        if len(lengths):
+            low, high = int(lengths.min()), int(lengths.max())
+            self.min_length = low if self.min_length is None else min(self.min_length, low)
+            self.max_length = high if self.max_length is None else max(self.max_length, high)
+
+    def update(self, column: Any):
+        """累加一块数据"""
+        if isinstance(column, pd.Categorical) or hasattr(column, 'to_categorical'):
+            self.type = 'categorical'
+            categorical = column if isinstance(column, pd.Categorical) else column.to_categorical()
+            self._count_values(categorical)
+            self.count += len(categorical)
+            return
+        if hasattr(column, 'offsets'):
+            self.type = 'string'
+            self.count += len(column)
+            self._extend_lengths(np.diff(np.asarray(column.offsets)))
+            return
+
+        values = np.asarray(column)
+        kind = values.dtype.kind
+        if kind in 'UOS':
+            # 低基数字符串列按分类列统计，同时记录长度，唯一值过多时退化为字符串摘要
+            self.type = 'string'
+            self.count += values.size
+            strings = values if kind == 'U' else values.astype(str)
+            self._extend_lengths(np.char.str_len(strings))
+            # 分段统计，ID 这类高基数列在第一段就会超出上限，不必对整块做哈希
+            for start in range(0, len(strings), _VALUE_COUNT_BLOCK):
+                if self.value_counts is None:
+                    break
+                codes, uniques = pd.factorize(strings[start:start + _VALUE_COUNT_BLOCK])
+                self._count_values(pd.Categorical.from_codes(codes, categories=np.asarray(uniques).astype(str)))
+                if len(self.value_counts) > MAX_VALUE_COUNTS:
+                    self.value_counts = None
+            return
+
+        size = values.size
+        self.count += size
+        if kind == 'b':
+            self.type = 'boolean'
+            self.true += int(np.count_nonzero(values))
+            return
+        if kind == 'M':
+            self.type = 'date'
+        else:
+            self.type = 'numeric'
+            self.dtype = values.dtype
+            if size:
+                # 按块合并均值和平方偏差和（Chan 等人的并行算法）
+                mean = float(values.mean(dtype=np.float64))
+                m2 = float(np.square(values - mean, dtype=np.float64).sum())
+                total = self.count
+                delta = mean - self.mean
+                self.mean += delta * size / total
+                self.m2 += m2 + delta * delta * (total - size) * size / total
+        if size:
+            self._extend_range(values.min(), values.max())
+
+    def histogram_edges(self, bins: int) -> Optional[np.ndarray]:
+        """数值列的箱边界（需要先累加完所有数据）"""
+        if self.type != 'numeric' or self.minimum is None:
+            return None
+        if self.edges is None:
+            self.edges = _histogram_edges(self.minimum, self.maximum, self.dtype.kind, bins)
+            self.histogram = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        return self.edges
+
+    def update_histogram(self, column: Any, bins: int):
+        counts, _ = np.histogram(np.asarray(column), bins=self.histogram_edges(bins))
+        self.histogram += counts
+
+    def summary(self) -> Dict[str, Any]:
+        if self.type == 'categorical' or (self.type == 'string' and self.value_counts is not None):
+            return {
+                'type': 'categorical',
+                'count': self.count,
+                'distinct': sum(1 for count in self.value_counts.values() if count),
+                'value_counts': {value: count for value, count in self.value_counts.items() if count}
+            }
+        if self.type == 'string':
+            summary: Dict[str, Any] = {'type': 'string', 'count': self.count}
+            if self.min_length is not None:
+                summary['min_length'] = self.min_length
+                summary['max_length'] = self.max_length
+            return summary
+        if self.type == 'boolean':
+            return {'type': 'boolean', 'count': self.count, 'true': self.true}
+        if self.type == 'date':
+            summary = {'type': 'date', 'count': self.count}
+            if self.minimum is not None:
+                summary['min'] = str(np.datetime_as_string(self.minimum, unit='auto'))
+                summary['max'] = str(np.datetime_as_string(self.maximum, unit='auto'))
+            return summary
+
+        summary = {'type': 'numeric', 'dtype': str(self.dtype), 'count': self.count}
+        if self.minimum is not None:
+            summary.update({
+                'min': self.minimum.item(),
+                'max': self.maximum.item(),
+                'mean': self.mean,
+                'std': float(np.sqrt(self.m2 / self.count)),
+                'histogram': {'edges': self.edges.tolist(), 'counts': self.histogram.tolist()}
+            })
+        return summary
+
+
+class _IndexAccumulator:
+    """
+    倒排索引的流式构建
+
+    每块只保存按全局取值表编号的紧凑编码（通常每行1字节），完成时按取值逐块找出行号，
+    直接写入最终的行号数组，不需要整列的排序临时数组。
+    """
+
+    def __init__(self):
+        self.positions: Dict[Any, int] = {}
+        self.categorical = False
+        self.num_rows = 0
+        self.pieces: List[np.ndarray] = []
+
+    def update(self, column: Any):
+        """累加一块数据（行号从已累加的行数开始）"""
+        if hasattr(column, 'to_categorical'):
+            column = column.to_categorical()
+        if isinstance(column, pd.Categorical):
+            self.categorical = True
+            local, values = np.asarray(column.codes), column.categories.tolist()
+        else:
+            local, values = pd.factorize(np.asarray(column))
+            values = values.tolist()
+        # 块内编码映射到全局编号，缺失值保持 -1
+        mapping = np.asarray([self.positions.setdefault(value, len(self.positions)) for value in values] + [-1])
+        code_dtype = np.int8 if len(self.positions) < 128 else np.int16 if len(self.positions) < 32768 else np.int32
+        self.pieces.append(mapping[local].astype(code_dtype))
+        self.num_rows += len(local)
+
+    def index(self) -> InvertedIndex:
+        """按取值（分类列按取值表顺序，其余按排序后的取值）拼接各块的行号"""
+        values = list(self.positions)
+        order = list(range(len(values))) if self.categorical else sorted(range(len(values)),
+                                                                          key=lambda i: values[i])
+        counts = np.zeros(len(values), dtype=np.int64)
+        for piece in self.pieces:
+            counts += np.bincount(piece[piece >= 0], minlength=len(values))
+
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(counts[order], out=offsets[1:])
+        row_dtype = np.int32 if self.num_rows < np.iinfo(np.int32).max else np.int64
+        rows = np.empty(int(offsets[-1]), dtype=row_dtype)
+        position = 0
+        for value in order:
+            base = 0
+            for piece in self.pieces:
+                part = np.flatnonzero(piece == value)
+                rows[position:position + len(part)] = part + base
+                position += len(part)
+                base += len(piece)
+
+        values_array = np.asarray([values[i] for i in order])
+        if values_array.dtype.kind == 'O':
+            values_array = values_array.astype(str)
+        return InvertedIndex(values_array, offsets, rows)
+
+
+class SummaryAccumulator:
+    """
+    按块累加数据集摘要和倒排索引，结果与 summarize_columns / build_indexes 相同
+
+    直方图的箱边界取决于整列的取值范围，所以数值列的直方图在累加完所有块之后
+    再用 update_histograms 逐块统计（只读取数值列）；histogram_columns 给出需要的列。
+    """
+
+    def __init__(self, index_fields: Iterable[str] = (), bins: int = DEFAULT_HISTOGRAM_BINS):
+        self.bins = bins
+        self.index_fields = list(index_fields)
+        self.columns: Dict[str, _ColumnAccumulator] = {}
+        self.index_builders: Dict[str, _IndexAccumulator] = {}
+        self.num_rows = 0
+
+    def update(self, columns: Dict[str, Any]):
+        """累加一块列式数据"""
+        for name, column in columns.items():
+            self.columns.setdefault(name, _ColumnAccumulator()).update(column)
+        for field in self.index_fields:
+            if field in columns:
+                self.index_builders.setdefault(field, _IndexAccumulator()).update(columns[field])
+        if columns:
+            self.num_rows += len(next(iter(columns.values())))
+
+    @property
+    def histogram_columns(self) -> List[str]:
+        """需要第二遍统计直方图的数值列"""
+        return [name for name, column in self.columns.items() if column.histogram_edges(self.bins) is not None]
+
+    def update_histograms(self, columns: Dict[str, Any]):
+        """第二遍：按整列的箱边界累加一块数值列的直方图"""
+        for name, column in columns.items():
+            self.columns[name].update_histogram(column, self.bins)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'summary_version': SUMMARY_VERSION,
+            'num_rows': self.num_rows,
+            'columns': {name: column.summary() for name, column in self.columns.items()}
+        }
+
+    def indexes(self) -> Dict[str, InvertedIndex]:
+        return {field: builder.index() for field, builder in self.index_builders.items()}
+
+
+def save_sidecars(summary: Dict[str, Any], indexes: Dict[str, InvertedIndex], basename: str,
+                  id_field: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """写入已算好的摘要和倒排索引，返回摘要"""
+    if extra:
+        summary.update(extra)
+
+    if indexes:
+        index_file = f"{basename}.index.npz"
+        save_indexes(indexes, index_file)
+        summary['indexes'] = {
+            'file': os.path.basename(index_file),
+            'id_field': id_field,
+            'fields': {field: index.describe() for field, index in indexes.items()}
+        }
+
+    with open(f"{basename}.summary.json", 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+def write_sidecars(columns: Dict[str, Any], basename: str, index_fields: Iterable[str] = (),
+                   id_field: Optional[str] = None, bins: int = DEFAULT_HISTOGRAM_BINS,
+                   extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    写入 <basename>.summary.json 与 <basename>.index.npz，返回摘要
+
+    摘要的 indexes 部分记录每个索引字段的取值数和ID列，查询时按行号取 id_field 列即可得到ID。
+    """
+    return save_sidecars(summarize_columns(columns, bins), build_indexes(columns, index_fields),
+                         basename, id_field, extra)
@@ -0,0 +1,165 @@
+"""bulk_uploader 对照本地替身后端的测试（批量、分块、Retry-After、检查点续传）"""
+
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from email.utils import formatdate
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+
+from bulk_uploader import BATCH_ENDPOINT, CHUNK_ENDPOINT, MIN_BODY_BYTES, BulkUploader, UploadError
+
+
+class StandInBackend:
+    """
+    后端 API 的本地替身：实现批量和分块端点
+
+    rate_limited 个请求先返回 429（带 retry_after），fail_after 个项目之后批量请求返回 400。
+    """
+
+    def __init__(self, max_body_bytes=10 * 1024 * 1024, rate_limited=0, retry_after='0', fail_after=None):
+        self.max_body_bytes = max_body_bytes
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.fail_after = fail_after
+        self.projects = []
+        self.requests = 0
+        self._chunks = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._port}"
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=10)
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+    async def _start(self):
+        app = web.Application(client_max_size=self.max_body_bytes * 2)
+        app.add_routes([web.post(BATCH_ENDPOINT, self._batch), web.post(CHUNK_ENDPOINT, self._chunk)])
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self._port = site._server.sockets[0].getsockname()[1]
+
+    async def _read(self, request):
+        self.requests += 1
+        body = await request.read()
+        if len(body) > self.max_body_bytes:
+            raise web.HTTPRequestEntityTooLarge(max_size=self.max_body_bytes, actual_size=len(body))
+        if self.rate_limited > 0:
+            self.rate_limited -= 1
+            raise web.HTTPTooManyRequests(headers={'Retry-After': self.retry_after})
+        return json.loads(body)
+
+    async def _batch(self, request):
+        projects = (await self._read(request))['projects']
+        if not projects:
+            raise web.HTTPBadRequest(text='empty batch')
+        if self.fail_after is not None and len(self.projects) + len(projects) > self.fail_after:
+            raise web.HTTPBadRequest(text='rejected')
+        self.projects.extend(projects)
+        return web.json_response({'success': True, 'created': len(projects)})
+
+    async def _chunk(self, request):
+        body = await self._read(request)
+        upload = self._chunks.setdefault(body['upload_id'], {})
+        upload[body['index']] = body['chunk']
+        if len(upload) == body['total']:
+            payload = ''.join(upload[i] for i in range(body['total']))
+            if hashlib.sha256(payload.encode('utf-8')).hexdigest() != body['sha256']:
+                raise web.HTTPUnprocessableEntity(text='sha256 mismatch')
+            self.projects.append(json.loads(payload))
+        return web.json_response({'success': True})
+
+
+@pytest.fixture
+def backend(request):
+    server = StandInBackend(**getattr(request, 'param', {})).start()
+    yield server
+    server.stop()
+
+
+def make_project(index):
+    return {'index': index, 'title': f"研究项目 {index}"}
+
+
+def test_uploads_every_project_in_batches(backend):
+    uploader = BulkUploader(backend.url, batch_size=40, concurrency=4)
+    summary = uploader.run(make_project, 250)
+
+    assert sorted(project['index'] for project in backend.projects) == list(range(250))
+    assert summary['uploaded'] == 250
+    assert summary['batches'] == 7
+
+
+def test_oversized_project_is_uploaded_in_chunks(backend):
+    big = {'index': 1, 'payload': 'α' * (3 * MIN_BODY_BYTES)}
+    uploader = BulkUploader(backend.url, max_body_bytes=MIN_BODY_BYTES)
+    summary = uploader.run([make_project(0), big])
+
+    assert summary['chunked'] == 1
+    assert sorted(backend.projects, key=lambda project: project['index']) == [make_project(0), big]
+
+
+@pytest.mark.parametrize('backend', [{'max_body_bytes': MIN_BODY_BYTES}], indirect=True)
+def test_project_filling_the_whole_body_is_sent_alone(backend):
+    # 序列化后恰好占满请求体上限的项目：单独成批，不走分块，也不产生空批次
+    target = MIN_BODY_BYTES - len(b'{"projects":[]}')
+    padding = target - len(json.dumps({'index': 0, 'payload': ''}).encode('utf-8'))
+    projects = [{'index': index, 'payload': 'x' * padding} for index in range(3)]
+    assert all(len(json.dumps(project).encode('utf-8')) == target for project in projects)
+
+    summary = BulkUploader(backend.url, max_body_bytes=MIN_BODY_BYTES, concurrency=1).run(projects)
+
+    assert summary['batches'] == 3
+    assert summary['chunked'] == 0
+    assert sorted(project['index'] for project in backend.projects) == [0, 1, 2]
+
+
+@pytest.mark.parametrize('backend', [{'rate_limited': 1, 'retry_after': '1'}], indirect=True)
+def test_retry_after_is_honoured_beyond_backoff_max(backend):
+    uploader = BulkUploader(backend.url, backoff_max=0.01)
+    started = time.perf_counter()
+    summary = uploader.run(make_project, 3)
+
+    assert time.perf_counter() - started >= 0.9
+    assert summary['retries'] == 1
+    assert len(backend.projects) == 3
+
+
+def test_retry_after_accepts_http_dates():
+    uploader = BulkUploader('http://127.0.0.1:1', backoff_max=1)
+
+    assert uploader._backoff(0, '900') == 900
+    assert 100 < uploader._backoff(0, formatdate(time.time() + 120, usegmt=True)) <= 120
+    assert uploader._backoff(0, 'soon') <= 1
+
+
+@pytest.mark.parametrize('backend', [{'fail_after': 60}], indirect=True)
+def test_resume_from_checkpoint_skips_uploaded_projects(backend, tmp_path):
+    checkpoint = str(tmp_path / 'upload.checkpoint.json')
+    with pytest.raises(UploadError):
+        BulkUploader(backend.url, batch_size=20, concurrency=1, checkpoint_path=checkpoint).run(make_project, 100)
+    assert len(backend.projects) == 60
+
+    backend.fail_after = None
+    summary = BulkUploader(backend.url, batch_size=20, concurrency=1,
+                           checkpoint_path=checkpoint).run(make_project, 100)
+
+    assert summary['skipped'] == 60
+    assert sorted(project['index'] for project in backend.projects) == list(range(100))
@@ -0,0 +1,88 @@
+"""canonical 规范编码：与布局无关的数据集哈希，以及签名→JSON→验证的往返"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from canonical import canonical_digest, dataset_digest, encode
+from column_store import write_column_store, ColumnStore
+from data_generator import DeSciDataGenerator, json_default
+from records import RecordTable
+from signing import SCHEME_ED25519, SCHEME_RSA_PSS, create_signer, sign_payload, verify_signed_item
+
+RECORDS = [
+    {'id': 'A-1', 'score': 0.5, 'count': 3, 'flag': True, 'label': '阳性'},
+    {'id': 'A-2', 'score': 1.25, 'count': 7, 'flag': False, 'label': '阴性'},
+    {'id': 'A-3', 'score': -2.0, 'count': 0, 'flag': True, 'label': '阳性'},
+]
+
+
+def columns_of(records):
+    return {name: [record[name] for record in records] for name in records[0]}
+
+
+def test_dataset_digest_is_layout_independent(tmp_path):
+    lists = columns_of(RECORDS)
+    arrays = {
+        'id': np.array(lists['id']),
+        'score': np.array(lists['score']),
+        'count': np.array(lists['count'], dtype=np.int32),
+        'flag': np.array(lists['flag']),
+        'label': pd.Categorical(lists['label'], categories=['阴性', '阳性']),
+    }
+    write_column_store([arrays], str(tmp_path / 'store'))
+    store = ColumnStore(str(tmp_path / 'store'))
+
+    expected = dataset_digest(RECORDS)
+    assert dataset_digest(lists) == expected
+    assert dataset_digest(arrays) == expected
+    assert dataset_digest(dict(reversed(list(arrays.items())))) == expected
+    assert dataset_digest(store.slice(0, len(store))) == expected
+    assert dataset_digest(store.views()) == expected
+
+
+def test_generated_dataset_digest_matches_across_layouts():
+    generator = DeSciDataGenerator()
+    columnar = generator.generate_dataset('ai_models', 300, columnar=True, seed=1)['data']
+    records = generator.generate_dataset('ai_models', 300, seed=1)['data']
+    compact = generator.generate_dataset('ai_models', 300, compact=True, seed=1)['data']
+
+    assert isinstance(compact, RecordTable)
+    assert dataset_digest(columnar) == dataset_digest(records) == dataset_digest(compact)
+
+
+def test_dataset_digest_detects_changes():
+    changed = [dict(record) for record in RECORDS]
+    changed[1]['score'] = 1.26
+
+    assert dataset_digest(changed) != dataset_digest(RECORDS)
+    assert dataset_digest(RECORDS[:2]) != dataset_digest(RECORDS)
+
+
+def test_encoding_distinguishes_types_but_normalises_numeric_columns():
+    assert encode(1) != encode(1.0)
+    assert encode('1') != encode(1)
+    assert encode([1, 2.5]) == encode([1.0, 2.5]) == encode(np.array([1.0, 2.5]))
+    assert encode({'b': 1, 'a': 2}) == encode({'a': 2, 'b': 1})
+    assert encode(2 ** 70) != encode(2 ** 70 + 1)
+
+
+def test_canonical_digest_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        canonical_digest({'value': object()})
+
+
+@pytest.mark.parametrize('scheme', [SCHEME_ED25519, SCHEME_RSA_PSS])
+def test_sign_json_verify_round_trip(scheme):
+    dataset = DeSciDataGenerator().generate_dataset('genomics', 200, compact=True, seed=3)
+    signed = sign_payload(create_signer(scheme), dataset)
+    restored = json.loads(json.dumps(signed, default=json_default))
+
+    result = verify_signed_item(restored)
+    assert result['valid'], result['error']
+    assert result['data_hash'] == signed['data_hash']
+
+    restored['data']['data'][0]['position'] += 1
+    assert not verify_signed_item(restored)['valid']
@@ -0,0 +1,93 @@
+"""cli：各子命令的端到端行为，以及 verify 不加载 pandas 和生成器"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from column_store import ColumnStore
+
+UTILITY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(*argv):
+    return cli.main(['-q', *argv])
+
+
+def test_generate_sign_and_verify(tmp_path):
+    dataset, key = str(tmp_path / 'genomics.json'), str(tmp_path / 'signing.pem')
+    assert run('generate', 'genomics', '-n', '50', '--seed', '3', '--sign', '--key-path', key, '-o', dataset) == 0
+    assert run('verify', dataset) == 0
+
+    with open(dataset, encoding='utf-8') as f:
+        signed = json.load(f)
+    assert len(signed['data']['data']) == 50
+    signed['data']['data'][0]['position'] += 1
+    tampered = str(tmp_path / 'tampered.json')
+    with open(tampered, 'w', encoding='utf-8') as f:
+        json.dump(signed, f)
+    assert run('verify', tampered) == 1
+
+
+def test_sign_any_json_file(tmp_path):
+    source, output = str(tmp_path / 'notes.json'), str(tmp_path / 'notes.signed.json')
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump({'title': '观测记录', 'values': [1, 2, 3]}, f)
+
+    assert run('sign', source, '-o', output, '--key-path', str(tmp_path / 'key.pem')) == 0
+    with open(output, encoding='utf-8') as f:
+        assert json.load(f)['data'] == {'title': '观测记录', 'values': [1, 2, 3]}
+    assert run('verify', output) == 0
+
+
+def test_researches_are_written_as_a_verifiable_export(tmp_path):
+    output = str(tmp_path / 'researches.json')
+    assert run('generate', 'researches', '-n', '2', '--seed', '1',
+               '--key-path', str(tmp_path / 'key.pem'), '-o', output) == 0
+    assert run('verify', output) == 0
+
+
+def test_export_column_store_and_check_openings(tmp_path):
+    store = str(tmp_path / 'store')
+    assert run('export', 'climate_science', '-n', '3000', '--chunk-size', '1000', '--seed', '5',
+               '-o', store, '--commit', '--commitment-key-path', str(tmp_path / 'commitment.key')) == 0
+    assert len(ColumnStore(store)) == 3000
+
+    openings = os.path.join(store, 'dataset.openings.json')
+    commitments = os.path.join(store, 'dataset.commitments.json')
+    assert run('check', openings, '--commitments', commitments) == 0
+
+    with open(openings, encoding='utf-8') as f:
+        opened = json.load(f)
+    opened[0]['value'] += 1
+    with open(openings, 'w', encoding='utf-8') as f:
+        json.dump(opened, f)
+    assert run('check', openings, '--commitments', commitments) == 1
+
+
+def test_export_npz_and_rejected_options(tmp_path, capsys):
+    output = str(tmp_path / 'drug.npz')
+    assert run('export', 'drug_discovery', '-n', '100', '--format', 'npz', '--seed', '2', '-o', output) == 0
+    assert os.path.exists(output) and os.path.exists(str(tmp_path / 'drug.json'))
+
+    assert run('export', 'drug_discovery', '-n', '100', '--format', 'npz', '-o', output, '--commit') == 1
+    assert '--commit' in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        run('verify', output, '--unknown')
+
+
+def test_verify_does_not_import_heavy_modules(tmp_path):
+    signed = str(tmp_path / 'signed.json')
+    source = str(tmp_path / 'source.json')
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump([1, 2, 3], f)
+    assert run('sign', source, '-o', signed) == 0
+
+    code = ("import sys, cli; code = cli.main(['-q', 'verify', sys.argv[1], '--workers', '1']); "
+            "print(code, sorted(name for name in ('pandas', 'data_generator') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code, signed], cwd=UTILITY_DIR,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['0', '[]']
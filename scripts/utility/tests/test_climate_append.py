@@ -0,0 +1,39 @@
+"""气候数据追加：追加后的数据和Merkle树与直接生成更长的数据集相同"""
+
+import numpy as np
+import pytest
+
+from canonical import dataset_digest
+from data_generator import DeSciDataGenerator
+
+
+@pytest.mark.parametrize('layout', [{'columnar': True}, {}, {'compact': True}])
+def test_append_equals_full_regeneration(layout):
+    generator = DeSciDataGenerator()
+    dataset = generator.generate_dataset('climate_science', 1500, seed=11, **layout)
+    tree = generator.build_merkle_tree(dataset['data'], chunk_size=256)
+    tree = generator.append_climate_days(dataset, 900, tree, chunk_size=256)
+    generator.append_climate_days(dataset, 0)
+
+    full = generator.generate_dataset('climate_science', 2400, seed=11, **layout)
+    assert dataset['generation'] == full['generation']
+    assert dataset['metadata']['total_records'] == 2400
+    assert dataset_digest(dataset['data']) == dataset_digest(full['data'])
+    assert tree.root == generator.build_merkle_tree(full['data'], chunk_size=256).root
+
+
+def test_trend_depends_only_on_the_date():
+    generator = DeSciDataGenerator()
+    short = generator.generate_dataset('climate_science', 400, columnar=True, seed=2)['data']
+    long = generator.generate_dataset('climate_science', 4000, columnar=True, seed=2)['data']
+
+    np.testing.assert_array_equal(short['date'], long['date'][:400])
+    np.testing.assert_array_equal(short['global_temperature'], long['global_temperature'][:400])
+
+
+def test_only_climate_datasets_can_grow():
+    generator = DeSciDataGenerator()
+    with pytest.raises(ValueError):
+        generator.append_climate_days(generator.generate_dataset('genomics', 10, seed=1), 5)
+    with pytest.raises(ValueError):
+        generator.append_climate_days(generator.generate_dataset('climate_science', 10, seed=1), -1)
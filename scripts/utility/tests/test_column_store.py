@@ -0,0 +1,77 @@
+"""column_store：分块写入、整列视图、行访问和零拷贝切片"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_store import ColumnStore, StringColumn, write_column_store
+
+
+def chunk(start, size):
+    index = np.arange(start, start + size)
+    return {
+        'id': np.array([f"row-{i}" for i in index]),
+        'note': np.array(['' if i % 5 == 0 else 'é' * (i % 4) for i in index]),
+        'value': index * 0.5,
+        'count': index.astype(np.int32),
+        'kind': pd.Categorical.from_codes(index % 3, categories=['x', 'y', 'z']),
+        'day': np.datetime64('2024-01-01') + index.astype('timedelta64[D]'),
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / 'store')
+    rows = write_column_store([chunk(0, 40), chunk(40, 25), chunk(65, 0), chunk(65, 35)], path,
+                              metadata={'domain': 'test'})
+    assert rows == 100
+    return ColumnStore(path)
+
+
+def test_manifest_and_columns(store):
+    expected = chunk(0, 100)
+    assert len(store) == 100
+    assert store.metadata == {'domain': 'test'}
+    assert store.column_names == list(expected)
+    assert store.categories('kind') == ['x', 'y', 'z']
+    np.testing.assert_array_equal(store.column('value'), expected['value'])
+    np.testing.assert_array_equal(store.column('day'), expected['day'])
+    assert store.column('id').tolist() == expected['id'].tolist()
+
+
+def test_row_access(store):
+    assert store.row(42) == {'id': 'row-42', 'note': 'éé', 'value': 21.0, 'count': 42,
+                             'kind': 'x', 'day': '2024-02-12'}
+    assert store.row(-1)['id'] == 'row-99'
+    with pytest.raises(IndexError):
+        store.row(100)
+
+
+def test_slice_is_zero_copy(store):
+    part = store.slice(30, 70)
+    expected = chunk(30, 40)
+
+    assert isinstance(part['id'], StringColumn)
+    assert part['id'].data is store.column('id').data
+    assert np.shares_memory(part['value'], store.column('value'))
+    assert part['id'].tolist() == expected['id'].tolist()
+    assert part['note'].tolist() == expected['note'].tolist()
+    assert list(part['kind']) == list(expected['kind'])
+    np.testing.assert_array_equal(part['count'], expected['count'])
+
+
+def test_string_column_slicing(store):
+    ids = store.column('id')
+    assert ids[10:13].tolist() == ['row-10', 'row-11', 'row-12']
+    assert ids[10:13][1:][1] == 'row-12'
+    assert ids[-2] == 'row-98'
+    assert ids[50:40].tolist() == []
+    assert ids[0:6:2] == ['row-0', 'row-2', 'row-4']
+    assert np.asarray(ids[:3]).tolist() == ['row-0', 'row-1', 'row-2']
+
+
+def test_views_decode_categoricals(store):
+    views = store.views(['kind', 'id'])
+    assert isinstance(views['kind'], pd.Categorical)
+    assert list(views['kind'][:4]) == ['x', 'y', 'z', 'x']
+    assert isinstance(views['id'], StringColumn)
@@ -0,0 +1,128 @@
+"""commitments：聚合统计的承诺、打开与校验"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from commitments import (
+    KEY_BYTES, AggregateAccumulator, load_or_create_commitment_key, verify_opening
+)
+from data_generator import DOMAIN_CATEGORICAL_FIELDS, DOMAIN_DATE_FIELDS, DeSciDataGenerator
+
+KEY = bytes(range(KEY_BYTES))
+NONCE = b'\x07' * 16
+
+
+def sample_columns(size=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'value': rng.normal(0, 100, size).round(3),
+        'count': rng.integers(0, 50, size),
+        'flag': rng.random(size) < 0.3,
+        'label': pd.Categorical.from_codes(rng.integers(0, 3, size), categories=['a', 'b', 'c']),
+        'day': np.datetime64('2020-01-01') + rng.integers(0, 365, size).astype('timedelta64[D]'),
+    }
+
+
+def accumulate(columns, chunk_size):
+    aggregates = AggregateAccumulator()
+    size = len(next(iter(columns.values())))
+    for start in range(0, size, chunk_size):
+        aggregates.update({name: column[start:start + chunk_size] for name, column in columns.items()})
+    return aggregates
+
+
+def test_statistics_are_independent_of_chunking():
+    columns = sample_columns()
+    whole = accumulate(columns, 1000).commit(KEY, NONCE)
+    for chunk_size in (1, 7, 333):
+        assert accumulate(columns, chunk_size).commit(KEY, NONCE).public() == whole.public()
+
+
+def test_statistics_values():
+    columns = sample_columns()
+    stats = accumulate(columns, 100).statistics()
+
+    assert stats['count']['sum'] == int(columns['count'].sum())
+    assert stats['flag']['sum'] == int(columns['flag'].sum())
+    assert stats['value']['min'] == columns['value'].min()
+    assert sum(stats['label'][f"count[{value}]"] for value in 'abc') == 1000
+    assert stats['day']['min'] == str(columns['day'].min())
+
+
+def test_every_opening_verifies_after_json_round_trip():
+    commitments = accumulate(sample_columns(), 250).commit(KEY)
+    public = json.loads(json.dumps(commitments.public()))
+    openings = json.loads(json.dumps(commitments.openings()))
+
+    assert all(verify_opening(opening, public) for opening in openings)
+
+
+def test_public_part_reveals_no_values():
+    commitments = accumulate(sample_columns(), 250).commit(KEY, NONCE)
+    public = json.dumps(commitments.public())
+    assert str(commitments.statistics['count']['sum']) not in public
+
+
+def test_tampered_openings_are_rejected():
+    commitments = accumulate(sample_columns(), 250).commit(KEY, NONCE)
+    public = commitments.public()
+    opening = commitments.opening('count', 'sum')
+
+    assert not verify_opening({**opening, 'value': opening['value'] + 1}, public)
+    assert not verify_opening({**opening, 'salt': '00' * 32}, public)
+    assert not verify_opening({**opening, 'statistic': 'max'}, public)
+    assert not verify_opening(opening, {**public, 'root': '00' * 32})
+    with pytest.raises(KeyError):
+        commitments.opening('count', 'median')
+
+
+def test_commitments_depend_on_key_and_nonce():
+    aggregates = accumulate(sample_columns(), 250)
+    base = aggregates.commit(KEY, NONCE).public()['root']
+
+    assert aggregates.commit(KEY, NONCE).public()['root'] == base
+    assert aggregates.commit(bytes(KEY_BYTES), NONCE).public()['root'] != base
+    assert aggregates.commit(KEY, b'\x08' * 16).public()['root'] != base
+
+
+def test_commitment_key_file_is_created_once(tmp_path):
+    path = str(tmp_path / 'commitment.key')
+    key = load_or_create_commitment_key(path)
+
+    assert len(key) == KEY_BYTES
+    assert load_or_create_commitment_key(path) == key
+    assert (tmp_path / 'commitment.key').stat().st_mode & 0o777 == 0o600
+
+
+def test_story_commitments_can_be_opened_with_persisted_key(tmp_path):
+    path = str(tmp_path / 'commitment.key')
+    story = DeSciDataGenerator(seed=11, commitment_key_path=path).generate_research_story()
+    story = json.loads(json.dumps(story))
+    public = story['data']['blockchain_integration']['aggregate_commitments']
+
+    reopened = DeSciDataGenerator(commitment_key_path=path).open_aggregate_commitments(story)
+    assert all(verify_opening(opening, public) for opening in reopened.openings())
+
+    with pytest.raises(ValueError):
+        DeSciDataGenerator().open_aggregate_commitments(story)
+
+
+@pytest.mark.parametrize('domain', sorted(DOMAIN_CATEGORICAL_FIELDS))
+def test_commitments_do_not_depend_on_layout(domain):
+    generator = DeSciDataGenerator(commitment_key=KEY)
+    layouts = [generator.generate_dataset(domain, 300, seed=2, **options)['data']
+               for options in ({'columnar': True}, {}, {'compact': True})]
+    columnar = layouts[0]
+    commitments = [generator.commit_aggregates(data, domain, NONCE) for data in layouts]
+
+    assert {commitment.tree.root_hex for commitment in commitments} == {commitments[0].tree.root_hex}
+    assert sorted(name for name, column in columnar.items()
+                  if isinstance(column, pd.Categorical)) == sorted(DOMAIN_CATEGORICAL_FIELDS[domain])
+    stats = commitments[1].statistics
+    for name in DOMAIN_CATEGORICAL_FIELDS[domain]:
+        assert sum(value for key, value in stats[name].items() if key.startswith('count[')) == 300
+    for name in DOMAIN_DATE_FIELDS[domain]:
+        assert stats[name]['min'] == str(columnar[name].min())
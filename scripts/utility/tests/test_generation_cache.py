@@ -0,0 +1,72 @@
+"""generation_cache：命中、校验失败、LRU 淘汰，以及只缓存可复现的生成结果"""
+
+import os
+import time
+
+import numpy as np
+
+from canonical import dataset_digest
+from data_generator import DeSciDataGenerator
+from generation_cache import COLUMNS_FILE, GenerationCache, cache_key
+
+
+def columns(size):
+    return {'value': np.arange(size, dtype=np.float64), 'label': np.array([f"v{i}" for i in range(size)])}
+
+
+def test_columns_round_trip_and_key_is_order_independent(tmp_path):
+    cache = GenerationCache(str(tmp_path))
+    key = cache_key(domain='test', size=10)
+    assert cache_key(size=10, domain='test') == key
+    assert cache.get_columns(key) is None
+
+    cache.put_columns(key, {'domain': 'test'}, columns(10))
+    assert dataset_digest(cache.get_columns(key)) == dataset_digest(columns(10))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_corrupted_entry_is_dropped(tmp_path):
+    cache = GenerationCache(str(tmp_path))
+    key = cache_key(domain='test', size=10)
+    cache.put_columns(key, {}, columns(10))
+    with open(os.path.join(cache._entry_dir(key), COLUMNS_FILE), 'ab') as f:
+        f.write(b'garbage')
+
+    assert cache.get_columns(key) is None
+    assert cache.entries() == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = GenerationCache(str(tmp_path))
+    keys = [cache_key(index=index) for index in range(3)]
+    for key in keys:
+        cache.put_columns(key, {}, columns(1000))
+        time.sleep(0.01)
+    cache.get_columns(keys[0])
+
+    cache.max_bytes = cache.total_bytes() - 1
+    cache.evict()
+    remaining = {entry['key'] for entry in cache.entries()}
+    assert remaining == {keys[0], keys[2]}
+
+
+def test_seeded_story_is_served_from_cache(tmp_path):
+    cache = GenerationCache(str(tmp_path / 'cache'))
+    key_path = str(tmp_path / 'signing.pem')
+    first = DeSciDataGenerator(seed=5, cache=cache, key_path=key_path).generate_research_story()
+    second = DeSciDataGenerator(seed=5, cache=cache, key_path=key_path).generate_research_story()
+
+    assert second == first
+    assert cache.hits >= 1
+
+
+def test_unseeded_runs_do_not_fill_the_cache(tmp_path):
+    cache = GenerationCache(str(tmp_path / 'cache'))
+    generator = DeSciDataGenerator(cache=cache)
+    generator.generate_research_story()
+    generator.generate_dataset('climate_science', 100)
+    assert cache.entries() == []
+
+    generator.generate_dataset('climate_science', 100, seed=1)
+    generator.generate_research_story(seed=2)
+    assert len(cache.entries()) == 3
@@ -0,0 +1,73 @@
+"""genome：唯一且按坐标排序的变异位点、参考碱基，以及区间索引查询"""
+
+import numpy as np
+import pytest
+
+from column_store import ColumnStore
+from data_generator import DeSciDataGenerator
+from genome import CHROMOSOME_LENGTHS, RegionIndex, parse_region, query_region, reference_bases
+
+
+@pytest.fixture(scope='module')
+def variants():
+    return DeSciDataGenerator().generate_dataset('genomics', 20000, columnar=True, seed=4)['data']
+
+
+def test_sites_are_unique_with_consistent_reference(variants):
+    key = variants['chromosome'].astype(np.int64) << 32 | variants['position']
+
+    assert (np.diff(key) > 0).all()
+    np.testing.assert_array_equal(variants['reference_allele'].codes,
+                                  reference_bases(variants['chromosome'], variants['position']))
+    assert (variants['reference_allele'].codes != variants['alternate_allele'].codes).all()
+
+
+def test_sequence_ids_keep_the_original_numbering(variants):
+    assert variants['sequence_id'][:2].tolist() == ['SEQ_00000', 'SEQ_00001']
+    assert variants['sequence_id'][-1] == 'SEQ_19999'
+
+    chunks = DeSciDataGenerator().iter_dataset_chunks('genomics', 20000, 7000, seed=4)
+    assert [chunk['sequence_id'][0] for chunk in chunks] == ['SEQ_00000', 'SEQ_07000', 'SEQ_14000']
+
+
+def test_parse_region():
+    assert parse_region('chr7:55,000,000-55,300,000') == (7, 55_000_000, 55_300_000)
+    assert parse_region('7:1000') == (7, 1000, 1000)
+    assert parse_region('chr2') == (2, 1, CHROMOSOME_LENGTHS[2])
+    for region in ('chrX:1-2', 'chr1:10-5', 'nonsense'):
+        with pytest.raises(ValueError):
+            parse_region(region)
+
+
+def test_region_rows_match_a_linear_scan(variants):
+    index = RegionIndex.build(variants['chromosome'], variants['position'])
+    rng = np.random.default_rng(0)
+    regions = [(1, 1, CHROMOSOME_LENGTHS[1]), (22, 1, 1), (3, 1_000_000, 1_000_000 + index.window)]
+    for _ in range(200):
+        chromosome = int(rng.integers(1, 23))
+        start = int(rng.integers(1, CHROMOSOME_LENGTHS[chromosome]))
+        regions.append((chromosome, start, start + int(rng.integers(0, 5_000_000))))
+
+    for chromosome, start, end in regions:
+        inside = np.flatnonzero((variants['chromosome'] == chromosome) &
+                                (variants['position'] >= start) & (variants['position'] <= end))
+        lo, hi = index.rows(variants['position'], (chromosome, start, end))
+        if len(inside):
+            assert (lo, hi) == (inside[0], inside[-1] + 1)
+        else:
+            assert lo == hi
+
+
+def test_query_region_on_exported_store(tmp_path):
+    path = str(tmp_path / 'store')
+    DeSciDataGenerator().export_to_column_store('genomics', 5000, path, chunk_size=1500, seed=8)
+    store = ColumnStore(path)
+    chromosome, position = store.column('chromosome'), store.column('position')
+    first = int(position[np.flatnonzero(chromosome == 7)[3]])
+
+    result = query_region(store, f"chr7:{first}-{first + 10_000_000}", columns=['chromosome', 'position'])
+    assert result['position'][0] == first
+    assert (result['chromosome'] == 7).all()
+    assert ((result['position'] >= first) & (result['position'] <= first + 10_000_000)).all()
+    expected = np.count_nonzero((chromosome == 7) & (position >= first) & (position <= first + 10_000_000))
+    assert len(result['position']) == expected
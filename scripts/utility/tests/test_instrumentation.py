@@ -0,0 +1,100 @@
+"""instrumentation：计时与计数的累计、各输出格式，以及生成器上报的指标"""
+
+import json
+import logging
+
+import pytest
+
+from data_generator import DeSciDataGenerator
+from instrumentation import (
+    ENV_JSON_FILE, ENV_LOG, ENV_PROMETHEUS_FILE, NULL_METRICS, JSONFileSink, LogSink, Metrics, MetricsSink,
+    PrometheusSink, format_prometheus, metrics_from_env
+)
+
+
+class RecordingSink(MetricsSink):
+    def __init__(self):
+        self.events = []
+        self.snapshots = []
+
+    def on_event(self, event):
+        self.events.append(event)
+
+    def write(self, snapshot):
+        self.snapshots.append(snapshot)
+
+
+def test_timers_and_counters_accumulate_per_label():
+    sink = RecordingSink()
+    metrics = Metrics([sink])
+    metrics.observe('hash', 0.5, kind='merkle')
+    metrics.observe('hash', 1.5, kind='merkle')
+    metrics.observe('hash', 0.25, kind='item')
+    metrics.count('rows', 10, domain='a')
+    metrics.count('rows', 5, domain='a')
+    with metrics.timer('export', format='json'):
+        pass
+    metrics.flush()
+
+    snapshot = sink.snapshots[0]
+    timers = {(timer['phase'], timer['labels'].get('kind')): timer for timer in snapshot['timers']}
+    assert (timers['hash', 'merkle']['count'], timers['hash', 'merkle']['seconds'],
+            timers['hash', 'merkle']['max_seconds']) == (2, 2.0, 1.5)
+    assert timers['export', None]['labels'] == {'format': 'json'}
+    assert snapshot['counters'] == [{'name': 'rows', 'labels': {'domain': 'a'}, 'value': 15}]
+    assert [event['phase'] for event in sink.events] == ['hash', 'hash', 'hash', 'export']
+
+    metrics.reset()
+    assert metrics.snapshot()['timers'] == []
+
+
+def test_prometheus_format():
+    metrics = Metrics(namespace='test')
+    metrics.observe('generate', 2.0, domain='say "hi"')
+    metrics.count('rows', 3, domain='x')
+    text = format_prometheus(metrics.snapshot())
+
+    assert '# TYPE test_phase_seconds summary' in text
+    assert 'test_phase_seconds_sum{phase="generate",domain="say \\"hi\\""} 2.000000000' in text
+    assert 'test_phase_seconds_count{phase="generate",domain="say \\"hi\\""} 1' in text
+    assert 'test_rows_total{domain="x"} 3' in text
+
+
+def test_file_sinks_and_environment(tmp_path, monkeypatch, caplog):
+    prom_path, json_path = str(tmp_path / 'metrics.prom'), str(tmp_path / 'metrics.json')
+    for name in (ENV_PROMETHEUS_FILE, ENV_JSON_FILE, ENV_LOG):
+        monkeypatch.delenv(name, raising=False)
+    assert metrics_from_env() is NULL_METRICS
+
+    monkeypatch.setenv(ENV_PROMETHEUS_FILE, prom_path)
+    monkeypatch.setenv(ENV_JSON_FILE, json_path)
+    monkeypatch.setenv(ENV_LOG, 'yes')
+    metrics = metrics_from_env()
+    assert [type(sink) for sink in metrics.sinks] == [PrometheusSink, JSONFileSink, LogSink]
+
+    with caplog.at_level(logging.INFO):
+        metrics.count('rows', 2)
+        metrics.flush()
+    with open(json_path, encoding='utf-8') as f:
+        assert json.load(f)['counters'][0]['value'] == 2
+    with open(prom_path, encoding='utf-8') as f:
+        assert 'desci_generator_rows_total 2' in f.read()
+    assert json.loads(caplog.records[-1].getMessage())['counters'] == {'rows': 2}
+
+
+def test_null_metrics_ignore_everything():
+    with NULL_METRICS.timer('anything'):
+        NULL_METRICS.count('rows', 5)
+    assert NULL_METRICS.snapshot()['counters'] == []
+    with pytest.raises(TypeError):
+        MetricsSink()
+
+
+def test_generator_reports_phases_and_rows():
+    metrics = Metrics()
+    DeSciDataGenerator(metrics=metrics).generate_dataset('genomics', 250, columnar=True, seed=1)
+    snapshot = metrics.snapshot()
+
+    assert {'name': 'rows_generated', 'labels': {'domain': 'genomics'}, 'value': 250} in snapshot['counters']
+    assert any(timer['phase'] == 'generate' and timer['labels'] == {'domain': 'genomics'}
+               for timer in snapshot['timers'])
@@ -0,0 +1,67 @@
+"""merkle_tree：各种树大小下的包含证明、追加与原地更新"""
+
+import hashlib
+
+import pytest
+
+from merkle_tree import EMPTY_ROOT, MerkleTree, hash_leaf, hash_node
+
+
+def chunk(i):
+    return hashlib.sha256(f"chunk-{i}".encode()).digest()
+
+
+def reference_root(chunk_hashes):
+    """逐层两两合并、奇数个时提升最后一个节点的直接实现"""
+    level = [hash_leaf(chunk_hash) for chunk_hash in chunk_hashes]
+    while len(level) > 1:
+        level = [hash_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+    return level[0] if level else EMPTY_ROOT
+
+
+@pytest.mark.parametrize('size', range(0, 34))
+def test_root_matches_reference(size):
+    chunks = [chunk(i) for i in range(size)]
+    assert MerkleTree(chunks).root == reference_root(chunks)
+
+
+@pytest.mark.parametrize('size', range(1, 34))
+def test_every_proof_verifies(size):
+    chunks = [chunk(i) for i in range(size)]
+    tree = MerkleTree(chunks)
+    for index, chunk_hash in enumerate(chunks):
+        proof = tree.proof(index)
+        assert MerkleTree.verify_proof(chunk_hash, proof, tree.root)
+        assert not MerkleTree.verify_proof(chunk(size + 1), proof, tree.root)
+        if proof:
+            tampered = [dict(step) for step in proof]
+            tampered[0]['position'] = 'right' if tampered[0]['position'] == 'left' else 'left'
+            assert not MerkleTree.verify_proof(chunk_hash, tampered, tree.root)
+
+
+def test_leaf_and_node_hashes_are_domain_separated():
+    left, right = chunk(0), chunk(1)
+    # 内部节点不能冒充叶子：单个叶子的树根不等于两个叶子的内部节点
+    assert MerkleTree([hash_node(hash_leaf(left), hash_leaf(right))]).root != MerkleTree([left, right]).root
+
+
+def test_append_and_update_match_rebuild():
+    chunks = [chunk(i) for i in range(13)]
+    tree = MerkleTree(chunks[:5])
+    for chunk_hash in chunks[5:]:
+        tree.append(chunk_hash)
+    assert tree.root == MerkleTree(chunks).root
+
+    chunks[7] = chunk(100)
+    tree.update(7, chunks[7])
+    assert tree.root == MerkleTree(chunks).root
+    assert MerkleTree.verify_proof(chunks[7], tree.proof(7), tree.root)
+
+
+def test_out_of_range_index():
+    tree = MerkleTree([chunk(0)])
+    with pytest.raises(IndexError):
+        tree.proof(1)
+    with pytest.raises(IndexError):
+        tree.update(-1, chunk(1))
@@ -0,0 +1,60 @@
+"""records：RecordTable 按行返回的内容与逐行字典布局相同，列数据保持紧凑"""
+
+import json
+
+import numpy as np
+import pytest
+
+from canonical import dataset_digest
+from data_generator import DeSciDataGenerator, json_default
+from records import ITER_BATCH_ROWS, RECORD_TYPES, ClimateRecord, RecordTable
+
+ROWS = ITER_BATCH_ROWS + 100
+
+
+@pytest.mark.parametrize('domain', sorted(RECORD_TYPES))
+def test_rows_match_the_dict_layout(domain):
+    generator = DeSciDataGenerator()
+    table = generator.generate_dataset(domain, ROWS, compact=True, seed=3)['data']
+    records = generator.generate_dataset(domain, ROWS, seed=3)['data']
+    if isinstance(records, dict):
+        # 气候数据的默认布局是按列的列表
+        records = [dict(zip(records, row)) for row in zip(*records.values())]
+
+    assert isinstance(table, RecordTable) and len(table) == ROWS
+    assert table.fields == tuple(records[0])
+    dicts = list(table.to_dicts())
+    assert json.dumps(dicts, default=json_default) == json.dumps(records, default=json_default)
+    assert table[-1]._asdict() == dicts[-1]
+    assert table[ITER_BATCH_ROWS]._asdict() == dicts[ITER_BATCH_ROWS]
+
+    columnar = generator.generate_dataset(domain, ROWS, columnar=True, seed=3)['data']
+    assert dataset_digest(table.to_columns()) == dataset_digest(columnar)
+
+
+def test_slices_share_columns_and_categories_are_interned():
+    table = DeSciDataGenerator().generate_dataset('ai_models', 1000, compact=True, seed=1)['data']
+    part = table[10:20]
+
+    assert len(part) == 10
+    assert list(part) == [table[index] for index in range(10, 20)]
+    modalities = {id(record.modality) for record in table if record.modality == 'CT'}
+    assert len(modalities) == 1
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+
+def test_compact_columns_are_small():
+    table = DeSciDataGenerator().generate_dataset('genomics', 10000, compact=True, seed=2)['data']
+    columnar = DeSciDataGenerator().generate_dataset('genomics', 10000, columnar=True, seed=2)['data']
+
+    # 分类列为 int8 编码，ID列为每字符1字节的定长字节串
+    assert table.nbytes < sum(np.asarray(column).nbytes for column in columnar.values())
+    assert table.column('sequence_id').tolist() == columnar['sequence_id'].tolist()
+
+
+def test_missing_columns_and_unknown_domain_are_rejected():
+    with pytest.raises(ValueError):
+        RecordTable(ClimateRecord, {'date': np.array(['2020-01-01'])})
+    with pytest.raises(ValueError):
+        RecordTable.for_domain('astronomy', {})
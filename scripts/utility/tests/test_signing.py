@@ -0,0 +1,49 @@
+"""signing：批量验证、公钥缓存和记录的数据哈希"""
+
+import pytest
+
+from signing import (
+    PARALLEL_THRESHOLD, SCHEME_ED25519, create_signer, load_public_key, sign_payload,
+    verify_many, verify_signed_item
+)
+
+
+@pytest.fixture(scope='module')
+def signer():
+    return create_signer(SCHEME_ED25519)
+
+
+def signed_items(signer, count):
+    return [sign_payload(signer, {'index': index, 'values': list(range(index % 7))}) for index in range(count)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_verify_many_keeps_input_order(signer, workers):
+    items = signed_items(signer, PARALLEL_THRESHOLD + 8)
+    items[5]['data']['index'] = -1
+    items[-1]['signature'] = items[0]['signature']
+
+    results = verify_many(items, workers=workers, chunksize=4)
+
+    assert [result['index'] for result in results] == list(range(len(items)))
+    assert [index for index, result in enumerate(results) if not result['valid']] == [5, len(items) - 1]
+    assert results[0]['data_hash'] == items[0]['data_hash']
+    assert len({result['key_fingerprint'] for result in results}) == 1
+
+
+def test_public_keys_are_loaded_once(signer):
+    pem = signer.public_key_pem()
+    assert load_public_key(pem) is load_public_key(pem + '\n')
+
+
+def test_recorded_data_hash_must_match_data(signer):
+    item = sign_payload(signer, {'value': 1})
+    assert verify_signed_item(item)['valid']
+
+    tampered = {**item, 'data_hash': '00' * 32}
+    result = verify_signed_item(tampered)
+    assert not result['valid']
+    assert '00' * 32 in result['error']
+
+    del tampered['data_hash']
+    assert verify_signed_item(tampered)['valid']
@@ -0,0 +1,87 @@
+"""smiles：生成的分子符合语法和价态，重原子数和分子量与结构一致"""
+
+import re
+
+import numpy as np
+
+from smiles import build_molecules, generate_smiles_batch, sample_molecule_draws
+
+# 主链令牌：可选的键符号、主链原子、可选的支链
+TOKEN = re.compile(r"([=#]?)([CNOSP])(?:\((=?)(Cl|Br|[CNOFI])\))?")
+VALENCE = {'C': 4, 'N': 3, 'O': 2, 'S': 2, 'P': 3, 'F': 1, 'Cl': 1, 'Br': 1, 'I': 1}
+MASS = {'C': 12.011, 'N': 14.007, 'O': 15.999, 'S': 32.06, 'P': 30.974,
+        'F': 18.998, 'Cl': 35.45, 'Br': 79.904, 'I': 126.904, 'H': 1.008}
+BOND_ORDER = {'': 1, '=': 2, '#': 3}
+
+
+def parse(smiles):
+    """按生成器的语法解析SMILES，检查价态，返回 (重原子数, 分子量)"""
+    tokens = []
+    position = 0
+    while position < len(smiles):
+        match = TOKEN.match(smiles, position)
+        assert match, f"无法解析 {smiles!r} 第 {position} 个字符"
+        tokens.append(match.groups())
+        position = match.end()
+    assert tokens[0][0] == '', "分子不能以键符号开头"
+
+    heavy_atoms, mass, hydrogens = 0, 0.0, 0
+    for index, (bond, atom, branch_bond, branch) in enumerate(tokens):
+        left = BOND_ORDER[bond] if index > 0 else 0
+        right = BOND_ORDER[tokens[index + 1][0]] if index + 1 < len(tokens) else 0
+        used = left + right
+        heavy_atoms += 1
+        mass += MASS[atom]
+        if branch:
+            order = BOND_ORDER[branch_bond]
+            used += order
+            heavy_atoms += 1
+            mass += MASS[branch]
+            assert order <= VALENCE[branch]
+            hydrogens += VALENCE[branch] - order
+        assert used <= VALENCE[atom], f"{smiles!r} 中第 {index} 个原子超出价态"
+        hydrogens += VALENCE[atom] - used
+    return heavy_atoms, mass + hydrogens * MASS['H']
+
+
+def test_molecules_are_valid_and_consistent():
+    molecules = generate_smiles_batch(np.random.default_rng(0), 5000)
+
+    for smiles, heavy_atoms, weight in zip(molecules['smiles'], molecules['heavy_atom_count'],
+                                           molecules['molecular_weight']):
+        expected_heavy_atoms, expected_weight = parse(str(smiles))
+        assert heavy_atoms == expected_heavy_atoms
+        assert abs(weight - expected_weight) <= 0.0051
+
+
+def test_backbone_length_and_token_frequencies():
+    draws = sample_molecule_draws(np.random.default_rng(1), 20000, min_atoms=3, max_atoms=8)
+    smiles = build_molecules(draws)['smiles']
+    backbones = [TOKEN.findall(str(value)) for value in smiles]
+
+    assert [len(tokens) for tokens in backbones] == draws['backbone_length'].tolist()
+    atoms = [atom for tokens in backbones for _, atom, _, _ in tokens]
+    # 主链原子 C 的采样权重为 0.70
+    assert abs(atoms.count('C') / len(atoms) - 0.70) < 0.01
+    assert {atom for _, atom, _, _ in backbones[0]} <= set('CNOSP')
+
+
+def test_assembly_is_row_independent():
+    rng = np.random.default_rng(2)
+    first, second = sample_molecule_draws(rng, 700), sample_molecule_draws(rng, 300)
+    together = build_molecules({name: np.concatenate([first[name], second[name]]) for name in first})
+    separate = [build_molecules(first), build_molecules(second)]
+
+    for name in together:
+        np.testing.assert_array_equal(together[name], np.concatenate([part[name] for part in separate]))
+
+
+def test_same_seed_same_molecules_and_empty_batch():
+    first = generate_smiles_batch(np.random.default_rng(5), 100)
+    second = generate_smiles_batch(np.random.default_rng(5), 100)
+    np.testing.assert_array_equal(first['smiles'], second['smiles'])
+
+    empty = generate_smiles_batch(np.random.default_rng(5), 0)
+    assert {name: len(column) for name, column in empty.items()} == {
+        'smiles': 0, 'heavy_atom_count': 0, 'molecular_weight': 0
+    }
@@ -0,0 +1,102 @@
+"""stat_models：边缘分布、相关结构，以及各领域模型中声明的相关方向"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator import DeSciDataGenerator
+from stat_models import (
+    Categorical, CorrelatedModel, Integers, LogUniform, Marginal, Normal, Uniform, normal_cdf, zipf_weights
+)
+
+SIZE = 200_000
+
+
+def as_numbers(column):
+    return column.codes if isinstance(column, pd.Categorical) else np.asarray(column)
+
+
+def test_normal_cdf_matches_the_standard_library():
+    z = np.linspace(-8, 8, 2001)
+    expected = np.array([NormalDist().cdf(value) for value in z])
+    assert np.abs(normal_cdf(z.copy()) - expected).max() < 1.5e-7
+
+
+def test_pairwise_correlations_follow_the_matrix():
+    model = CorrelatedModel(
+        {'a': Normal(), 'b': Normal(), 'c': Normal(5, 2), 'free': Uniform(-1, 1)},
+        {('a', 'b'): 0.8, ('b', 'c'): -0.5}
+    )
+    columns = model.sample(np.random.default_rng(0), SIZE)
+    correlation = np.corrcoef([columns['a'], columns['b'], columns['c'], columns['free']])
+
+    assert list(columns) == ['a', 'b', 'c', 'free']
+    assert correlation[0, 1] == pytest.approx(0.8, abs=0.01)
+    assert correlation[1, 2] == pytest.approx(-0.5, abs=0.01)
+    assert abs(correlation[0, 3]) < 0.01
+    assert columns['c'].mean() == pytest.approx(5, abs=0.02)
+
+
+@pytest.mark.parametrize('correlated', [False, True])
+def test_marginals_keep_their_ranges_and_frequencies(correlated):
+    weights = zipf_weights(4)
+    marginals = {
+        'uniform': Uniform(2, 3, decimals=3),
+        'log': LogUniform(0.001, 100),
+        'integers': Integers(1, 11),
+        'label': Categorical(['w', 'x', 'y', 'z'], weights),
+        'anchor': Normal(),
+    }
+    correlations = {(name, 'anchor'): 0.45 for name in marginals if name != 'anchor'} if correlated else {}
+    columns = CorrelatedModel(marginals, correlations).sample(np.random.default_rng(1), SIZE)
+
+    assert 2 <= columns['uniform'].min() and columns['uniform'].max() <= 3
+    assert 0.001 <= columns['log'].min() and columns['log'].max() <= 100
+    # 对数均匀：以 10 为底的对数在 [-3, 2) 上均匀，中位数约为 10^-0.5
+    assert np.median(columns['log']) == pytest.approx(10 ** -0.5, rel=0.05)
+    assert set(np.unique(columns['integers'])) == set(range(1, 11))
+    frequencies = np.bincount(columns['label'].codes, minlength=4) / SIZE
+    np.testing.assert_allclose(frequencies, weights, atol=0.005)
+    if correlated:
+        # 排在后面的类别对应更大的潜在值
+        anchor_means = [columns['anchor'][columns['label'].codes == code].mean() for code in range(4)]
+        assert anchor_means == sorted(anchor_means)
+
+
+def test_invalid_models_are_rejected():
+    with pytest.raises(ValueError):
+        CorrelatedModel({'a': Normal()}, {('a', 'missing'): 0.5})
+    with pytest.raises(ValueError):
+        CorrelatedModel({'a': Normal(), 'b': Normal()}, {('a', 'b'): 1.0})
+    with pytest.raises(ValueError):
+        CorrelatedModel({'a': Normal(), 'b': Normal(), 'c': Normal()},
+                        {('a', 'b'): 0.9, ('b', 'c'): 0.9, ('a', 'c'): -0.9})
+    with pytest.raises(ValueError):
+        Categorical(['a', 'b'], [1.0])
+    with pytest.raises(ValueError):
+        LogUniform(0, 1)
+    with pytest.raises(TypeError):
+        Marginal()
+
+
+def test_fingerprint_tracks_parameters():
+    def model(scale):
+        return CorrelatedModel({'a': Normal(0, scale), 'b': Normal()}, {('a', 'b'): 0.3})
+    assert model(1).fingerprint() == model(1).fingerprint()
+    assert model(1).fingerprint() != model(2).fingerprint()
+
+
+@pytest.mark.parametrize('domain', ['climate_science', 'drug_discovery', 'ai_models', 'genomics'])
+def test_domain_models_show_their_declared_correlations(domain):
+    model = DeSciDataGenerator().models[domain]
+    columns = model.sample(np.random.default_rng(2), 50_000)
+
+    for (first, second), rho in model.correlations.items():
+        ranks = pd.DataFrame({'first': as_numbers(columns[first]), 'second': as_numbers(columns[second])})
+        observed = ranks.corr(method='spearman').iloc[0, 1]
+        # 高斯 copula 的秩相关约为 6/π·asin(ρ/2)，分类列和取整会使其略微变弱
+        assert math.copysign(1, observed) == math.copysign(1, rho)
+        assert abs(observed) > 0.5 * abs(6 / math.pi * math.asin(rho / 2))
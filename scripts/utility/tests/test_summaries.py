@@ -0,0 +1,119 @@
+"""summaries：摘要与倒排索引，以及分块累加与整列计算的一致性"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_store import ColumnStore
+from data_generator import DOMAIN_INDEX_FIELDS, DeSciDataGenerator
+from summaries import (
+    MAX_VALUE_COUNTS, InvertedIndex, SummaryAccumulator, build_indexes, load_indexes, summarize_columns
+)
+
+
+def sample_columns(size=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(-1, 4, size)
+    return {
+        'label': pd.Categorical.from_codes(codes, categories=['a', 'b', 'c', 'unused']),
+        'station': np.array([f"S{i}" for i in rng.integers(0, 40, size)]),
+        'id': np.array([f"ID-{i:06d}" for i in range(size)]),
+        'value': rng.normal(3, 2, size),
+        'count': rng.integers(-5, 500, size),
+        'flag': rng.random(size) < 0.2,
+        'day': np.datetime64('2020-01-01') + rng.integers(0, 900, size).astype('timedelta64[D]'),
+    }
+
+
+def accumulate(columns, chunk_size, index_fields):
+    summaries = SummaryAccumulator(index_fields)
+    size = len(columns['value'])
+    for start in list(range(0, size, chunk_size)) + [size]:
+        summaries.update({name: column[start:start + chunk_size] for name, column in columns.items()})
+    for start in range(0, size, chunk_size):
+        summaries.update_histograms({name: columns[name][start:start + chunk_size]
+                                     for name in summaries.histogram_columns})
+    return summaries
+
+
+def without_moments(summary):
+    moments = {}
+    for name, column in summary['columns'].items():
+        for key in ('mean', 'std'):
+            if key in column:
+                moments[(name, key)] = column.pop(key)
+    return moments
+
+
+@pytest.mark.parametrize('chunk_size', [7, 333, 5000])
+def test_accumulated_summary_matches_whole_column(chunk_size):
+    columns = sample_columns()
+    fields = ['label', 'station']
+    summaries = accumulate(columns, chunk_size, fields)
+
+    expected, actual = summarize_columns(columns), summaries.summary()
+    expected_moments, actual_moments = without_moments(expected), without_moments(actual)
+    assert actual == expected
+    assert actual_moments == pytest.approx(expected_moments, rel=1e-12)
+    assert actual['columns']['id']['type'] == 'string'
+    assert actual['columns']['station']['type'] == 'categorical'
+
+    expected_indexes = build_indexes(columns, fields)
+    for field, index in summaries.indexes().items():
+        np.testing.assert_array_equal(index.values, expected_indexes[field].values)
+        np.testing.assert_array_equal(index.offsets, expected_indexes[field].offsets)
+        np.testing.assert_array_equal(index.rows, expected_indexes[field].rows)
+        assert index.rows.dtype == expected_indexes[field].rows.dtype
+
+
+def test_string_value_counts_stop_at_the_limit():
+    summaries = SummaryAccumulator()
+    summaries.update({'name': np.array([f"n{i}" for i in range(MAX_VALUE_COUNTS)])})
+    assert summaries.summary()['columns']['name']['type'] == 'categorical'
+    summaries.update({'name': np.array(['one-more'])})
+    assert summaries.summary()['columns']['name'] == {'type': 'string', 'count': MAX_VALUE_COUNTS + 1,
+                                                       'min_length': 2, 'max_length': 8}
+
+
+def test_inverted_index_lookup():
+    index = InvertedIndex.build(pd.Categorical(['x', 'y', 'x', None, 'z', 'x'], categories=['z', 'y', 'x']))
+
+    assert index.lookup('x').tolist() == [0, 2, 5]
+    assert index.lookup('missing').tolist() == []
+    assert index.lookup_many(['z', 'y']).tolist() == [1, 4]
+    assert index.counts() == {'z': 1, 'y': 1, 'x': 3}
+
+
+@pytest.mark.parametrize('domain', ['climate_science', 'ai_models', 'genomics'])
+def test_column_store_export_writes_matching_sidecars(tmp_path, domain):
+    path = str(tmp_path / 'store')
+    generator = DeSciDataGenerator()
+    generator.export_to_column_store(domain, 3000, path, chunk_size=700, seed=6)
+    data = generator.generate_dataset(domain, 3000, columnar=True, seed=6)['data']
+
+    with open(f"{path}/dataset.summary.json", encoding='utf-8') as f:
+        summary = json.load(f)
+    expected = summarize_columns(data)
+    without_moments(summary)
+    without_moments(expected)
+    assert summary['columns'] == json.loads(json.dumps(expected['columns']))
+    assert summary['domain'] == domain
+
+    if DOMAIN_INDEX_FIELDS[domain]:
+        assert summary['indexes']['id_field']
+        indexes = load_indexes(f"{path}/dataset.index.npz")
+        for field, index in build_indexes(data, DOMAIN_INDEX_FIELDS[domain]).items():
+            np.testing.assert_array_equal(indexes[field].rows, index.rows)
+
+
+def test_column_store_read_returns_fixed_rows(tmp_path):
+    path = str(tmp_path / 'store')
+    DeSciDataGenerator().export_to_column_store('climate_science', 500, path, chunk_size=200, seed=1)
+    store = ColumnStore(path)
+
+    np.testing.assert_array_equal(store.read('co2_level', 120, 260), store.column('co2_level')[120:260])
+    assert len(store.read('co2_level', 450, 900)) == 50
+    with pytest.raises(ValueError):
+        store.read('measurement_station', 0, 10)